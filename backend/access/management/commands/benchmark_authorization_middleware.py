@@ -0,0 +1,65 @@
+# backend/access/management/commands/benchmark_authorization_middleware.py
+import timeit
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from access.middleware import (
+    AUTHORIZATION_EXEMPT_URL_PATTERNS,
+    AUTHORIZATION_EXEMPT_URLS,
+    AuthorizationMiddleware,
+)
+
+
+def legacy_is_exempt(path, exact_urls, prefixes):
+    """Previous check: walks the lists with == and startswith on every request."""
+    return any(path == url for url in exact_urls) or any(path.startswith(prefix) for prefix in prefixes)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the per-request cost of AuthorizationMiddleware (no database): "
+        "compares the previous exempt-path check with the precompiled regex "
+        "and times the full call for exempt and protected paths."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200_000, help="Calls per scenario.")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        exact_urls = getattr(settings, 'AUTHORIZATION_EXEMPT_URLS', AUTHORIZATION_EXEMPT_URLS)
+        prefixes = getattr(settings, 'AUTHORIZATION_EXEMPT_URL_PATTERNS', AUTHORIZATION_EXEMPT_URL_PATTERNS)
+        response = HttpResponse()
+        middleware = AuthorizationMiddleware(lambda request: response)
+
+        # Fake user with the profile already loaded: only the middleware is measured
+        authorized_user = SimpleNamespace(is_authenticated=True, access_profile=SimpleNamespace(is_authorized=True))
+        factory = RequestFactory()
+        scenarios = {
+            'exempt path (/api/auth/token/)': ('/api/auth/token/', authorized_user),
+            'exempt exact URL (/api/access/permissions/)': ('/api/access/permissions/', authorized_user),
+            'protected path, anonymous': ('/api/data/datacard-reports/', AnonymousUser()),
+            'protected path, authorized': ('/api/data/datacard-reports/', authorized_user),
+        }
+
+        self.stdout.write(f"{iterations:,} iterations per scenario\n")
+        self.stdout.write("Exemption matcher (ns/request): legacy vs compiled")
+        for label, (path, _user) in scenarios.items():
+            legacy = self.time_per_call(lambda path=path: legacy_is_exempt(path, exact_urls, prefixes), iterations)
+            compiled = self.time_per_call(lambda path=path: middleware.is_exempt(path), iterations)
+            self.stdout.write(f"  {label:<45} {legacy:8.0f} {compiled:8.0f}")
+
+        self.stdout.write("\nFull middleware call (ns/request)")
+        for label, (path, user) in scenarios.items():
+            request = factory.get(path)
+            request.user = user
+            self.stdout.write(f"  {label:<45} {self.time_per_call(lambda request=request: middleware(request), iterations):8.0f}")
+
+    @staticmethod
+    def time_per_call(func, iterations):
+        return min(timeit.repeat(func, number=iterations, repeat=3)) / iterations * 1e9
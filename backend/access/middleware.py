@@ -1,8 +1,14 @@
+import logging
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import JsonResponse
 from django.urls import reverse
 from django.conf import settings
 from .models import UserProfile
 
+logger = logging.getLogger(__name__)
+
 # Define paths that do NOT require the user to be authorized
 # (e.g., login, logout, admin, the permissions endpoint itself)
 AUTHORIZATION_EXEMPT_URLS = [
@@ -12,6 +18,7 @@ AUTHORIZATION_EXEMPT_URLS = [
     # Add specific URLs from social_django if used for login
     # Example: '/api/social/disconnect/',
     '/api/access/permissions/', # The endpoint we will create
+    '/metrics', # Prometheus scrape endpoint (restricted by its own permission class)
 ]
 
 # Add patterns if needed (like admin sub-pages)
@@ -25,42 +32,94 @@ AUTHORIZATION_EXEMPT_URL_PATTERNS = [
 ]
 
 
+def compile_exempt_matcher(exact_urls, prefixes):
+    """
+    Compile the exemption rules into a single regex: exact URLs must match the
+    whole path, prefixes only its beginning. Returns the bound `match` method.
+    """
+    alternatives = [f'{re.escape(url)}\\Z' for url in exact_urls]
+    alternatives += [re.escape(prefix) for prefix in prefixes if prefix]
+    if not alternatives:
+        return lambda path: None
+    return re.compile('|'.join(alternatives)).match
+
+
 class AuthorizationMiddleware:
+    """
+    Hybrid sync/async middleware: under ASGI it runs natively on the event loop
+    (async profile lookup) instead of being wrapped in a thread by Django.
+
+    The exemption rules can be overridden with the AUTHORIZATION_EXEMPT_URLS
+    and AUTHORIZATION_EXEMPT_URL_PATTERNS settings; they are compiled once, and
+    exempt paths are let through before the lazy request.user is evaluated.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_exempt = compile_exempt_matcher(
+            getattr(settings, 'AUTHORIZATION_EXEMPT_URLS', AUTHORIZATION_EXEMPT_URLS),
+            getattr(settings, 'AUTHORIZATION_EXEMPT_URL_PATTERNS', AUTHORIZATION_EXEMPT_URL_PATTERNS),
+        )
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        # Allow unauthenticated users to pass through (authentication handles them)
-        if not request.user or not request.user.is_authenticated:
+        if self.async_mode:
+            return self.__acall__(request)
+
+        # Check if the path is exempt from authorization check (without touching request.user)
+        if self.is_exempt(request.path_info):
             return self.get_response(request)
 
-        # Check if the path is exempt from authorization check
-        path = request.path_info
-        if any(path == url for url in AUTHORIZATION_EXEMPT_URLS) or \
-           any(path.startswith(pattern) for pattern in AUTHORIZATION_EXEMPT_URL_PATTERNS):
+        # Allow unauthenticated users to pass through (authentication handles them)
+        if not request.user or not request.user.is_authenticated:
             return self.get_response(request)
 
         # Check authorization status for non-exempt paths
         try:
             profile = request.user.access_profile
-            if profile.is_authorized:
-                # User is authorized, proceed with the request
-                return self.get_response(request)
-            else:
-                # User is authenticated but not authorized
-                # Return a specific response for the frontend to handle
-                return JsonResponse(
-                    {'detail': 'User is authenticated but not authorized to access this application.'},
-                    status=403 # Forbidden
-                )
         except UserProfile.DoesNotExist:
-            # Profile doesn't exist for this user (should ideally be created on user creation)            # Treat as unauthorized for now
-             return JsonResponse(
-                {'detail': 'User profile not found. Authorization pending.'},
-                status=403 # Forbidden
-            )
-
-        # Fallback removed: The try/except block should handle all cases
-        # for authenticated users on non-exempt paths. If execution reaches here,
-        # it implies an unexpected state, safer to implicitly deny or raise error.
-        # However, with current logic, this point should not be reachable for auth users on non-exempt paths.
+            return self.profile_not_found_response(request)
+        if not profile.is_authorized:
+            return self.not_authorized_response(request)
+        # User is authorized, proceed with the request
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_exempt(request.path_info):
+            return await self.get_response(request)
+
+        # request.auser() resolves the session user without blocking the event loop
+        user = await request.auser()
+        if not user or not user.is_authenticated:
+            return await self.get_response(request)
+
+        profile = await UserProfile.objects.filter(user=user).only('is_authorized').afirst()
+        if profile is None:
+            return self.profile_not_found_response(request)
+        if not profile.is_authorized:
+            return self.not_authorized_response(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def not_authorized_response(request):
+        logger.info("Request denied: user not authorized", extra={'path': request.path_info})
+        # User is authenticated but not authorized
+        # Return a specific response for the frontend to handle
+        return JsonResponse(
+            {'detail': 'User is authenticated but not authorized to access this application.'},
+            status=403 # Forbidden
+        )
+
+    @staticmethod
+    def profile_not_found_response(request):
+        logger.info("Request denied: user profile not found", extra={'path': request.path_info})
+        # Profile doesn't exist for this user (should ideally be created on user creation)
+        # Treat as unauthorized for now
+        return JsonResponse(
+            {'detail': 'User profile not found. Authorization pending.'},
+            status=403 # Forbidden
+        )
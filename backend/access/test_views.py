@@ -1,4 +1,5 @@
 import pytest
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
 from rest_framework import status
@@ -190,9 +191,9 @@ class TestUserPermissionsView:
         # ya que APIRequestFactory no configura esto automáticamente
         force_authenticate(request, user=authorized_user_with_profile)
         
-        # Llamar directamente a la vista
+        # Call the view directly (it is async: as_view() returns a coroutine)
         view = UserPermissionsView.as_view()
-        response = view(request)
+        response = async_to_sync(view)(request)
         
         # Verificar la respuesta
         assert response.status_code == status.HTTP_200_OK
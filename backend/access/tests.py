@@ -1,9 +1,16 @@
-from django.test import TestCase, Client
+from io import StringIO
+from types import SimpleNamespace
+
+from asgiref.sync import iscoroutinefunction
+from django.core.management import call_command
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.utils.functional import SimpleLazyObject
 from django.contrib.auth import get_user_model
 from django.urls import reverse, re_path, path
 from django.http import HttpResponse
 from django.conf import settings
 from django.contrib import admin
+from .middleware import AuthorizationMiddleware, compile_exempt_matcher
 from .models import UserProfile, Tab
 import factory
 from authentication.tests import UserFactory
@@ -218,6 +225,85 @@ class AuthorizationMiddlewareTest(TestCase):
         self.client.logout()
 
 
+@override_settings(ROOT_URLCONF=__name__)
+class AuthorizationMiddlewareAsyncTest(TestCase):
+    """The same checks through the ASGI handler, where the middleware runs in async mode."""
+
+    def setUp(self):
+        for username, is_authorized in (('auth_user_mw', True), ('unauth_user_mw', False)):
+            user = User.objects.create_user(username=username, password='password')
+            UserProfile.objects.create(user=user, is_authorized=is_authorized)
+        User.objects.create_user(username='noprofile_user_mw', password='password')
+        self.protected_url = reverse('test_protected_path')
+        self.auth_api_url = '/api/auth/some-endpoint/'
+
+    async def test_async_unauthorized_user_access_to_protected_url(self):
+        await self.async_client.alogin(username='unauth_user_mw', password='password')
+        response = await self.async_client.get(self.protected_url)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('not authorized', response.json().get('detail', '').lower())
+
+    async def test_async_authorized_user_access_to_protected_url(self):
+        await self.async_client.alogin(username='auth_user_mw', password='password')
+        response = await self.async_client.get(self.protected_url)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_async_no_profile_user_access_to_protected_url(self):
+        await self.async_client.alogin(username='noprofile_user_mw', password='password')
+        response = await self.async_client.get(self.protected_url)
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('profile not found', response.json().get('detail', '').lower())
+
+    async def test_async_exempt_urls_skip_profile_lookup(self):
+        await self.async_client.alogin(username='noprofile_user_mw', password='password')
+        response = await self.async_client.get(self.auth_api_url)
+        self.assertNotEqual(response.status_code, 403)
+
+    def test_middleware_is_hybrid(self):
+        async def async_get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(AuthorizationMiddleware(async_get_response)))
+        self.assertFalse(iscoroutinefunction(AuthorizationMiddleware(dummy_protected_view)))
+
+
+class AuthorizationExemptMatcherTest(TestCase):
+    """Tests for the precompiled exemption rules of AuthorizationMiddleware."""
+
+    def test_exact_urls_and_prefixes(self):
+        is_exempt = compile_exempt_matcher(['/api/access/permissions/'], ['/api/auth/', ''])
+        self.assertTrue(is_exempt('/api/access/permissions/'))
+        self.assertFalse(is_exempt('/api/access/permissions/extra/'))
+        self.assertTrue(is_exempt('/api/auth/token/'))
+        self.assertFalse(is_exempt('/api/data/orders/'))
+        self.assertFalse(compile_exempt_matcher([], [])('/api/auth/'))
+
+    def test_exempt_path_does_not_evaluate_user(self):
+        middleware = AuthorizationMiddleware(lambda request: HttpResponse('OK'))
+        request = RequestFactory().get('/api/auth/token/')
+        request.user = SimpleLazyObject(lambda: self.fail('request.user was evaluated'))
+        self.assertEqual(middleware(request).status_code, 200)
+
+    @override_settings(AUTHORIZATION_EXEMPT_URLS=[], AUTHORIZATION_EXEMPT_URL_PATTERNS=['/_test/'])
+    def test_rules_come_from_settings(self):
+        middleware = AuthorizationMiddleware(lambda request: HttpResponse('OK'))
+        unauthorized = SimpleNamespace(is_authenticated=True, access_profile=SimpleNamespace(is_authorized=False))
+        factory = RequestFactory()
+
+        request = factory.get('/_test/protected-path/')
+        request.user = unauthorized
+        self.assertEqual(middleware(request).status_code, 200)
+
+        request = factory.get('/api/access/permissions/')
+        request.user = unauthorized
+        self.assertEqual(middleware(request).status_code, 403)
+
+    def test_benchmark_command_runs(self):
+        out = StringIO()
+        call_command('benchmark_authorization_middleware', '--iterations', '10', stdout=out)
+        self.assertIn('legacy vs compiled', out.getvalue())
+
+
 # Placeholder for View tests (when views are added to access/views.py)
 class AccessViewTests(TestCase):
     """Tests for the views in the access app."""
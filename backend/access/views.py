@@ -1,7 +1,8 @@
-from rest_framework.views import APIView
+from adrf.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
+from monitoring.timing import timed
 from .models import UserProfile
 from .serializers import CompanySerializer, WarehouseSerializer, TabSerializer
 
@@ -13,12 +14,13 @@ class UserPermissionsView(APIView):
 
     Requires authentication.
     Returns the user's allowed companies, warehouses, and tabs.
+    Async view: profile and permission lookups use the async ORM.
     """
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         try:
-            profile = request.user.access_profile
+            profile = await UserProfile.objects.aget(user=request.user)
             # Check if the user is authorized (redundant if middleware is active, but good practice)
             if not profile.is_authorized:
                 return Response(
@@ -27,15 +29,19 @@ class UserPermissionsView(APIView):
                 )
 
             # Serialize the allowed objects
-            company_serializer = CompanySerializer(profile.allowed_companies.all(), many=True)
-            warehouse_serializer = WarehouseSerializer(profile.allowed_warehouses.all(), many=True)
-            tab_serializer = TabSerializer(profile.allowed_tabs.all(), many=True)
+            companies = [company async for company in profile.allowed_companies.all()]
+            warehouses = [warehouse async for warehouse in profile.allowed_warehouses.all()]
+            tabs = [tab async for tab in profile.allowed_tabs.all()]
+            company_serializer = CompanySerializer(companies, many=True)
+            warehouse_serializer = WarehouseSerializer(warehouses, many=True)
+            tab_serializer = TabSerializer(tabs, many=True)
 
-            permissions_data = {
-                'allowed_companies': company_serializer.data,
-                'allowed_warehouses': warehouse_serializer.data,
-                'allowed_tabs': tab_serializer.data,
-            }
+            with timed('serialize'):
+                permissions_data = {
+                    'allowed_companies': company_serializer.data,
+                    'allowed_warehouses': warehouse_serializer.data,
+                    'allowed_tabs': tab_serializer.data,
+                }
             return Response(permissions_data, status=status.HTTP_200_OK)
 
         except UserProfile.DoesNotExist:
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'authentication'
+
+    def ready(self):
+        from django.conf import settings
+
+        from project.logging_utils import make_non_blocking
+
+        # LOGGING has been applied by now; see make_non_blocking for why it is not done there
+        make_non_blocking(getattr(settings, 'NON_BLOCKING_LOGGERS', ()))
@@ -1,7 +1,12 @@
 # backend/authentication/middleware.py
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import HttpResponseForbidden
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 class AuthenticationSeparationMiddleware:
     """
     Middleware que garantiza que:
@@ -9,48 +14,79 @@ class AuthenticationSeparationMiddleware:
     - El Admin de Django (/admin/) solo use autenticación por sesiones y no JWT
     
     También se encarga de eliminar activamente la cookie de sesión para las rutas API.
+
+    It is a hybrid sync/async middleware: under ASGI it runs on the event loop
+    without Django wrapping it in a thread.
     """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        # The user is only needed for the debug messages
+        user = getattr(request, 'user', None) if logger.isEnabledFor(logging.DEBUG) else None
+        forbidden = self.check_request(request, user)
+        if forbidden is not None:
+            return forbidden
+
+        # Procesar la solicitud
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        user = (
+            await request.auser()
+            if logger.isEnabledFor(logging.DEBUG) and hasattr(request, 'auser') else None
+        )
+        forbidden = self.check_request(request, user)
+        if forbidden is not None:
+            return forbidden
+
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def check_request(self, request, user):
+        """Returns a 403 response if the request mixes JWT and session auth wrongly, or None."""
         # Obtener la ruta actual
         path = request.path_info
+        has_jwt = 'Authorization' in request.headers and request.headers['Authorization'].startswith('Bearer ')
 
         # 1. Para rutas de API (/api/), rechazar autenticación por sesión si hay JWT presente
         if path.startswith('/api/'):
-            # Si hay un header Authorization de tipo Bearer, es una solicitud de API con JWT
-            has_jwt = 'Authorization' in request.headers and request.headers['Authorization'].startswith('Bearer ')
-            
             # Si está presente el header JWT y también hay una sesión Django autenticada,
             # ignorar la sesión para esta solicitud
-            if has_jwt and hasattr(request, 'user') and request.user.is_authenticated:
+            if has_jwt and user is not None and user.is_authenticated:
                 # Verificamos en los headers si la autenticación viene por JWT
                 # La sesión no debe usarse para autenticar en la API
-                if settings.DEBUG:
-                    print(f"API request with JWT: {request.path}")
+                logger.debug("API request with JWT", extra={'path': request.path})
 
         # 2. Para el admin de Django (/admin/), rechazar solicitudes que intenten usar JWT
         elif path.startswith('/admin/'):
-            has_jwt = 'Authorization' in request.headers and request.headers['Authorization'].startswith('Bearer ')
-            
             # Si alguien intenta acceder al admin con un token JWT (sin sesión),
             # devolvemos un error
             if has_jwt and not request.COOKIES.get('sessionid'):
                 return HttpResponseForbidden("Admin site requires session authentication.")
             
-            if settings.DEBUG and request.user.is_authenticated:
-                print(f"Admin request with session auth: {request.path}")
+            if user is not None and user.is_authenticated:
+                logger.debug("Admin request with session auth", extra={'path': request.path})
 
-        # Procesar la solicitud
-        response = self.get_response(request)
-        
+        return None
+
+    def process_response(self, request, response):
         # Post-procesamiento: Eliminar activamente la cookie sessionid para rutas de API
         # excepto para las rutas relacionadas con oauth que necesitan sesión temporalmente
+        path = request.path_info
         if path.startswith('/api/') and not path.startswith('/api/auth/oauth'):
             if 'sessionid' in request.COOKIES:
-                if settings.DEBUG:
-                    print(f"Eliminando cookie sessionid para ruta API: {request.path}")
+                logger.debug("Removing sessionid cookie for API route", extra={'path': request.path})
                 
                 # Eliminar la cookie sessionid
                 response.delete_cookie(
@@ -59,4 +95,4 @@ class AuthenticationSeparationMiddleware:
                     path='/'
                 )
 
-        return response
\ No newline at end of file
+        return response
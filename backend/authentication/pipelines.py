@@ -1,9 +1,13 @@
 # backend/authentication/pipelines.py
+import logging
+
 from django.contrib.auth.models import User
 from social_django.models import UserSocialAuth
 from django.contrib.auth import login
 from .models import UserProfile
 
+logger = logging.getLogger(__name__)
+
 def clean_session(strategy, *args, **kwargs):
     """
     Pipeline function simplificada que ya no depende de la sesión.
@@ -19,7 +23,10 @@ def handle_already_associated_auth(backend, details, uid, user=None, *args, **kw
     social = UserSocialAuth.get_social_auth(backend.name, uid)
     
     if social and user and social.user != user:
-        print(f"[Auth Pipeline] Found already associated account, but with different user. Social user: {social.user.username}, Current user: {user.username}")
+        logger.info(
+            "Found already associated account, but with different user",
+            extra={'social_user': social.user.username, 'current_user': user.username},
+        )
         
         # Simplemente autenticar al usuario correcto especificando el backend
         strategy = backend.strategy
@@ -38,7 +45,7 @@ def handle_already_associated_auth(backend, details, uid, user=None, *args, **kw
             
             # Forzar login con el usuario asociado
             login(strategy.request, social.user)
-            print(f"[Auth Pipeline] Forzando login para el usuario correcto: {social.user.username}")
+            logger.info("Forcing login for the correct user", extra={'user': social.user.username})
             
         # Marcar para saltar la asociación
         return {'user': social.user, 'is_new': False, 'social': social}
@@ -97,7 +104,6 @@ def save_profile_details(backend, user: User, response, *args, **kwargs):
         user.save()
         user.profile.save()
             
-    # Para debugging
-    print(f"Perfil actualizado para usuario {user.username} desde proveedor {backend.name}")
+    logger.debug("Profile updated from OAuth provider", extra={'user': user.username, 'provider': backend.name})
     
     return {'user': user}
\ No newline at end of file
@@ -1,10 +1,24 @@
+import io
+import json
+import logging
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
 from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
 import factory
 
+from project.logging_utils import NonBlockingStreamHandler, SamplingFilter, StructuredFormatter
+
+from .middleware import AuthenticationSeparationMiddleware
 from .models import AuthUser
 from .serializers import UserSerializer, TokenResponseSerializer
 
@@ -191,4 +205,93 @@ def test_token_obtain_api_view_authenticated():
 # @pytest.mark.django_db
 # def test_oauth_success_redirect_flow():
 #     # ... (requiere simular estado de sesión post-OAuth)
-#     pass
\ No newline at end of file
+#     pass
+# --- Tests for AuthenticationSeparationMiddleware ---
+
+def test_authentication_separation_middleware_is_hybrid():
+    """The middleware is async if the rest of the chain is, and sync otherwise."""
+    async def async_get_response(request):
+        return HttpResponse()
+
+    assert iscoroutinefunction(AuthenticationSeparationMiddleware(async_get_response))
+    assert not iscoroutinefunction(AuthenticationSeparationMiddleware(lambda request: HttpResponse()))
+
+
+def test_authentication_separation_middleware_async_mode():
+    """In async mode the same rules apply to /admin/ and /api/."""
+    async def async_get_response(request):
+        return HttpResponse()
+
+    middleware = AuthenticationSeparationMiddleware(async_get_response)
+    factory = RequestFactory()
+
+    admin_request = factory.get('/admin/', HTTP_AUTHORIZATION='Bearer token')
+    assert async_to_sync(middleware)(admin_request).status_code == 403
+
+    api_request = factory.get('/api/data/test-data/')
+    api_request.COOKIES['sessionid'] = 'abc'
+    response = async_to_sync(middleware)(api_request)
+    assert response.status_code == 200
+    assert response.cookies['sessionid']['max-age'] == 0
+
+# --- Tests for structured logging (project/logging_utils.py) ---
+
+def test_structured_formatter_includes_extra_fields():
+    record = logging.makeLogRecord({
+        'name': 'authentication.views', 'levelno': logging.INFO, 'levelname': 'INFO',
+        'msg': 'Logging out user', 'user_id': 7,
+    })
+    payload = json.loads(StructuredFormatter().format(record))
+    assert payload['message'] == 'Logging out user'
+    assert payload['logger'] == 'authentication.views'
+    assert payload['user_id'] == 7
+
+
+def test_sampling_filter_never_drops_warnings():
+    sampled_out = SamplingFilter(rate=0)
+    assert not sampled_out.filter(logging.makeLogRecord({'levelno': logging.INFO}))
+    assert sampled_out.filter(logging.makeLogRecord({'levelno': logging.WARNING}))
+    assert SamplingFilter(rate=1).filter(logging.makeLogRecord({'levelno': logging.DEBUG}))
+
+
+def test_non_blocking_handler_writes_from_listener_thread():
+    stream = io.StringIO()
+    handler = NonBlockingStreamHandler(stream)
+    handler.setFormatter(StructuredFormatter())
+    logger = logging.getLogger('authentication.tests.queue')
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        logger.warning("Token was already blacklisted", extra={'jti': 'abc'})
+    finally:
+        logger.removeHandler(handler)
+        handler.close()  # Drains the queue
+    assert json.loads(stream.getvalue())['jti'] == 'abc'
+
+
+PRODUCTION_LOGGING_SCRIPT = textwrap.dedent("""
+    import io, json, logging, logging.config
+    from project.logging_utils import NonBlockingStreamHandler, make_non_blocking
+    from project.settings.production import LOGGING, NON_BLOCKING_LOGGERS
+
+    stream = io.StringIO()
+    LOGGING['handlers']['structured']['stream'] = stream
+    logging.config.dictConfig(LOGGING)
+    make_non_blocking(NON_BLOCKING_LOGGERS)
+    handlers = {handler for name in NON_BLOCKING_LOGGERS for handler in logging.getLogger(name).handlers}
+    assert len(handlers) == 1 and isinstance(handlers.pop(), NonBlockingStreamHandler), handlers
+    logging.getLogger('access.middleware').warning('Access denied', extra={'user_id': 7})
+    logging.shutdown()
+    print(json.loads(stream.getvalue())['user_id'])
+""")
+
+
+def test_production_logging_config_loads_and_queues_the_app_loggers():
+    # In a fresh interpreter (the one running the tests, see render.yaml PYTHON_VERSION):
+    # dictConfig must accept LOGGING and the app loggers must end up behind one queue
+    result = subprocess.run(
+        [sys.executable, '-c', PRODUCTION_LOGGING_SCRIPT],
+        cwd=Path(__file__).resolve().parent.parent, capture_output=True, text=True, timeout=60, check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '7'
@@ -1,9 +1,28 @@
 # backend/authentication/throttling.py
-from rest_framework.throttling import AnonRateThrottle
+from rest_framework import throttling
+
+from monitoring.metrics import THROTTLE_REJECTIONS
+
+
+class CountedThrottleMixin:
+    """Counts rejections in the throttle_rejections_total metric (by scope)."""
+
+    def throttle_failure(self):
+        THROTTLE_REJECTIONS.labels(self.scope).inc()
+        return super().throttle_failure()
+
+
+class AnonRateThrottle(CountedThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(CountedThrottleMixin, throttling.UserRateThrottle):
+    pass
+
 
 class LoginRateThrottle(AnonRateThrottle):
     """
     Limitador de tasa para intentos de login.
     Usa la configuración 'login' de DEFAULT_THROTTLE_RATES.
     """
-    scope = 'login'
\ No newline at end of file
+    scope = 'login'
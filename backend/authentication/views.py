@@ -10,6 +10,9 @@ from django.conf import settings
 from django.views.decorators.csrf import ensure_csrf_cookie
 from .throttling import LoginRateThrottle
 from django.contrib.auth import logout as auth_logout
+import logging
+
+logger = logging.getLogger(__name__)
 
 # --- Views ---
 class UserProfileAPIView(APIView):
@@ -73,7 +76,7 @@ def oauth_success_redirect(request):
         # 1. Verificar si el usuario está autenticado en el request
         if hasattr(request, 'user') and request.user.is_authenticated:
             user = request.user
-            print("[Auth] OAuth success for authenticated user")
+            logger.info("OAuth success for authenticated user", extra={'user_id': user.pk})
 
         # 2. Verificar si hubo un cambio de usuario durante la autenticación OAuth
         elif hasattr(request, 'session') and 'auth_switched_user_id' in request.session:
@@ -83,7 +86,7 @@ def oauth_success_redirect(request):
                 # Recuperar el usuario cambiado desde la sesión
                 switched_user_id = request.session['auth_switched_user_id']
                 user = User.objects.get(id=switched_user_id)
-                print("Cambio de usuario detectado durante OAuth")
+                logger.info("User switch detected during OAuth", extra={'user_id': user.pk})
                 
                 # No hacemos login aquí para evitar crear sesiones
                 
@@ -93,9 +96,9 @@ def oauth_success_redirect(request):
                         del request.session[key]
                 request.session.save()
             except User.DoesNotExist:
-                print("No se encontró usuario con ID especificado")
-            except Exception as e:
-                print(f"Error procesando cambio de usuario: {str(e)}")
+                logger.warning("No user found with the switched user ID")
+            except Exception:
+                logger.exception("Error processing user switch")
         
         # 3. Verificar user_id en la sesión (caso normal)
         elif hasattr(request, 'session') and 'user_id' in request.session:
@@ -104,33 +107,32 @@ def oauth_success_redirect(request):
             try:
                 user_id = request.session['user_id']
                 user = User.objects.get(id=user_id)
-                print("Usuario recuperado de la sesión")
+                logger.debug("User retrieved from session", extra={'user_id': user.pk})
                 
                 # No hacemos login aquí para evitar crear sesiones
                 
             except User.DoesNotExist:
-                print("No se encontró usuario con ID de sesión")
-            except Exception as e:
-                print(f"Error recuperando usuario de sesión: {str(e)}")
+                logger.warning("No user found with the session user ID")
+            except Exception:
+                logger.exception("Error retrieving user from session")
         
         # 4. Verificar si aún no hay usuario, intentar recuperar de social_auth
         if not user and hasattr(request, 'session') and 'partial_pipeline_token' in request.session:
             # Intentar recuperar usuario del pipeline parcial
-            print("Intentando recuperar usuario del pipeline parcial")
+            logger.debug("Trying to retrieve user from partial pipeline")
             from social_django.utils import load_strategy, load_partial
             strategy = load_strategy(request)
             partial = load_partial(strategy, request.session['partial_pipeline_token'])
             if partial and 'kwargs' in partial and 'user' in partial['kwargs']:
                 user = partial['kwargs']['user']
-                print("Usuario recuperado del pipeline parcial")
+                logger.debug("User retrieved from partial pipeline")
         
         # Si después de todo no hay usuario autenticado, redirigir a login
         if not user:
-            print("[Auth] No authenticated user found, redirecting to login")
+            logger.warning("No authenticated user found after OAuth, redirecting to login")
             return HttpResponseRedirect(f"{settings.FRONTEND_BASE_URL}/login?error=auth_failed")
 
         # El usuario está autenticado, procedemos a generar tokens JWT
-        print("OAuth success for user")
         
         # Generar CSRF token y tokens JWT
         csrf_token = get_token(request)
@@ -140,7 +142,7 @@ def oauth_success_redirect(request):
         provider = None
         if hasattr(user, 'social_auth') and user.social_auth.exists():
             provider = user.social_auth.first().provider
-            print(f"User authenticated via OAuth provider: {provider}")
+            logger.info("User authenticated via OAuth provider", extra={'user_id': user.pk, 'provider': provider})
 
         # Preparar URL de redirección con tokens
         redirect_url = f"{settings.FRONTEND_BASE_URL}/dashboard"
@@ -193,17 +195,15 @@ def oauth_success_redirect(request):
             path='/'
         )
         
-        if settings.DEBUG:
-            print("Redirecting authenticated user to dashboard with JWT only (no session)")
-            print(f"JWT cookies set with domain={cookie_domain}, path={cookie_path}, samesite={cookie_samesite}")
-            print("Eliminada cookie sessionid explícitamente")
+        logger.debug(
+            "Redirecting authenticated user to dashboard with JWT only (no session)",
+            extra={'cookie_domain': cookie_domain, 'cookie_path': cookie_path, 'cookie_samesite': cookie_samesite},
+        )
 
         return response
 
-    except Exception as e:
-        print(f"[Auth] Error in oauth_success_redirect: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("Error in oauth_success_redirect")
         return HttpResponseRedirect(f"{settings.FRONTEND_BASE_URL}/login?error=server_error")
 
 
@@ -217,7 +217,7 @@ class LogoutAPIView(APIView):
     def get(self, request):
         try:
             if request.user.is_authenticated:
-                print("[Auth] Logging out user")
+                logger.info("Logging out user", extra={'user_id': request.user.pk})
 
             refresh_token = None
             for cookie_name in ['refresh_token', 'refreshToken', 'jwt_refresh']:
@@ -256,27 +256,27 @@ class LogoutAPIView(APIView):
                                 if not BlacklistedToken.objects.filter(token=token).exists():
                                     BlacklistedToken.objects.create(token=token)
                                     blacklisted_count += 1
-                                    print("✅ Token blacklisteado exitosamente")
+                                    logger.debug("Token blacklisted", extra={'jti': token.jti})
                                 else:
-                                    print("⚠️ Token ya estaba blacklisteado")
-                            except Exception as e:
-                                print(f"Error al blacklistear token: {str(e)}")
+                                    logger.debug("Token was already blacklisted", extra={'jti': token.jti})
+                            except Exception:
+                                logger.warning("Error blacklisting token", exc_info=True)
                         
                         if blacklisted_count > 0:
-                            print(f"[Auth] Blacklisted {blacklisted_count} recent tokens")
+                            logger.info("Blacklisted recent tokens", extra={'count': blacklisted_count})
                             return self._finish_logout(request, True)
                         else:
-                            print("No se blacklisteó ningún token (ya estaban todos en blacklist)")
+                            logger.debug("No token blacklisted (all were already blacklisted)")
                     else:
-                        print("No se encontraron tokens activos recientes para el usuario (últimos 10 minutos)")
-                except Exception as e:
-                    print(f"[Auth] Error blacklisting tokens: {str(e)}")
+                        logger.debug("No recent active tokens found for the user (last 10 minutes)")
+                except Exception:
+                    logger.exception("Error blacklisting tokens")
             
             # 2. Manejar el blacklisting con más detalle
             blacklisted = False
             if refresh_token:
                 try:
-                    print("Intentando blacklist para refresh token...")
+                    logger.debug("Trying to blacklist refresh token")
                     
                     # Verificar que sea un refresh token antes de intentar parsearlo
                     import jwt
@@ -285,30 +285,33 @@ class LogoutAPIView(APIView):
                         decoded = jwt.decode(refresh_token, options={"verify_signature": False})
                         token_type = decoded.get('token_type', '')
                         if token_type != 'refresh':
-                            print(f"⚠️ El token no es un refresh token (tipo: {token_type}). No se intentará blacklistear.")
+                            logger.warning(
+                                "Token is not a refresh token; it will not be blacklisted",
+                                extra={'token_type': token_type},
+                            )
                             refresh_token = None
-                    except Exception as je:
-                        print(f"Error al decodificar token: {str(je)}")
+                    except Exception:
+                        logger.warning("Error decoding token", exc_info=True)
                     
                     if refresh_token:  # Solo continuar si aún tenemos un token válido
                         token = RefreshToken(refresh_token)
-                        print("Token parseado correctamente")
+                        logger.debug("Token parsed")
                         
                         # Forzar que la operación sea explícita y completa
                         token.blacklist()
-                        print("Blacklist realizado para token")
+                        logger.info("Refresh token blacklisted")
                         blacklisted = True
                 except TokenError as te:
-                    print(f"Error TokenError al procesar el refresh token: {str(te)}")
-                except Exception as e:
-                    print(f"Error inesperado al blacklistear token: {str(e)}")
+                    logger.warning("TokenError processing refresh token", extra={'error': str(te)})
+                except Exception:
+                    logger.exception("Unexpected error blacklisting token")
             else:
-                print("No se encontró refresh token para blacklistear")
+                logger.debug("No refresh token found to blacklist")
             
             return self._finish_logout(request, blacklisted)
             
-        except Exception as e:
-            print(f"[Auth] Global error during logout: {str(e)}")
+        except Exception:
+            logger.exception("Global error during logout")
             return Response({"detail": "Error during logout."}, status=500)
 
     def _finish_logout(self, request, blacklisted=False):
@@ -320,17 +323,17 @@ class LogoutAPIView(APIView):
         is_api_request = 'Authorization' in request.headers and request.headers['Authorization'].startswith('Bearer ')
         
         if is_api_request:
-            print("Procesando logout para API (JWT)")
+            logger.debug("Processing API (JWT) logout")
             # Para API solo nos interesa invalidar el token JWT
             response = Response({
                 "detail": "Successfully logged out.",
                 "blacklisted": blacklisted
             })
         else:
-            print("Procesando logout general (posiblemente desde admin)")
+            logger.debug("Processing general logout (possibly from admin)")
             # Si no es específicamente una petición con JWT, limpiar la sesión
             if request.user.is_authenticated:
-                print("Ejecutando Django logout para usuario")
+                logger.debug("Running Django logout for user", extra={'user_id': request.user.pk})
                 
                 # Limpiar la sesión antes de hacer logout
                 if hasattr(request, 'session'):
@@ -424,15 +427,14 @@ class LogoutAPIView(APIView):
                     dot_frontend = f".{frontend_domain}" if not frontend_domain.startswith('.') else frontend_domain
                     if dot_frontend not in domains:
                         domains.append(dot_frontend)
-            except Exception as e:
-                print(f"Error al parsear FRONTEND_BASE_URL: {str(e)}")
+            except Exception:
+                logger.warning("Error parsing FRONTEND_BASE_URL", exc_info=True)
         
         # También añadir dominio nulo y vacío
         domains.extend(['', None])
         domains = [d for d in domains if d is not None]
         domains = list(dict.fromkeys(domains))  # Eliminar duplicados
         
-        print(f"Eliminando cookies en dominios: {domains}")
         
         # Paths a limpiar
         paths = [api_path]
@@ -461,11 +463,14 @@ class LogoutAPIView(APIView):
         response['Pragma'] = 'no-cache'
         response['Expires'] = '0'
         
-        if settings.DEBUG:
-            print("Logout completado para usuario")
-            print(f"Token blacklisted: {blacklisted}")
-            print(f"Tipo de solicitud: {'API (JWT)' if is_api_request else 'Admin/Genérico'}")
-            print(f"Cookies eliminadas en dominios: {', '.join(str(d) for d in domains if d)}")
-            print(f"Paths limpiados: {', '.join(paths)}")
+        logger.debug(
+            "Logout completed for user",
+            extra={
+                'blacklisted': blacklisted,
+                'request_type': 'API (JWT)' if is_api_request else 'Admin/Generic',
+                'cookie_domains': [d for d in domains if d],
+                'cookie_paths': paths,
+            },
+        )
         
         return response
@@ -3,10 +3,18 @@
 set -o errexit
 
 # Install Python dependencies
-pip install -r requirements.txt
+# psycopg 3 (and the native pool) only with DB_POOL_MODE=django: once installed, Django prefers it to psycopg2
+if [ "${DB_POOL_MODE:-none}" = "django" ]; then
+    pip install -r requirements-pool.txt
+else
+    pip install -r requirements.txt
+fi
 
 # Collect static files
 python manage.py collectstatic --no-input
 
 # Run migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Create upcoming monthly partitions for data_orders
+python manage.py create_orders_partitions
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import TestData, DataCardReport, Orders
+from .models import TestData, DataCardReport, Orders, EtlCheckpoint, EtlRun
+from .admin_utils import CachedAllValuesFieldListFilter, EstimatedCountPaginator
 
 @admin.register(TestData)
 class TestDataAdmin(admin.ModelAdmin):
@@ -17,13 +18,18 @@ class DataCardReportAdmin(admin.ModelAdmin):
         'display_type_indicators', 'year', 'week'
     )
     list_filter = (
-        'warehouse_id', 'section', 'year', 'week', 
+        ('warehouse_id', CachedAllValuesFieldListFilter),
+        ('section', CachedAllValuesFieldListFilter),
+        ('year', CachedAllValuesFieldListFilter),
+        ('week', CachedAllValuesFieldListFilter),
         'is_integer', 'is_percentage', 'is_text', 
         'is_title', 'has_heat_colors'
     )
-    search_fields = ('warehouse', 'description')
+    search_fields = ('warehouse', 'description')  # Sped up by the model's trigram indexes
     ordering = ('-year', '-week', 'warehouse_id', 'section', 'list_order')
     list_per_page = 50  # Muestra 50 registros por página en lugar del valor predeterminado (100)
+    paginator = EstimatedCountPaginator  # Avoids a full COUNT(*) on large tables
+    show_full_result_count = False  # Avoids a second COUNT(*) when filtering
     
     fieldsets = [
         ('Identificadores', {
@@ -139,9 +145,26 @@ class OrdersAdmin(admin.ModelAdmin):
         'customer', 'warehouse', 'warehouse_city_state', 'order_number', 'shipment_number',
         'order_type', 'date', 'order_class', 'source_state', 'destination_state', 'year', 'month', 'month_name', 'quarter', 'week', 'day', 'fetched_at'
     )
-    list_filter = ('warehouse', 'order_type', 'date', 'source_state', 'destination_state', 'year', 'month', 'month_name', 'quarter', 'week', 'day')
-    search_fields = ('customer', 'order_number', 'shipment_number', 'warehouse', 'source_state', 'destination_state')
+    list_filter = (
+        ('warehouse', CachedAllValuesFieldListFilter),
+        ('order_type', CachedAllValuesFieldListFilter),
+        'date',
+        ('source_state', CachedAllValuesFieldListFilter),
+        ('destination_state', CachedAllValuesFieldListFilter),
+        ('year', CachedAllValuesFieldListFilter),
+        ('month', CachedAllValuesFieldListFilter),
+        ('month_name', CachedAllValuesFieldListFilter),
+        ('quarter', CachedAllValuesFieldListFilter),
+        ('week', CachedAllValuesFieldListFilter),
+        ('day', CachedAllValuesFieldListFilter),
+    )
+    # Only the trigram-indexed columns: one unindexed field in the OR scans every partition.
+    # Warehouse and states are narrowed with the filters.
+    search_fields = ('customer', 'order_number', 'shipment_number')
     ordering = ('-date', '-fetched_at')
+    date_hierarchy = 'date'
+    paginator = EstimatedCountPaginator  # Avoids a full COUNT(*) on large tables
+    show_full_result_count = False  # Avoids a second COUNT(*) when filtering
     readonly_fields = ('fetched_at',)
     fieldsets = [
         ('Order Info', {
@@ -151,3 +174,50 @@ class OrdersAdmin(admin.ModelAdmin):
             ]
         }),
     ]
+
+@admin.register(EtlCheckpoint)
+class EtlCheckpointAdmin(admin.ModelAdmin):
+    """Read-only: the rows are written by the ETL agent along with each batch."""
+    list_display = ('job', 'run_id', 'status', 'batches_committed', 'rows_committed', 'last_key', 'started_at', 'updated_at')
+    list_filter = ('job', 'status')
+    ordering = ('job',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(EtlRun)
+class EtlRunAdmin(admin.ModelAdmin):
+    """Read-only: history written by the ETL agent when each job ends."""
+    list_display = (
+        'started_at', 'job', 'stage', 'status', 'display_duration', 'rows_in', 'rows_out',
+        'display_rows_per_second', 'inserted', 'updated', 'skipped', 'display_peak_rss', 'run_id',
+    )
+    list_filter = ('job', 'stage', 'status', 'host')
+    search_fields = ('run_id', 'error')
+    ordering = ('-started_at', 'run_id', 'id')
+    date_hierarchy = 'started_at'
+    list_per_page = 100
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def display_duration(self, obj):
+        return f"{obj.duration_seconds:.1f}s"
+    display_duration.short_description = 'Duration'
+    display_duration.admin_order_field = 'duration_seconds'
+
+    def display_rows_per_second(self, obj):
+        return f"{obj.rows_per_second:,.0f}" if obj.rows_per_second is not None else "-"
+    display_rows_per_second.short_description = 'Rows/s'
+    display_rows_per_second.admin_order_field = 'rows_per_second'
+
+    def display_peak_rss(self, obj):
+        return f"{obj.peak_rss_bytes / 2**20:,.0f} MB" if obj.peak_rss_bytes is not None else "-"
+    display_peak_rss.short_description = 'Peak RSS'
+    display_peak_rss.admin_order_field = 'peak_rss_bytes'
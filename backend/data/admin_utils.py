@@ -0,0 +1,121 @@
+# backend/data/admin_utils.py
+"""
+Helpers that keep the admin of the `data` app fast as the historical tables
+(DataCardReport, Orders) grow.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.admin.filters import AllValuesFieldListFilter
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from monitoring.metrics import record_cache_lookup
+
+from .models import EtlRun
+
+FILTER_CHOICES_VERSION_KEY = 'admin-filter-choices-version:{}'
+
+
+def estimate_table_rows(db_table, using='default'):
+    """
+    Approximate row count from the planner statistics (pg_class.reltuples).
+    For partitioned tables it adds up the partitions, since the parent table
+    has no rows of its own and its estimate is usually empty.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+            FROM pg_class c
+            WHERE (c.oid = %s::regclass AND c.relkind <> 'p')
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %s::regclass)
+            """,
+            [db_table, db_table],
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids the full COUNT(*) on unfiltered changelists: if the
+    pg_class estimate exceeds ADMIN_ESTIMATED_COUNT_THRESHOLD the estimate is
+    used; with filters or on small tables the exact count is kept.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            threshold = getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000)
+            estimate = estimate_table_rows(queryset.model._meta.db_table, using=queryset.db)
+            if estimate >= threshold:
+                return estimate
+        return super().count
+
+
+def invalidate_filter_choices(sender, **kwargs):
+    """post_save/post_delete receiver: drops the cached filter choices of `sender`."""
+    key = FILTER_CHOICES_VERSION_KEY.format(sender._meta.label_lower)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:  # evicted between add() and incr()
+        cache.set(key, 1, None)
+
+
+def filter_choices_version(model, request=None):
+    """
+    Changes whenever the values of `model` may have changed: writes through the
+    ORM bump a per-model counter (invalidate_filter_choices, connected in
+    DataConfig.ready) and every ETL agent run, which writes with plain SQL,
+    ends by recording itself in data_etl_run.
+
+    With `request` the version is computed once per request and model, and
+    shared by all the filters of the changelist.
+    """
+    versions = getattr(request, '_filter_choices_versions', None)
+    if versions is None:
+        versions = {}
+        if request is not None:
+            request._filter_choices_versions = versions
+    label = model._meta.label_lower
+    if label not in versions:
+        counter = cache.get(FILTER_CHOICES_VERSION_KEY.format(label), 0)
+        latest_run = EtlRun.objects.aggregate(latest=Max('id'))['latest']
+        versions[label] = f'{counter}.{latest_run or 0}'
+    return versions[label]
+
+
+class CachedAllValuesFieldListFilter(AllValuesFieldListFilter):
+    """
+    AllValuesFieldListFilter that caches the distinct values of the column
+    (ADMIN_FILTER_CHOICES_CACHE_TIMEOUT seconds) instead of running a
+    SELECT DISTINCT on every page load.
+
+    The key includes the SQL of the choices query, so a ModelAdmin.get_queryset
+    restricted per user or request gets its own entry, and the data version of
+    the model (filter_choices_version), so writes invalidate it.
+    """
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        # self.lookup_choices is a lazy queryset: it has not run yet
+        choices_queryset = self.lookup_choices
+        try:
+            sql = str(choices_queryset.query)
+        except EmptyResultSet:
+            sql = ''
+        scope = hashlib.sha1(sql.encode()).hexdigest()[:16]
+        cache_key = (
+            f'admin-filter-choices:{model._meta.label_lower}:{field_path}:{scope}:'
+            f'{filter_choices_version(model, request)}'
+        )
+        choices = cache.get(cache_key)
+        record_cache_lookup('admin_filter_choices', hit=choices is not None)
+        if choices is None:
+            choices = list(choices_queryset)
+            cache.set(cache_key, choices, getattr(settings, 'ADMIN_FILTER_CHOICES_CACHE_TIMEOUT', 600))
+        self.lookup_choices = choices
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class DataConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'data'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from . import checks  # noqa: F401  (registers the system checks)
+
+        from .admin_utils import invalidate_filter_choices
+        from .models import DataCardReport, Orders
+
+        # Cached admin filter choices must see values written through the ORM
+        for model in (DataCardReport, Orders):
+            post_save.connect(invalidate_filter_choices, sender=model, dispatch_uid=f'filter-choices-save-{model.__name__}')
+            post_delete.connect(invalidate_filter_choices, sender=model, dispatch_uid=f'filter-choices-delete-{model.__name__}')
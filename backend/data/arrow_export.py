@@ -0,0 +1,107 @@
+# backend/data/arrow_export.py
+"""
+Columnar export (Arrow IPC stream / Parquet) for analytical clients.
+
+Imported lazily from data.exports so pyarrow is only loaded when someone asks
+for these formats. Rows are read with a server-side cursor and turned into
+RecordBatches of `batch_size` rows; the bytes of each batch are sent as soon
+as they are written.
+"""
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db import models
+
+# Django field to Arrow type mapping
+ARROW_FIELD_TYPES = {
+    models.AutoField: pa.int32(),
+    models.BigAutoField: pa.int64(),
+    models.IntegerField: pa.int32(),
+    models.BigIntegerField: pa.int64(),
+    models.FloatField: pa.float64(),
+    models.BooleanField: pa.bool_(),
+    models.DateField: pa.date32(),
+    models.DateTimeField: pa.timestamp('us', tz='UTC'),
+    models.CharField: pa.string(),
+    models.TextField: pa.string(),
+}
+
+
+def arrow_type_for_field(field):
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    # Walks the MRO so that BigAutoField does not fall into IntegerField, etc.
+    for klass in type(field).__mro__:
+        if klass in ARROW_FIELD_TYPES:
+            return ARROW_FIELD_TYPES[klass]
+    return pa.string()
+
+
+def arrow_schema(model, fields):
+    return pa.schema([
+        pa.field(name, arrow_type_for_field(model._meta.get_field(name)), nullable=model._meta.get_field(name).null)
+        for name in fields
+    ])
+
+
+class ChunkSink(io.RawIOBase):
+    """Write target that accumulates bytes until they are emptied with drain()."""
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_record_batches(queryset, fields, schema, chunk_size, batch_size):
+    rows = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        rows.append(row)
+        if len(rows) >= batch_size:
+            yield _record_batch(rows, schema)
+            rows = []
+    if rows:
+        yield _record_batch(rows, schema)
+
+
+def _record_batch(rows, schema):
+    columns = list(zip(*rows, strict=True))
+    arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema, strict=True)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _iter_with_writer(open_writer, queryset, fields, chunk_size, batch_size):
+    schema = arrow_schema(queryset.model, fields)
+    sink = ChunkSink()
+    writer = open_writer(sink, schema)
+    for batch in iter_record_batches(queryset, fields, schema, chunk_size, batch_size):
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+def iter_arrow_ipc(queryset, fields, chunk_size, batch_size):
+    return _iter_with_writer(pa.ipc.new_stream, queryset, fields, chunk_size, batch_size)
+
+
+def iter_parquet(queryset, fields, chunk_size, batch_size):
+    return _iter_with_writer(pq.ParquetWriter, queryset, fields, chunk_size, batch_size)
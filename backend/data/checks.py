@@ -0,0 +1,21 @@
+# backend/data/checks.py
+from django.core import checks
+from django.db import connections
+
+
+@checks.register()
+def check_server_side_cursors(app_configs, **kwargs):
+    """The streaming exports (data/exports.py) need server-side cursors for constant memory."""
+    warnings = []
+    for alias in connections:
+        if connections.settings[alias].get('DISABLE_SERVER_SIDE_CURSORS'):
+            warnings.append(checks.Warning(
+                f"Server-side cursors are disabled on database '{alias}' (DB_POOL_MODE=pgbouncer).",
+                hint=(
+                    "QuerySet.iterator() then fetches the whole result set, so the Orders and DataCard "
+                    "exports hold every exported row in memory. Keep exports small with filters, or use "
+                    "DB_POOL_MODE=django or none on the instances that serve them."
+                ),
+                id='data.W001',
+            ))
+    return warnings
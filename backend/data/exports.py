@@ -0,0 +1,154 @@
+# backend/data/exports.py
+"""
+Streaming export (CSV / NDJSON / Arrow IPC / Parquet) of large querysets.
+
+Rows are read with a server-side cursor (`.iterator(chunk_size=...)`) and sent
+in chunks, so the memory of the process stays constant whatever the size of
+the export. Under ASGI the chunks are handed to Django as an async iterator
+(see `aiter_chunks`): Django would otherwise consume a sync iterator with
+`list()` before sending the first byte.
+"""
+import csv
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'DATA_EXPORT_CHUNK_SIZE', 2000)
+# Rows per RecordBatch (and per row group in Parquet)
+EXPORT_ARROW_BATCH_SIZE = getattr(settings, 'DATA_EXPORT_ARROW_BATCH_SIZE', 10000)
+
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+EXPORT_EXTENSIONS = {
+    'csv': 'csv',
+    'ndjson': 'ndjson',
+    'arrow': 'arrows',
+    'parquet': 'parquet',
+}
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer: returns the line instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    lines = []
+    for row in queryset.values_list(*fields).iterator(chunk_size=chunk_size):
+        lines.append(writer.writerow(row))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def iter_ndjson(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines = []
+    for row in queryset.values(*fields).iterator(chunk_size=chunk_size):
+        lines.append(encoder.encode(row) + '\n')
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def iter_arrow(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    from .arrow_export import iter_arrow_ipc
+    return iter_arrow_ipc(queryset, fields, chunk_size, EXPORT_ARROW_BATCH_SIZE)
+
+
+def iter_parquet(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    from .arrow_export import iter_parquet as iter_parquet_batches
+    return iter_parquet_batches(queryset, fields, chunk_size, EXPORT_ARROW_BATCH_SIZE)
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'arrow': iter_arrow,
+    'parquet': iter_parquet,
+}
+
+
+def aiter_chunks(chunks):
+    """
+    Async iterator over the sync iterator `chunks`, for ASGI responses.
+
+    Every chunk is produced with `sync_to_async` in the request's sync thread,
+    the same one that holds the database connection of the server-side cursor.
+    """
+    iterator = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+
+    async def stream():
+        try:
+            while (chunk := await next_chunk(iterator, done)) is not done:
+                yield chunk
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                await sync_to_async(close, thread_sensitive=True)()
+
+    return stream()
+
+
+class StreamingExportMixin:
+    """
+    Mixin for DRF views that export `get_queryset()` as CSV, NDJSON,
+    Arrow IPC stream or Parquet.
+
+    The format is chosen with the `output` parameter (csv by default). `format`
+    is not used because DRF reserves it for content negotiation.
+    """
+    export_fields = ()
+    export_filename = 'export'
+    export_chunk_size = EXPORT_CHUNK_SIZE
+
+    def get_export_format(self):
+        export_format = self.request.query_params.get('output', 'csv').lower()
+        if export_format not in EXPORT_WRITERS:
+            raise ValidationError(
+                {'output': f"Unsupported export format. Use one of: {', '.join(EXPORT_WRITERS)}."}
+            )
+        return export_format
+
+    def stream_export(self, queryset):
+        export_format = self.get_export_format()
+        if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+            logger.warning(
+                "Server-side cursors are disabled: the %s export of %s loads the whole result set in memory.",
+                export_format, queryset.model._meta.label,
+            )
+        rows = EXPORT_WRITERS[export_format](
+            queryset, list(self.export_fields), chunk_size=self.export_chunk_size
+        )
+        if isinstance(self.request._request, ASGIRequest):
+            rows = aiter_chunks(rows)
+        response = StreamingHttpResponse(rows, content_type=EXPORT_CONTENT_TYPES[export_format])
+        filename = f"{self.export_filename}_{timezone.now():%Y%m%d_%H%M%S}.{EXPORT_EXTENSIONS[export_format]}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def get(self, request, *args, **kwargs):
+        return self.stream_export(self.get_queryset())
@@ -0,0 +1,137 @@
+# backend/data/management/commands/benchmark_orders_search.py
+import datetime
+import hashlib
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from data.models import Orders
+from data.partitions import add_months, ensure_month_partitions, month_start
+from data.search import SEARCH_DEFAULT_LIMIT, search_orders
+
+TRIGRAM_INDEXES = ('data_orders_number_trgm', 'data_orders_shipment_trgm', 'data_orders_customer_trgm')
+
+# Synthetic rows spread over the last two years
+BENCH_DAYS = 730
+BENCH_CUSTOMERS = 500
+
+
+def find_plan_values(node, key):
+    """Walks the EXPLAIN JSON plan and returns every value of `key`."""
+    found = []
+    if isinstance(node, dict):
+        if key in node:
+            found.append(node[key])
+        for value in node.values():
+            found.extend(find_plan_values(value, key))
+    elif isinstance(node, list):
+        for value in node:
+            found.extend(find_plan_values(value, key))
+    return found
+
+
+class Command(BaseCommand):
+    help = (
+        "Inserts a synthetic volume of Orders (2 million rows by default) inside a "
+        "transaction, times the /api/data/orders/search/ search and checks with EXPLAIN that the "
+        "trigram indexes are used. Everything is rolled back at the end; no data is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000, help="Synthetic rows to generate.")
+        parser.add_argument('--repeat', type=int, default=20, help="Repetitions per term for p50/p95.")
+        parser.add_argument(
+            '--term', action='append', dest='terms', default=None,
+            help="Term to search for (repeatable). Default: exact code, shipment fragment and customer.",
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help="Allows running the benchmark in production (IS_RENDER).",
+        )
+
+    def handle(self, *args, **options):
+        if getattr(settings, 'IS_RENDER', False) and not options['force']:
+            raise CommandError("Refusing to run the search benchmark in production without --force.")
+
+        missing = [name for name in TRIGRAM_INDEXES if not self.index_exists(name)]
+        if missing:
+            raise CommandError(
+                f"Missing trigram indexes: {', '.join(missing)}. Is the pg_trgm extension available?"
+            )
+
+        rows = options['rows']
+        terms = options['terms'] or [
+            f"BENCH-ORD-{rows // 2:09d}",
+            hashlib.md5(str(rows // 3).encode()).hexdigest()[2:8].upper(),
+            f"Customer {BENCH_CUSTOMERS - 7}",
+        ]
+
+        with transaction.atomic():
+            self.populate(rows)
+            for term in terms:
+                self.benchmark_term(term, options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write("Synthetic rows rolled back.")
+
+    def index_exists(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+            return cursor.fetchone()[0]
+
+    def populate(self, rows):
+        first_day = datetime.date.today() - datetime.timedelta(days=BENCH_DAYS)
+        ensure_month_partitions(month_start(first_day), add_months(month_start(datetime.date.today()), 1))
+
+        started = time.monotonic()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO data_orders (
+                    customer, warehouse, warehouse_city_state, order_number, shipment_number,
+                    order_type, date, order_class, fetched_at
+                )
+                SELECT
+                    'Customer ' || (i %% %s),
+                    'WH ' || (i %% 5),
+                    'Synthetic City - ST',
+                    'BENCH-ORD-' || lpad(i::text, 9, '0'),
+                    'BENCH-SHP-' || upper(substr(md5(i::text), 1, 12)),
+                    CASE WHEN i %% 2 = 0 THEN 'Inbound' ELSE 'Outbound' END,
+                    %s::date + (i %% %s),
+                    'Standard',
+                    NOW()
+                FROM generate_series(1, %s) AS i
+                """,
+                [BENCH_CUSTOMERS, first_day, BENCH_DAYS, rows],
+            )
+            cursor.execute('ANALYZE data_orders')
+        self.stdout.write(f"Inserted {rows:,} synthetic orders in {time.monotonic() - started:.1f}s.")
+
+    def benchmark_term(self, term, repeat):
+        queryset = search_orders(Orders.objects.all(), term)[:SEARCH_DEFAULT_LIMIT]
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+
+        used_indexes = sorted(set(find_plan_values(plan, 'Index Name')) & set(TRIGRAM_INDEXES))
+        node_types = sorted(set(find_plan_values(plan, 'Node Type')))
+
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) >= 2 else timings[0]
+
+        self.stdout.write(f"\nTerm: {term!r}")
+        self.stdout.write(f"  EXPLAIN execution time: {plan[0]['Execution Time']:.2f} ms")
+        self.stdout.write(f"  p50: {statistics.median(timings):.2f} ms  p95: {p95:.2f} ms  ({repeat} runs)")
+        self.stdout.write(f"  Plan nodes: {', '.join(node_types)}")
+        if used_indexes:
+            self.stdout.write(self.style.SUCCESS(f"  Trigram indexes used: {', '.join(used_indexes)}"))
+        else:
+            self.stdout.write(self.style.WARNING("  Trigram indexes NOT used (sequential scan)."))
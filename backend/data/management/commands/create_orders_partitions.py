@@ -0,0 +1,85 @@
+# backend/data/management/commands/create_orders_partitions.py
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from data.partitions import (
+    DEFAULT_DUPLICATES_LIMIT,
+    DEFAULT_MONTHS_AHEAD,
+    add_months,
+    ensure_month_partitions,
+    find_duplicate_orders,
+    month_start,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the monthly partitions of data_orders in advance "
+        "(from the current month up to --months-ahead months in the future)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=DEFAULT_MONTHS_AHEAD,
+            help=f"Number of future months to create (default {DEFAULT_MONTHS_AHEAD}).",
+        )
+        parser.add_argument(
+            '--from-month',
+            type=datetime.date.fromisoformat,
+            default=None,
+            help="First month to create, as YYYY-MM-DD (default: the current month).",
+        )
+        parser.add_argument(
+            '--skip-duplicate-check',
+            action='store_true',
+            help="Do not look for order/shipment keys stored under more than one date.",
+        )
+        parser.add_argument(
+            '--fail-on-duplicates',
+            action='store_true',
+            help="Exit with an error if duplicate order/shipment keys are found.",
+        )
+
+    def handle(self, *args, **options):
+        months_ahead = options['months_ahead']
+        if months_ahead < 0:
+            raise CommandError("--months-ahead must be zero or positive.")
+
+        first_month = month_start(options['from_month'] or datetime.date.today())
+        last_month = max(add_months(month_start(datetime.date.today()), months_ahead), first_month)
+
+        try:
+            with transaction.atomic():
+                created = ensure_month_partitions(first_month, last_month)
+        except DatabaseError as e:
+            raise CommandError(f"Error creating data_orders partitions: {e}") from e
+
+        for name in created:
+            self.stdout.write(f"Created partition {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"data_orders partitions ready from {first_month:%Y-%m} to {last_month:%Y-%m} "
+            f"({len(created)} created)."
+        ))
+
+        if not options['skip_duplicate_check']:
+            self.check_duplicates(options['fail_on_duplicates'])
+
+    def check_duplicates(self, fail):
+        # The unique constraint includes `date`: nothing but the ETL loader keeps an
+        # order/shipment in a single month, so other writers can create duplicates.
+        duplicates = find_duplicate_orders()
+        if not duplicates:
+            self.stdout.write("No duplicate order/shipment keys in data_orders.")
+            return
+        for order_number, shipment_number, dates in duplicates:
+            listed = ', '.join(f"{date:%Y-%m-%d}" for date in dates)
+            self.stderr.write(f"Duplicate order {order_number} / shipment {shipment_number}: {listed}")
+        more = " (listing limit reached)" if len(duplicates) >= DEFAULT_DUPLICATES_LIMIT else ""
+        message = f"{len(duplicates)} order/shipment keys are stored under more than one date{more}."
+        if fail:
+            raise CommandError(message)
+        self.stderr.write(self.style.WARNING(message))
@@ -0,0 +1,130 @@
+# Turns data_orders into a table range-partitioned by month on `date`.
+#
+# Trade-off: PostgreSQL requires unique constraints on a partitioned table to
+# include the partition key, so UNIQUE (order_number, shipment_number) becomes
+# UNIQUE (order_number, shipment_number, date). The same order/shipment under two
+# dates is no longer rejected by the database; the ETL loader removes the previous
+# row when an order changes date, and create_orders_partitions reports duplicates
+# left by any other writer.
+
+import datetime
+
+from django.db import migrations
+
+from data.partitions import (
+    DEFAULT_MONTHS_AHEAD,
+    ORDERS_DEFAULT_PARTITION,
+    ORDERS_TABLE,
+    add_months,
+    ensure_month_partitions,
+    month_start,
+)
+
+UNPARTITIONED_TABLE = f'{ORDERS_TABLE}_unpartitioned'
+PARTITIONED_TABLE = f'{ORDERS_TABLE}_partitioned'
+ID_SEQUENCE = f'{ORDERS_TABLE}_id_seq'
+
+
+def partition_orders(apps, schema_editor):
+    connection = schema_editor.connection
+    unique_name = schema_editor._create_index_name(
+        ORDERS_TABLE, ['order_number', 'shipment_number', 'date'], suffix='_uniq'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(date), COALESCE(MAX(id), 0) FROM "{ORDERS_TABLE}"')
+        first_date, max_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE "{ORDERS_TABLE}" RENAME TO "{UNPARTITIONED_TABLE}"')
+        cursor.execute(
+            f'CREATE TABLE "{ORDERS_TABLE}" '
+            f'(LIKE "{UNPARTITIONED_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE (date)'
+        )
+
+    # One partition per month from the oldest row to a few months ahead
+    current_month = month_start(datetime.date.today())
+    first_month = month_start(first_date) if first_date else current_month
+    ensure_month_partitions(
+        min(first_month, current_month),
+        add_months(current_month, DEFAULT_MONTHS_AHEAD),
+        connection=connection,
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE "{ORDERS_DEFAULT_PARTITION}" PARTITION OF "{ORDERS_TABLE}" DEFAULT'
+        )
+        cursor.execute(f'INSERT INTO "{ORDERS_TABLE}" SELECT * FROM "{UNPARTITIONED_TABLE}"')
+        # Also drops the IDENTITY sequence of the old table
+        cursor.execute(f'DROP TABLE "{UNPARTITIONED_TABLE}"')
+
+        # The PK and UNIQUE constraints must include the partition key
+        cursor.execute(f'CREATE SEQUENCE "{ID_SEQUENCE}" OWNED BY "{ORDERS_TABLE}".id')
+        cursor.execute("SELECT setval(%s, %s, %s)", [ID_SEQUENCE, max(max_id, 1), max_id > 0])
+        cursor.execute(
+            f'ALTER TABLE "{ORDERS_TABLE}" ALTER COLUMN id '
+            f"SET DEFAULT nextval('{ID_SEQUENCE}'::regclass)"
+        )
+        cursor.execute(
+            f'ALTER TABLE "{ORDERS_TABLE}" ADD CONSTRAINT "{ORDERS_TABLE}_pkey" PRIMARY KEY (id, date)'
+        )
+        cursor.execute(
+            f'ALTER TABLE "{ORDERS_TABLE}" ADD CONSTRAINT "{unique_name}" '
+            f'UNIQUE (order_number, shipment_number, date)'
+        )
+
+
+def unpartition_orders(apps, schema_editor):
+    connection = schema_editor.connection
+    unique_name = schema_editor._create_index_name(
+        ORDERS_TABLE, ['order_number', 'shipment_number'], suffix='_uniq'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM "{ORDERS_TABLE}"')
+        max_id = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE "{ORDERS_TABLE}" RENAME TO "{PARTITIONED_TABLE}"')
+        cursor.execute(
+            f'CREATE TABLE "{ORDERS_TABLE}" (LIKE "{PARTITIONED_TABLE}" INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'INSERT INTO "{ORDERS_TABLE}" SELECT * FROM "{PARTITIONED_TABLE}" ORDER BY id'
+        )
+        # The monthly partitions and the sequence are dropped with the parent table
+        cursor.execute(f'DROP TABLE "{PARTITIONED_TABLE}"')
+
+        cursor.execute(
+            f'ALTER TABLE "{ORDERS_TABLE}" ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY'
+        )
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, %s)",
+            [ORDERS_TABLE, max(max_id, 1), max_id > 0],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{ORDERS_TABLE}" ADD CONSTRAINT "{ORDERS_TABLE}_pkey" PRIMARY KEY (id)'
+        )
+        cursor.execute(
+            f'ALTER TABLE "{ORDERS_TABLE}" ADD CONSTRAINT "{unique_name}" '
+            f'UNIQUE (order_number, shipment_number)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0006_orders_month_name_alter_orders_month'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(partition_orders, unpartition_orders),
+            ],
+            state_operations=[
+                migrations.AlterUniqueTogether(
+                    name='orders',
+                    unique_together={('order_number', 'shipment_number', 'date')},
+                ),
+            ],
+        ),
+    ]
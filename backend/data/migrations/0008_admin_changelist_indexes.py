@@ -0,0 +1,39 @@
+# Indexes that keep the DataCardReport and Orders admin changelists fast.
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from data.trigram import add_trigram_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0007_partition_orders_by_month'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='orders',
+            index=models.Index(fields=['date', 'fetched_at'], name='data_orders_date_fetched_idx'),
+        ),
+        add_trigram_index(
+            'datacardreport',
+            django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('warehouse'), name='gin_trgm_ops'
+                ),
+                name='data_dcr_warehouse_trgm',
+            ),
+        ),
+        add_trigram_index(
+            'datacardreport',
+            django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('description'), name='gin_trgm_ops'
+                ),
+                name='data_dcr_description_trgm',
+            ),
+        ),
+    ]
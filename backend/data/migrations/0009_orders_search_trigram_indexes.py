@@ -0,0 +1,44 @@
+# Trigram indexes for the Orders search by partial code or customer.
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+from data.trigram import add_trigram_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0008_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        add_trigram_index(
+            'orders',
+            django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('order_number'), name='gin_trgm_ops'
+                ),
+                name='data_orders_number_trgm',
+            ),
+        ),
+        add_trigram_index(
+            'orders',
+            django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('shipment_number'), name='gin_trgm_ops'
+                ),
+                name='data_orders_shipment_trgm',
+            ),
+        ),
+        add_trigram_index(
+            'orders',
+            django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('customer'), name='gin_trgm_ops'
+                ),
+                name='data_orders_customer_trgm',
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.7 on 2026-10-19 18:25
+# Numeric columns alongside the DataCard text values, with a backfill of the existing rows.
+
+from django.db import migrations, models
+
+# Same rules as etl_agent/transformers/datacard.py: commas, '%' and spaces are ignored,
+# and only numbers that fit in NUMERIC(18, 4) are accepted.
+NUMERIC_PATTERN = r'^-?[0-9]{1,14}(\.[0-9]+)?$'
+
+
+def numeric_expression(column):
+    cleaned = f"regexp_replace({column}, '[[:space:],%]', '', 'g')"
+    return (
+        f"CASE WHEN NOT is_text AND {cleaned} ~ '{NUMERIC_PATTERN}' "
+        f"THEN {cleaned}::numeric(18, 4) END"
+    )
+
+
+BACKFILL_SQL = "UPDATE data_datacardreport SET " + ", ".join(
+    [f"day{day}_number = {numeric_expression(f'day{day}_value')}" for day in range(1, 8)]
+    + [f"total_number = {numeric_expression('total')}"]
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0009_orders_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day1_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day2_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day3_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day4_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day5_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day6_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='day7_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.AddField(
+            model_name='datacardreport',
+            name='total_number',
+            field=models.DecimalField(blank=True, decimal_places=4, max_digits=18, null=True),
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0010_datacardreport_numeric_values'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtlCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=50, unique=True)),
+                ('run_id', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed')], max_length=20)),
+                ('batches_committed', models.IntegerField(default=0)),
+                ('rows_committed', models.IntegerField(default=0)),
+                ('first_key', models.JSONField(blank=True, null=True)),
+                ('last_key', models.JSONField(blank=True, null=True)),
+                ('started_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'ETL Checkpoint',
+                'verbose_name_plural': 'ETL Checkpoints',
+                'db_table': 'data_etl_checkpoint',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data', '0011_etl_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EtlRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=100)),
+                ('job', models.CharField(max_length=50)),
+                ('stage', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('success', 'Success'), ('failed', 'Failed')], max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('duration_seconds', models.FloatField()),
+                ('rows_in', models.IntegerField(blank=True, null=True)),
+                ('rows_out', models.IntegerField(blank=True, null=True)),
+                ('rows_per_second', models.FloatField(blank=True, null=True)),
+                ('inserted', models.IntegerField(blank=True, null=True)),
+                ('updated', models.IntegerField(blank=True, null=True)),
+                ('skipped', models.IntegerField(blank=True, null=True)),
+                ('peak_rss_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('host', models.CharField(blank=True, default='', max_length=255)),
+            ],
+            options={
+                'verbose_name': 'ETL Run',
+                'verbose_name_plural': 'ETL Runs',
+                'db_table': 'data_etl_run',
+                'indexes': [models.Index(fields=['job', 'stage', '-started_at'], name='data_etl_run_job_stage_idx'), models.Index(fields=['run_id'], name='data_etl_run_run_id_idx')],
+            },
+        ),
+    ]
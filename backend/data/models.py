@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 class TestData(models.Model):
     order_id = models.IntegerField(primary_key=True)  # matches 'id' from SQL Server
@@ -41,6 +43,16 @@ class DataCardReport(models.Model):
     # Valor total (suma de los días)
     total = models.CharField(max_length=255, null=True, blank=True)  # Agregado campo total
     
+    # Values already parsed as numbers (filled by the ETL on load; NULL if the value is text)
+    day1_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    day2_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    day3_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    day4_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    day5_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    day6_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    day7_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+    total_number = models.DecimalField(max_digits=18, decimal_places=4, null=True, blank=True)
+
     # Indicadores de tipo
     is_integer = models.BooleanField(default=False)  # Basado en tInt
     is_percentage = models.BooleanField(default=False)  # Basado en totalPorc
@@ -61,6 +73,9 @@ class DataCardReport(models.Model):
         indexes = [
             models.Index(fields=['warehouse_id']),
             models.Index(fields=['year', 'week']),
+            # Trigram indexes for the icontains searches of the admin (UPPER(col) LIKE ...)
+            GinIndex(OpClass(Upper('warehouse'), name='gin_trgm_ops'), name='data_dcr_warehouse_trgm'),
+            GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='data_dcr_description_trgm'),
         ]
         verbose_name = 'DataCard Report'
         verbose_name_plural = 'DataCard Reports'
@@ -70,6 +85,17 @@ class DataCardReport(models.Model):
 
 
 class Orders(models.Model):
+    """
+    Orders/shipments extracted from MSSQL.
+
+    data_orders is range-partitioned by month on `date` (see data/partitions.py
+    and the create_orders_partitions command), so its unique constraint must
+    include `date`. Trade-off: the database only guarantees one row per
+    (order_number, shipment_number, date). Keeping an order/shipment in a single
+    month is up to the ETL loader (delete-then-upsert in load_orders_batches);
+    any other writer (admin, shell, a new loader) can create the same key under
+    another date. create_orders_partitions reports such duplicates.
+    """
     customer = models.CharField(max_length=255)
     warehouse = models.CharField(max_length=255)
     warehouse_city_state = models.CharField(max_length=255)
@@ -92,7 +118,94 @@ class Orders(models.Model):
         db_table = 'data_orders'
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
-        unique_together = ('order_number', 'shipment_number')
+        unique_together = ('order_number', 'shipment_number', 'date')
+        indexes = [
+            # Default admin ordering (-date, -fetched_at) and date_hierarchy
+            models.Index(fields=['date', 'fetched_at'], name='data_orders_date_fetched_idx'),
+            # Trigram indexes for the partial code search (data/search.py)
+            GinIndex(OpClass(Upper('order_number'), name='gin_trgm_ops'), name='data_orders_number_trgm'),
+            GinIndex(OpClass(Upper('shipment_number'), name='gin_trgm_ops'), name='data_orders_shipment_trgm'),
+            GinIndex(OpClass(Upper('customer'), name='gin_trgm_ops'), name='data_orders_customer_trgm'),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number} - {self.customer} - {self.order_type}"
+
+
+class EtlCheckpoint(models.Model):
+    """
+    Progress of the latest load of each ETL agent job (etl_agent/loaders/checkpoints.py).
+    The agent updates it in the same transaction as each batch it commits, so it
+    always reflects exactly what is already visible in the target; `--resume`
+    continues from `last_key`.
+    """
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+    ]
+
+    job = models.CharField(max_length=50, unique=True)
+    run_id = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    batches_committed = models.IntegerField(default=0)
+    rows_committed = models.IntegerField(default=0)
+    # Keys (extract order) of the first and last rows of the last committed batch
+    first_key = models.JSONField(null=True, blank=True)
+    last_key = models.JSONField(null=True, blank=True)
+    started_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'data_etl_checkpoint'
+        verbose_name = 'ETL Checkpoint'
+        verbose_name_plural = 'ETL Checkpoints'
+
+    def __str__(self):
+        return f"{self.job} - {self.run_id} - {self.status}"
+
+
+class EtlRun(models.Model):
+    """
+    Run history of the ETL agent (etl_agent/runs.py): one row per stage
+    (extract, transform, load, spool...) of each run of a job, plus a 'total'
+    row with the full duration and the status of the job.
+    """
+    STATUS_SUCCESS = 'success'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_SUCCESS, 'Success'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    STAGE_TOTAL = 'total'
+
+    run_id = models.CharField(max_length=100)
+    job = models.CharField(max_length=50)
+    stage = models.CharField(max_length=20)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    started_at = models.DateTimeField()
+    duration_seconds = models.FloatField()
+    rows_in = models.IntegerField(null=True, blank=True)
+    rows_out = models.IntegerField(null=True, blank=True)
+    rows_per_second = models.FloatField(null=True, blank=True)
+    inserted = models.IntegerField(null=True, blank=True)
+    updated = models.IntegerField(null=True, blank=True)
+    skipped = models.IntegerField(null=True, blank=True)
+    # Peak resident memory of the agent process at the end of the stage
+    peak_rss_bytes = models.BigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    host = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        db_table = 'data_etl_run'
+        verbose_name = 'ETL Run'
+        verbose_name_plural = 'ETL Runs'
+        indexes = [
+            # History of a job/stage, to track performance regressions
+            models.Index(fields=['job', 'stage', '-started_at'], name='data_etl_run_job_stage_idx'),
+            models.Index(fields=['run_id'], name='data_etl_run_run_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.job} - {self.stage} - {self.run_id} - {self.status}"
@@ -0,0 +1,111 @@
+# backend/data/partitions.py
+"""
+Helpers for the monthly partitioning of the data_orders table.
+
+data_orders is RANGE-partitioned on the `date` column, with one partition per
+month (data_orders_pYYYY_MM) and a DEFAULT partition that takes any row outside
+the months created.
+"""
+import datetime
+
+from django.db import connection as default_connection
+
+ORDERS_TABLE = 'data_orders'
+ORDERS_DEFAULT_PARTITION = f'{ORDERS_TABLE}_default'
+
+# Future months created in advance (migration and management command)
+DEFAULT_MONTHS_AHEAD = 3
+
+# Duplicate keys listed by create_orders_partitions
+DEFAULT_DUPLICATES_LIMIT = 20
+
+
+def month_start(value):
+    """Returns the first day of the month of the given date."""
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Adds (or subtracts) months to a date that is already a month start."""
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def month_partition_name(month, table=ORDERS_TABLE):
+    """Name of the monthly partition, e.g. data_orders_p2025_05."""
+    return f'{table}_p{month.year:04d}_{month.month:02d}'
+
+
+def partition_exists(cursor, name):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+    return cursor.fetchone()[0]
+
+
+def create_month_partition(cursor, month, table=ORDERS_TABLE):
+    """
+    Creates the partition of `table` for the month containing `month`.
+
+    If the DEFAULT partition already holds rows of that month, they are moved to
+    the new partition before attaching it (PostgreSQL rejects the ATTACH otherwise).
+    Returns True if the partition was created, False if it already existed.
+    """
+    start = month_start(month)
+    end = add_months(start, 1)
+    name = month_partition_name(start, table)
+    if partition_exists(cursor, name):
+        return False
+
+    default_name = f'{table}_default'
+    cursor.execute(
+        f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    )
+    if partition_exists(cursor, default_name):
+        cursor.execute(
+            f'WITH moved AS ('
+            f'DELETE FROM "{default_name}" WHERE date >= %s AND date < %s RETURNING *'
+            f') INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+    cursor.execute(
+        f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        [start, end],
+    )
+    return True
+
+
+def find_duplicate_orders(limit=DEFAULT_DUPLICATES_LIMIT, connection=None, table=ORDERS_TABLE):
+    """
+    Returns up to `limit` (order_number, shipment_number, dates) tuples for the
+    order/shipment keys stored under more than one date.
+
+    The unique constraint of the partitioned table must include `date`, so the
+    database no longer prevents these duplicates; only the ETL loader removes
+    the previous row when an order moves to another date.
+    """
+    connection = connection or default_connection
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT order_number, shipment_number, array_agg(date ORDER BY date) '
+            f'FROM "{table}" GROUP BY order_number, shipment_number HAVING COUNT(*) > 1 '
+            f'ORDER BY order_number, shipment_number LIMIT %s',
+            [limit],
+        )
+        return cursor.fetchall()
+
+
+def ensure_month_partitions(first_month, last_month, connection=None, table=ORDERS_TABLE):
+    """
+    Makes sure there is a partition for every month between `first_month` and
+    `last_month` (both included). Returns the list of partitions created.
+    """
+    connection = connection or default_connection
+    created = []
+    month = month_start(first_month)
+    last_month = month_start(last_month)
+    with connection.cursor() as cursor:
+        while month <= last_month:
+            if create_month_partition(cursor, month, table):
+                created.append(month_partition_name(month, table))
+            month = add_months(month, 1)
+    return created
@@ -0,0 +1,60 @@
+# backend/data/search.py
+"""
+Orders search by partial code (order_number, shipment_number) or customer.
+
+The filter uses `icontains`, which Django translates to UPPER(col::text) LIKE UPPER('%q%');
+the GIN trigram indexes on UPPER(col) (see Orders.Meta.indexes) let PostgreSQL
+resolve it without scanning the whole table. Trigrams need at least 3
+characters, hence the minimum length.
+"""
+from django.db import connections, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+
+SEARCH_MIN_LENGTH = 3
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Relevance rank: exact match > prefix > contained in the code > customer only
+RANK_EXACT = 3
+RANK_PREFIX = 2
+RANK_CODE = 1
+RANK_CUSTOMER = 0
+
+# PostgreSQL SQLSTATE of a query canceled by statement_timeout
+QUERY_CANCELED_SQLSTATE = '57014'
+
+
+def search_orders(queryset, term):
+    """Filters an Orders queryset for the given term and orders it by relevance."""
+    term = term.strip()
+    code_match = Q(order_number__icontains=term) | Q(shipment_number__icontains=term)
+    return (
+        queryset
+        .filter(code_match | Q(customer__icontains=term))
+        .annotate(rank=Case(
+            When(Q(order_number__iexact=term) | Q(shipment_number__iexact=term), then=Value(RANK_EXACT)),
+            When(Q(order_number__istartswith=term) | Q(shipment_number__istartswith=term), then=Value(RANK_PREFIX)),
+            When(code_match, then=Value(RANK_CODE)),
+            default=Value(RANK_CUSTOMER),
+            output_field=IntegerField(),
+        ))
+        .order_by('-rank', '-date', '-id')
+    )
+
+
+def fetch_with_timeout(queryset, timeout_ms):
+    """
+    Evaluates the queryset with a transaction-local statement_timeout, so a slow
+    search is canceled on the server instead of tying up the worker.
+    Raises django.db.OperationalError if the budget is exceeded.
+    """
+    with transaction.atomic(using=queryset.db):
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute("SELECT set_config('statement_timeout', %s, true)", [str(int(timeout_ms))])
+        return list(queryset)
+
+
+def is_query_canceled(exc):
+    """True if the OperationalError was caused by the statement_timeout running out."""
+    cause = exc.__cause__
+    return QUERY_CANCELED_SQLSTATE in (getattr(cause, 'pgcode', None), getattr(cause, 'sqlstate', None))
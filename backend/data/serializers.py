@@ -1,6 +1,6 @@
 # backend/data/serializers.py
 from rest_framework import serializers
-from .models import TestData, DataCardReport
+from .models import TestData, DataCardReport, Orders
 
 class TestDataSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,7 +16,21 @@ class DataCardReportSerializer(serializers.ModelSerializer):
             'section', 'list_order', 'description',
             'day1_value', 'day2_value', 'day3_value', 'day4_value', 
             'day5_value', 'day6_value', 'day7_value', 'total',
+            'day1_number', 'day2_number', 'day3_number', 'day4_number',
+            'day5_number', 'day6_number', 'day7_number', 'total_number',
             'is_integer', 'is_percentage', 'is_text',
             'is_title', 'has_heat_colors',
             'year', 'week', 'fetched_at'
         ]
+
+
+class OrderSearchResultSerializer(serializers.ModelSerializer):
+    """Serializer for the Orders search results."""
+    rank = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Orders
+        fields = [
+            'id', 'customer', 'warehouse', 'order_number', 'shipment_number',
+            'order_type', 'date', 'order_class', 'rank'
+        ]
@@ -1,2 +1,674 @@
+import datetime
+import json
+from io import BytesIO, StringIO
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+import pyarrow as pa
+import pyarrow.parquet as pq
+from prometheus_client import REGISTRY
+
+from django.apps import apps
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models.functions import Upper
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from access.models import Tab, UserProfile
+from authentication.tests import UserFactory
+from .admin_utils import CachedAllValuesFieldListFilter, EstimatedCountPaginator, estimate_table_rows
+from .checks import check_server_side_cursors
+from .models import DataCardReport, EtlCheckpoint, EtlRun, Orders
+from .partitions import (
+    ORDERS_DEFAULT_PARTITION,
+    add_months,
+    ensure_month_partitions,
+    find_duplicate_orders,
+    month_partition_name,
+    month_start,
+)
+from .trigram import add_trigram_index
+from .views import DataCardReportExportView, DataCardReportListView, DataCardTrendView
+
+
+def make_order(**kwargs):
+    defaults = {
+        'customer': 'ACME',
+        'warehouse': 'WH 10',
+        'warehouse_city_state': 'Boca Raton, FL',
+        'order_number': 'ORD-1',
+        'shipment_number': 'SHP-1',
+        'order_type': 'Outbound',
+        'date': datetime.date.today(),
+        'order_class': 'Standard',
+    }
+    defaults.update(kwargs)
+    return Orders.objects.create(**defaults)
+
+
+def make_datacard_report(**kwargs):
+    defaults = {
+        'warehouse_id': 1,
+        'warehouse': 'WH 10',
+        'section': 1,
+        'list_order': 1,
+        'description': 'ORDERS SHIPPED',
+        'day1_value': '10',
+        'total': '10',
+        'is_integer': True,
+        'year': 2025,
+        'week': 20,
+    }
+    defaults.update(kwargs)
+    return DataCardReport.objects.create(**defaults)
+
+
+def make_authorized_user(*tab_names):
+    user = UserFactory()
+    profile = UserProfile.objects.create(user=user, is_authorized=True)
+    for tab_name in tab_names:
+        tab, _ = Tab.objects.get_or_create(id_name=tab_name, defaults={'display_name': tab_name.title()})
+        profile.allowed_tabs.add(tab)
+    return user
+
+
+def streamed_content(response):
+    return b''.join(response.streaming_content).decode('utf-8')
+
+
+def partition_of_row(order_id):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tableoid::regclass::text FROM data_orders WHERE id = %s", [order_id])
+        return cursor.fetchone()[0]
+
+
+class OrdersPartitioningTest(TestCase):
+    """Tests for the monthly range partitioning of data_orders."""
+
+    def test_orders_table_is_partitioned_by_date(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_get_partkeydef('data_orders'::regclass)"
+            )
+            self.assertEqual(cursor.fetchone()[0], 'RANGE (date)')
+
+    def test_month_helpers(self):
+        self.assertEqual(month_start(datetime.date(2025, 5, 22)), datetime.date(2025, 5, 1))
+        self.assertEqual(add_months(datetime.date(2025, 11, 1), 3), datetime.date(2026, 2, 1))
+        self.assertEqual(add_months(datetime.date(2025, 1, 1), -1), datetime.date(2024, 12, 1))
+        self.assertEqual(month_partition_name(datetime.date(2025, 5, 1)), 'data_orders_p2025_05')
+
+    def test_current_month_row_goes_to_monthly_partition(self):
+        order = make_order()
+        expected = month_partition_name(month_start(datetime.date.today()))
+        self.assertEqual(partition_of_row(order.id), expected)
+
+    def test_unpartitioned_month_falls_back_to_default(self):
+        order = make_order(date=datetime.date(1999, 3, 15))
+        self.assertEqual(partition_of_row(order.id), ORDERS_DEFAULT_PARTITION)
+
+    def test_ensure_partitions_moves_rows_out_of_default(self):
+        order = make_order(date=datetime.date(1999, 3, 15))
+        created = ensure_month_partitions(datetime.date(1999, 2, 1), datetime.date(1999, 3, 1))
+        self.assertEqual(created, ['data_orders_p1999_02', 'data_orders_p1999_03'])
+        self.assertEqual(partition_of_row(order.id), 'data_orders_p1999_03')
+        # Idempotente
+        self.assertEqual(ensure_month_partitions(datetime.date(1999, 3, 1), datetime.date(1999, 3, 1)), [])
+
+    def test_same_order_allowed_on_different_dates(self):
+        make_order(date=datetime.date(1999, 1, 10))
+        make_order(date=datetime.date(1999, 2, 10))
+        self.assertEqual(Orders.objects.filter(order_number='ORD-1').count(), 2)
+
+    def test_create_orders_partitions_command(self):
+        out = StringIO()
+        call_command('create_orders_partitions', '--months-ahead', '6', stdout=out)
+        last_month = add_months(month_start(datetime.date.today()), 6)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [month_partition_name(last_month)])
+            self.assertIsNotNone(cursor.fetchone()[0])
+        self.assertIn('data_orders partitions ready', out.getvalue())
+
+    def test_duplicate_orders_across_dates_are_reported(self):
+        make_order(date=datetime.date(1999, 1, 10))
+        make_order(date=datetime.date(1999, 2, 10))
+        make_order(order_number='ORD-2', date=datetime.date(1999, 2, 10))
+        self.assertEqual(
+            find_duplicate_orders(),
+            [('ORD-1', 'SHP-1', [datetime.date(1999, 1, 10), datetime.date(1999, 2, 10)])],
+        )
+        out, err = StringIO(), StringIO()
+        call_command('create_orders_partitions', stdout=out, stderr=err)
+        self.assertIn('ORD-1 / shipment SHP-1: 1999-01-10, 1999-02-10', err.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('create_orders_partitions', '--fail-on-duplicates', stdout=out, stderr=err)
+
+    def test_partitions_command_without_duplicates(self):
+        make_order()
+        out = StringIO()
+        call_command('create_orders_partitions', stdout=out)
+        self.assertIn('No duplicate order/shipment keys', out.getvalue())
+
+
+class StreamingExportTest(TestCase):
+    """Tests for the streaming CSV/NDJSON export endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_orders_export_csv(self):
+        make_order(order_number='ORD-1', date=datetime.date(2025, 5, 2))
+        make_order(order_number='ORD-2', date=datetime.date(2025, 6, 2))
+        self.client.force_authenticate(user=make_authorized_user('orders'))
+
+        response = self.client.get('/api/data/orders/export/', {'date_from': '2025-05-01', 'date_to': '2025-05-31'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="orders_', response['Content-Disposition'])
+        lines = streamed_content(response).splitlines()
+        self.assertEqual(lines[0].split(',')[:6], ['id', 'customer', 'warehouse', 'warehouse_city_state', 'order_number', 'shipment_number'])
+        self.assertEqual(len(lines), 2)
+        self.assertIn('ORD-1', lines[1])
+
+    def test_orders_export_ndjson(self):
+        make_order(order_number='ORD-1', date=datetime.date(2025, 5, 2))
+        self.client.force_authenticate(user=make_authorized_user('orders'))
+
+        response = self.client.get('/api/data/orders/export/', {'output': 'ndjson'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in streamed_content(response).splitlines()]
+        self.assertEqual(rows[0]['order_number'], 'ORD-1')
+        self.assertEqual(rows[0]['date'], '2025-05-02')
+
+    def test_orders_export_requires_orders_tab(self):
+        self.client.force_authenticate(user=make_authorized_user('datacard'))
+        response = self.client.get('/api/data/orders/export/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_rejects_unknown_format_and_bad_dates(self):
+        self.client.force_authenticate(user=make_authorized_user('orders'))
+        self.assertEqual(self.client.get('/api/data/orders/export/', {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/data/orders/export/', {'date_from': 'yesterday'}).status_code, 400)
+
+    def test_datacard_export_uses_list_filters(self):
+        make_datacard_report(warehouse_id=1, week=20)
+        make_datacard_report(warehouse_id=12, week=20)
+        self.client.force_authenticate(user=make_authorized_user('datacard'))
+
+        response = self.client.get('/api/data/datacard-reports/export/', {'warehouse_id': 12, 'output': 'ndjson'})
+
+        self.assertEqual(response.status_code, 200)
+        rows = [json.loads(line) for line in streamed_content(response).splitlines()]
+        self.assertEqual([row['warehouse_id'] for row in rows], [12])
+
+    def test_orders_export_arrow_stream(self):
+        make_order(order_number='ORD-1', date=datetime.date(2025, 5, 2))
+        make_order(order_number='ORD-2', date=datetime.date(2025, 6, 2))
+        self.client.force_authenticate(user=make_authorized_user('orders'))
+
+        response = self.client.get('/api/data/orders/export/', {'output': 'arrow'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(b''.join(response.streaming_content)).read_all()
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.schema.field('date').type, pa.date32())
+        self.assertEqual(table.schema.field('id').type, pa.int64())
+        self.assertEqual(table.column('order_number').to_pylist(), ['ORD-1', 'ORD-2'])
+
+    def test_datacard_export_parquet(self):
+        make_datacard_report(warehouse_id=1, list_order=1)
+        make_datacard_report(warehouse_id=1, list_order=2, day1_value=None)
+        self.client.force_authenticate(user=make_authorized_user('datacard'))
+
+        response = self.client.get('/api/data/datacard-reports/export/', {'output': 'parquet'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('.parquet"', response['Content-Disposition'])
+        table = pq.read_table(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table.column('day1_value').to_pylist(), ['10', None])
+        self.assertEqual(table.schema.field('is_integer').type, pa.bool_())
+
+
+class ServerSideCursorsCheckTest(TestCase):
+    """Disabling server-side cursors (pgbouncer mode) is reported, since exports then buffer everything."""
+
+    def test_check_warns_when_cursors_are_disabled(self):
+        self.assertEqual(check_server_side_cursors(None), [])
+        with patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            self.assertEqual([warning.id for warning in check_server_side_cursors(None)], ['data.W001'])
+
+    def test_export_logs_a_warning_when_cursors_are_disabled(self):
+        make_order()
+        client = APIClient()
+        client.force_authenticate(user=make_authorized_user('orders'))
+        with (
+            patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}),
+            self.assertLogs('data.exports', level='WARNING') as logs,
+        ):
+            response = client.get('/api/data/orders/export/')
+            self.assertIn('ORD-1', streamed_content(response))
+        self.assertIn('loads the whole result set in memory', logs.output[0])
+
+
+class AdminChangelistPerformanceTest(TestCase):
+    """Tests for the estimated-count paginator and cached admin filters."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin_user)
+
+    def test_paginator_uses_estimate_for_unfiltered_queryset(self):
+        for list_order in range(5):
+            make_datacard_report(list_order=list_order)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE data_datacardreport')
+
+        with self.settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1):
+            paginator = EstimatedCountPaginator(DataCardReport.objects.order_by('id'), 2)
+            self.assertEqual(estimate_table_rows('data_datacardreport'), 5)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(paginator.count, 5)
+            self.assertFalse(any('COUNT(' in q['sql'] for q in queries.captured_queries))
+
+            filtered = EstimatedCountPaginator(DataCardReport.objects.filter(list_order__lt=2).order_by('id'), 2)
+            self.assertEqual(filtered.count, 2)
+
+    def test_estimate_sums_orders_partitions(self):
+        make_order(order_number='ORD-1')
+        make_order(order_number='ORD-2')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE data_orders')
+        self.assertEqual(estimate_table_rows('data_orders'), 2)
+
+    def test_filter_choices_are_cached_between_page_loads(self):
+        make_datacard_report(warehouse_id=1)
+        make_datacard_report(warehouse_id=12, list_order=2)
+        url = '/admin/data/datacardreport/'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('DISTINCT' in q['sql'] for q in queries.captured_queries))
+        self.assertContains(response, '?warehouse_id=12')
+
+    def test_filter_choices_lookups_are_counted(self):
+        make_datacard_report(warehouse_id=1)
+        labels = {'cache': 'admin_filter_choices'}
+
+        def lookups(result):
+            return REGISTRY.get_sample_value('cache_lookups_total', {**labels, 'result': result}) or 0
+
+        misses, hits = lookups('miss'), lookups('hit')
+        self.client.get('/admin/data/datacardreport/')
+        self.client.get('/admin/data/datacardreport/')
+        # One lookup per cached filter (warehouse_id, section, year, week) and page load
+        self.assertEqual(lookups('miss') - misses, 4)
+        self.assertEqual(lookups('hit') - hits, 4)
+
+    def test_filter_choices_version_is_read_once_per_page_load(self):
+        make_order()
+        self.client.get('/admin/data/orders/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/admin/data/orders/')
+        self.assertEqual(response.status_code, 200)
+        # Ten cached filters share a single data_etl_run lookup
+        self.assertEqual(sum('data_etl_run' in q['sql'] for q in queries.captured_queries), 1)
+
+    def test_orders_search_fields_are_trigram_indexed(self):
+        indexed = {'customer', 'order_number', 'shipment_number'}  # 0009_orders_search_trigram_indexes
+        self.assertLessEqual(set(admin.site._registry[Orders].search_fields), indexed)
+
+    def test_filter_choices_refresh_after_orm_write(self):
+        make_datacard_report(warehouse_id=1)
+        url = '/admin/data/datacardreport/'
+        self.assertNotContains(self.client.get(url), '?warehouse_id=27')
+        make_datacard_report(warehouse_id=27, list_order=2)
+        self.assertContains(self.client.get(url), '?warehouse_id=27')
+
+    def test_filter_choices_refresh_after_etl_run(self):
+        make_datacard_report(warehouse_id=1)
+        url = '/admin/data/datacardreport/'
+        self.assertNotContains(self.client.get(url), '?warehouse_id=27')
+        # The ETL agent writes with plain SQL (no signals) and then records its run
+        DataCardReport.objects.bulk_create([
+            DataCardReport(warehouse_id=27, warehouse='WH 27', section=1, list_order=1, description='X', year=2025, week=20)
+        ])
+        self.assertNotContains(self.client.get(url), '?warehouse_id=27')
+        EtlRun.objects.create(
+            run_id='r1', job='datacard', stage=EtlRun.STAGE_TOTAL, status=EtlRun.STATUS_SUCCESS,
+            started_at=datetime.datetime(2025, 5, 2, tzinfo=datetime.UTC), duration_seconds=1.0,
+        )
+        self.assertContains(self.client.get(url), '?warehouse_id=27')
+
+    def test_filter_choices_are_scoped_by_admin_queryset(self):
+        make_datacard_report(warehouse_id=1)
+        make_datacard_report(warehouse_id=12, list_order=2)
+        request = RequestFactory().get('/admin/data/datacardreport/')
+        field = DataCardReport._meta.get_field('warehouse_id')
+
+        def choices(queryset):
+            model_admin = Mock(get_queryset=Mock(return_value=queryset))
+            list_filter = CachedAllValuesFieldListFilter(
+                field, request, {}, DataCardReport, model_admin, 'warehouse_id'
+            )
+            return list(list_filter.lookup_choices)
+
+        self.assertEqual(choices(DataCardReport.objects.all()), [1, 12])
+        self.assertEqual(choices(DataCardReport.objects.filter(warehouse_id=12)), [12])
+
+    def test_trigram_index_migration_fails_without_pg_trgm(self):
+        operation = add_trigram_index(
+            'datacardreport', GinIndex(OpClass(Upper('warehouse'), name='gin_trgm_ops'), name='data_test_trgm')
+        )
+        create_index = operation.database_operations[0].code
+        with (
+            patch('data.trigram.pg_trgm_available', return_value=False),
+            self.settings(TRIGRAM_INDEXES_OPTIONAL=False),
+            connection.schema_editor() as schema_editor,
+            self.assertRaisesMessage(RuntimeError, 'pg_trgm'),
+        ):
+            create_index(apps, schema_editor)
+
+    def test_orders_changelist_with_date_hierarchy(self):
+        make_order(date=datetime.date(2025, 5, 2))
+        response = self.client.get('/admin/data/orders/', {'date__year': 2025})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'ORD-1')
+
+
+class OrdersSearchTest(TestCase):
+    """Tests for the ranked Orders search endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=make_authorized_user('orders'))
+
+    def test_results_are_ranked(self):
+        make_order(order_number='XABC123', shipment_number='S-1', customer='Other', date=datetime.date(2025, 5, 3))
+        make_order(order_number='ABC123', shipment_number='S-2', customer='Other', date=datetime.date(2025, 5, 1))
+        make_order(order_number='ABC1234', shipment_number='S-3', customer='Other', date=datetime.date(2025, 5, 2))
+        make_order(order_number='ZZZ999', shipment_number='S-4', customer='abc123 Corp', date=datetime.date(2025, 5, 4))
+        make_order(order_number='NOPE', shipment_number='S-5', customer='Nobody', date=datetime.date(2025, 5, 5))
+
+        response = self.client.get('/api/data/orders/search/', {'q': 'abc123'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [r['order_number'] for r in response.data['results']],
+            ['ABC123', 'ABC1234', 'XABC123', 'ZZZ999'],
+        )
+        self.assertEqual([r['rank'] for r in response.data['results']], [3, 2, 1, 0])
+        self.assertEqual(response.data['count'], 4)
+        self.assertIn('took_ms', response.data)
+
+    def test_shipment_number_match_and_limit(self):
+        for i in range(5):
+            make_order(order_number=f'ORD-{i}', shipment_number=f'LPN-77-{i}')
+        response = self.client.get('/api/data/orders/search/', {'q': 'lpn-77', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_search_validates_parameters(self):
+        self.assertEqual(self.client.get('/api/data/orders/search/', {'q': 'ab'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/data/orders/search/', {'q': 'abc', 'limit': 'x'}).status_code, 400)
+
+    def test_search_requires_orders_tab(self):
+        self.client.force_authenticate(user=make_authorized_user('datacard'))
+        self.assertEqual(self.client.get('/api/data/orders/search/', {'q': 'abc'}).status_code, 403)
+
+    def test_search_over_time_budget_returns_503(self):
+        make_order(order_number='ABC123')
+        with self.settings(ORDERS_SEARCH_TIMEOUT_MS=1), \
+                patch('data.views.fetch_with_timeout', side_effect=self._cancelled_query):
+            response = self.client.get('/api/data/orders/search/', {'q': 'abc'})
+        self.assertEqual(response.status_code, 503)
+
+    @staticmethod
+    def _cancelled_query(queryset, timeout_ms):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", [timeout_ms])
+            cursor.execute("SELECT pg_sleep(0.1)")
+
+
+class DataCardNumericValuesTest(TestCase):
+    """Tests for the pre-parsed numeric DataCard columns."""
+
+    def test_list_exposes_numeric_values(self):
+        make_datacard_report(day1_value='1,234', day1_number='1234', total='95.5%', total_number='95.5')
+        client = APIClient()
+        client.force_authenticate(user=make_authorized_user('datacard'))
+
+        response = client.get('/api/data/datacard-reports/', {'year': 2025, 'week': 20})
+
+        self.assertEqual(response.status_code, 200)
+        row = response.data[0]
+        self.assertEqual(row['day1_value'], '1,234')
+        self.assertEqual(row['day1_number'], '1234.0000')
+        self.assertIsNone(row['day2_number'])
+        self.assertEqual(row['total_number'], '95.5000')
+
+
+class DataCardTrendTest(TestCase):
+    """Tests for the week-over-week DataCard trend endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=make_authorized_user('datacard'))
+        for year, week, total in ((2024, 52, '90'), (2025, 1, '100'), (2025, 2, '110'), (2025, 3, '1,000')):
+            make_datacard_report(year=year, week=week, total=total, total_number=total.replace(',', ''))
+        make_datacard_report(year=2025, week=3, list_order=2, description='FILL RATE',
+                             total='95%', total_number='95', is_percentage=True)
+        make_datacard_report(warehouse_id=2, year=2025, week=3, total='5', total_number='5')
+
+    def test_trend_returns_aligned_series(self):
+        response = self.client.get('/api/data/datacard-reports/trend/', {'warehouse_id': 1, 'weeks': 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data['weeks'],
+            [{'year': 2025, 'week': 1}, {'year': 2025, 'week': 2}, {'year': 2025, 'week': 3}],
+        )
+        shipped, fill_rate = response.data['metrics']
+        self.assertEqual(shipped['values'], [100, 110, 1000])
+        self.assertEqual(shipped['totals'], ['100', '110', '1,000'])
+        # The change of the first week is computed against week 52 of the previous year
+        self.assertEqual(shipped['changes'], [10, 10, 890])
+        self.assertEqual(fill_rate['values'], [None, None, 95])
+        self.assertTrue(fill_rate['is_percentage'])
+
+    def test_trend_ends_at_requested_week(self):
+        response = self.client.get(
+            '/api/data/datacard-reports/trend/', {'warehouse_id': 1, 'weeks': 2, 'year': 2025, 'week': 1}
+        )
+        self.assertEqual(response.data['weeks'], [{'year': 2024, 'week': 52}, {'year': 2025, 'week': 1}])
+        self.assertEqual(len(response.data['metrics']), 1)
+
+    def test_trend_is_one_query_and_cached_until_next_load(self):
+        params = {'warehouse_id': 1}
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/data/datacard-reports/trend/', params)
+        trend_queries = [q['sql'] for q in queries.captured_queries if 'data_datacardreport' in q['sql']]
+        # MAX(fetched_at) for the cache key + the window query
+        self.assertEqual(len(trend_queries), 2)
+        self.assertIn('DENSE_RANK', trend_queries[1])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/data/datacard-reports/trend/', params)
+        self.assertFalse(any('DENSE_RANK' in q['sql'] for q in queries.captured_queries))
+
+        make_datacard_report(year=2025, week=4, total='7', total_number='7')
+        response = self.client.get('/api/data/datacard-reports/trend/', params)
+        self.assertEqual(response.data['weeks'][-1], {'year': 2025, 'week': 4})
+
+    def test_trend_validates_parameters(self):
+        url = '/api/data/datacard-reports/trend/'
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {'warehouse_id': 1, 'weeks': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'warehouse_id': 1, 'year': 2025}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'warehouse_id': 99}).data['metrics'], [])
+
+
+class DataCardBatchFetchTest(TestCase):
+    """Tests for fetching several warehouses in one DataCard request."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=make_authorized_user('datacard'))
+        for warehouse_id in (1, 12, 20):
+            make_datacard_report(warehouse_id=warehouse_id, warehouse=f'WH {warehouse_id}')
+            make_datacard_report(warehouse_id=warehouse_id, warehouse=f'WH {warehouse_id}', list_order=2)
+
+    def test_response_is_keyed_by_warehouse(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/api/data/datacard-reports/', {'year': 2025, 'week': 20, 'warehouse_id__in': '1,12,99'}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.data), ['1', '12', '99'])
+        self.assertEqual([row['list_order'] for row in response.data['12']], [1, 2])
+        self.assertEqual(response.data['99'], [])
+        self.assertEqual(
+            len([q for q in queries.captured_queries if 'data_datacardreport' in q['sql']]), 1
+        )
+
+    def test_repeated_parameter_and_validation(self):
+        response = self.client.get('/api/data/datacard-reports/?warehouse_id__in=1&warehouse_id__in=20')
+        self.assertEqual(list(response.data), ['1', '20'])
+        response = self.client.get('/api/data/datacard-reports/', {'warehouse_id__in': '1,x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_warehouse_response_is_unchanged(self):
+        response = self.client.get('/api/data/datacard-reports/', {'warehouse_id': 12})
+        self.assertEqual([row['warehouse_id'] for row in response.data], [12, 12])
+
+
+class AsyncReadEndpointsTest(TestCase):
+    """The read-only data endpoints are async views and work through the ASGI handler."""
+
+    def setUp(self):
+        user = make_authorized_user('datacard')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        make_datacard_report(warehouse_id=1)
+        make_datacard_report(warehouse_id=12)
+
+    def test_views_are_async(self):
+        self.assertTrue(DataCardReportListView.view_is_async)
+        self.assertTrue(DataCardTrendView.view_is_async)
+        self.assertFalse(DataCardReportExportView.view_is_async)
+
+    async def test_datacard_list_through_asgi(self):
+        response = await self.async_client.get(
+            '/api/data/datacard-reports/', {'warehouse_id__in': '1,12'}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()), ['1', '12'])
+
+    async def test_trend_through_asgi(self):
+        response = await self.async_client.get(
+            '/api/data/datacard-reports/trend/', {'warehouse_id': 1}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['weeks'], [{'year': 2025, 'week': 20}])
+
+    async def test_export_streams_asynchronously_through_asgi(self):
+        # A sync iterator would be buffered whole by Django's ASGI handler
+        response = await self.async_client.get(
+            '/api/data/datacard-reports/export/', {'output': 'ndjson'}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(sorted(row['warehouse_id'] for row in rows), [1, 12])
+
+    def test_export_stays_sync_through_wsgi(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=self.headers['Authorization'])
+        response = client.get('/api/data/datacard-reports/export/')
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(streamed_content(response).splitlines()), 3)
+
+
+class EtlCheckpointAdminTest(TestCase):
+    """The ETL checkpoints are visible in the admin but written only by the agent."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin_user)
+        now = datetime.datetime(2025, 5, 2, 10, 0, tzinfo=datetime.UTC)
+        EtlCheckpoint.objects.create(
+            job='orders', run_id='20250502T100000', status=EtlCheckpoint.STATUS_RUNNING,
+            batches_committed=3, rows_committed=15000, first_key=['ORD-1', 'SHP-1'], last_key=['ORD-9', 'SHP-9'],
+            started_at=now, updated_at=now,
+        )
+
+    def test_changelist_lists_checkpoints(self):
+        response = self.client.get('/admin/data/etlcheckpoint/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '20250502T100000')
+
+    def test_checkpoints_are_read_only(self):
+        self.assertEqual(self.client.get('/admin/data/etlcheckpoint/add/').status_code, 403)
+        checkpoint = EtlCheckpoint.objects.get()
+        response = self.client.post(
+            f'/admin/data/etlcheckpoint/{checkpoint.pk}/change/', {'job': 'orders', 'status': 'completed'}
+        )
+        self.assertEqual(response.status_code, 403)
+        checkpoint.refresh_from_db()
+        self.assertEqual(checkpoint.status, EtlCheckpoint.STATUS_RUNNING)
+
+
+class EtlRunAdminTest(TestCase):
+    """The ETL run history is listed in the admin with readable units and cannot be edited."""
+
+    def setUp(self):
+        self.admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin_user)
+        started_at = datetime.datetime(2025, 5, 2, 10, 0, tzinfo=datetime.UTC)
+        EtlRun.objects.create(
+            run_id='20250502T100000-abcd1234', job='orders', stage='load', status=EtlRun.STATUS_SUCCESS,
+            started_at=started_at, duration_seconds=12.34, rows_in=25000, rows_out=24000, rows_per_second=2025.9,
+            inserted=20000, updated=4000, skipped=1000, peak_rss_bytes=512 * 2**20, host='etl-01',
+        )
+        EtlRun.objects.create(
+            run_id='20250502T100000-abcd1234', job='orders', stage=EtlRun.STAGE_TOTAL, status=EtlRun.STATUS_FAILED,
+            started_at=started_at, duration_seconds=30.0, error='connection reset', host='etl-01',
+        )
+
+    def test_changelist_formats_measurements(self):
+        response = self.client.get('/admin/data/etlrun/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '12.3s')
+        self.assertContains(response, '2,026')
+        self.assertContains(response, '512 MB')
+        self.assertContains(response, '20250502T100000-abcd1234')
+
+    def test_filter_failed_runs(self):
+        response = self.client.get('/admin/data/etlrun/', {'status__exact': EtlRun.STATUS_FAILED})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), list(EtlRun.objects.filter(stage='total')))
+
+    def test_runs_are_read_only(self):
+        self.assertEqual(self.client.get('/admin/data/etlrun/add/').status_code, 403)
+        run = EtlRun.objects.get(stage='load')
+        response = self.client.post(f'/admin/data/etlrun/{run.pk}/change/', {'status': EtlRun.STATUS_FAILED})
+        self.assertEqual(response.status_code, 403)
+        run.refresh_from_db()
+        self.assertEqual(run.status, EtlRun.STATUS_SUCCESS)
@@ -0,0 +1,105 @@
+# backend/data/trends.py
+"""
+Week-over-week time series of the DataCard metrics of a warehouse.
+
+Everything is computed in a single query with window functions:
+DENSE_RANK() numbers the available weeks (from the most recent backwards) and
+LAG() brings the previous week's total of each metric (section, list_order),
+so the client no longer has to request and compare N weeks separately.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max, Q, Window
+from django.db.models.functions import DenseRank, Lag
+
+from monitoring.metrics import record_cache_lookup
+
+from .models import DataCardReport
+
+TREND_DEFAULT_WEEKS = 8
+TREND_MAX_WEEKS = 52
+
+
+def trend_queryset(warehouse_id, weeks, year=None, week=None):
+    """
+    Rows of the last `weeks` weeks with data for the warehouse, up to and
+    including (year, week) if given, annotated with `previous_total`.
+    """
+    queryset = DataCardReport.objects.filter(warehouse_id=warehouse_id)
+    if year is not None and week is not None:
+        queryset = queryset.filter(Q(year__lt=year) | Q(year=year, week__lte=week))
+
+    return (
+        queryset
+        .annotate(
+            week_rank=Window(DenseRank(), order_by=[F('year').desc(), F('week').desc()]),
+            previous_total=Window(
+                Lag('total_number'),
+                partition_by=[F('section'), F('list_order')],
+                order_by=[F('year').asc(), F('week').asc()],
+            ),
+        )
+        .filter(week_rank__lte=weeks)
+        .order_by('section', 'list_order', 'year', 'week')
+        .values(
+            'section', 'list_order', 'description', 'year', 'week', 'total', 'total_number',
+            'previous_total', 'is_integer', 'is_percentage', 'is_text', 'is_title',
+        )
+    )
+
+
+def build_trend(rows):
+    """Groups the rows by metric and aligns the values with the list of weeks."""
+    weeks = sorted({(row['year'], row['week']) for row in rows})
+    position = {key: index for index, key in enumerate(weeks)}
+
+    metrics = {}
+    for row in rows:
+        key = (row['section'], row['list_order'])
+        metric = metrics.get(key)
+        if metric is None:
+            metric = metrics[key] = {
+                'section': row['section'],
+                'list_order': row['list_order'],
+                'description': row['description'],
+                'is_integer': row['is_integer'],
+                'is_percentage': row['is_percentage'],
+                'is_text': row['is_text'],
+                'is_title': row['is_title'],
+                'values': [None] * len(weeks),
+                'totals': [None] * len(weeks),
+                'changes': [None] * len(weeks),
+            }
+        index = position[(row['year'], row['week'])]
+        metric['values'][index] = row['total_number']
+        metric['totals'][index] = row['total']
+        if row['total_number'] is not None and row['previous_total'] is not None:
+            metric['changes'][index] = row['total_number'] - row['previous_total']
+        # The most recent description is the one shown
+        metric['description'] = row['description']
+
+    return {
+        'weeks': [{'year': year, 'week': week} for year, week in weeks],
+        'metrics': list(metrics.values()),
+    }
+
+
+async def aget_trend(warehouse_id, weeks, year=None, week=None):
+    """
+    Returns the cached trend. The key includes the latest fetched_at of the
+    warehouse, so a new ETL load invalidates the cache without signals.
+    """
+    latest = (
+        await DataCardReport.objects.filter(warehouse_id=warehouse_id).aaggregate(latest=Max('fetched_at'))
+    )['latest']
+    if latest is None:
+        return {'weeks': [], 'metrics': []}
+
+    cache_key = f"datacard-trend:{warehouse_id}:{weeks}:{year}:{week}:{latest.isoformat()}"
+    trend = await cache.aget(cache_key)
+    record_cache_lookup('datacard_trend', hit=trend is not None)
+    if trend is None:
+        rows = [row async for row in trend_queryset(warehouse_id, weeks, year, week)]
+        trend = build_trend(rows)
+        await cache.aset(cache_key, trend, getattr(settings, 'DATACARD_TREND_CACHE_TIMEOUT', 3600))
+    return trend
@@ -0,0 +1,50 @@
+# backend/data/trigram.py
+"""
+Support for trigram (pg_trgm) indexes in the migrations of the `data` app.
+
+GIN indexes with gin_trgm_ops speed up the `icontains` searches of the admin
+and the API. If the server does not offer the extension (e.g. PostgreSQL without
+contrib) the migration fails: recording an index that was never created would
+leave the schema and the migration state out of sync, and later RemoveIndex or
+AlterField operations would fail. TRIGRAM_INDEXES_OPTIONAL=True skips them on
+purpose instead (the equivalent of faking the migration).
+"""
+import logging
+
+from django.conf import settings
+from django.db import migrations
+
+logger = logging.getLogger(__name__)
+
+
+def pg_trgm_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")
+        return cursor.fetchone()[0]
+
+
+def add_trigram_index(model_name, index, app_label='data'):
+    """
+    Migration operation equivalent to AddIndex for indexes that need pg_trgm:
+    creates the extension if needed and fails if the server does not offer it.
+    """
+    def create_index(apps, schema_editor):
+        if not pg_trgm_available(schema_editor.connection):
+            if settings.TRIGRAM_INDEXES_OPTIONAL:
+                logger.warning("pg_trgm is not available; index %s recorded but not created.", index.name)
+                return
+            raise RuntimeError(
+                f"The pg_trgm extension is not available on this PostgreSQL server, so index "
+                f"{index.name} cannot be created. Install the contrib extensions and run migrate "
+                f"again, or set TRIGRAM_INDEXES_OPTIONAL=True to skip the trigram indexes on purpose."
+            )
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.add_index(apps.get_model(app_label, model_name), index)
+
+    def drop_index(apps, schema_editor):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(index.name)}')
+
+    return migrations.SeparateDatabaseAndState(
+        database_operations=[migrations.RunPython(create_index, drop_index)],
+        state_operations=[migrations.AddIndex(model_name=model_name, index=index)],
+    )
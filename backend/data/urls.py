@@ -1,8 +1,19 @@
 # backend/data/urls.py
 from django.urls import path
-from .views import TestDataListView, DataCardReportListView
+from .views import (
+    TestDataListView,
+    DataCardReportListView,
+    DataCardReportExportView,
+    DataCardTrendView,
+    OrdersExportView,
+    OrdersSearchView,
+)
 
 urlpatterns = [
     path('test-data/', TestDataListView.as_view(), name='test-data-list'),
     path('datacard-reports/', DataCardReportListView.as_view(), name='datacard-reports-list'),
+    path('datacard-reports/export/', DataCardReportExportView.as_view(), name='datacard-reports-export'),
+    path('datacard-reports/trend/', DataCardTrendView.as_view(), name='datacard-reports-trend'),
+    path('orders/export/', OrdersExportView.as_view(), name='orders-export'),
+    path('orders/search/', OrdersSearchView.as_view(), name='orders-search'),
 ]
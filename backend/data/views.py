@@ -1,6 +1,26 @@
-from rest_framework import generics, permissions
-from .models import TestData, DataCardReport
-from .serializers import TestDataSerializer, DataCardReportSerializer
+import time
+
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from asgiref.sync import sync_to_async
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django.conf import settings
+from django.db import OperationalError
+from django.utils.dateparse import parse_date
+from monitoring.timing import timed
+from .models import TestData, DataCardReport, Orders
+from .serializers import TestDataSerializer, DataCardReportSerializer, OrderSearchResultSerializer
+from .exports import StreamingExportMixin
+from .search import (
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    SEARCH_MIN_LENGTH,
+    fetch_with_timeout,
+    is_query_canceled,
+    search_orders,
+)
+from .trends import TREND_DEFAULT_WEEKS, TREND_MAX_WEEKS, aget_trend
 from access.models import UserProfile # <--- Añadir esta línea
 
 
@@ -31,10 +51,11 @@ class HasTestingTabAccess(permissions.BasePermission):
              return False
 
 
-class TestDataListView(generics.ListAPIView):
+class TestDataListView(AsyncGenericAPIView):
     """
     API view to list TestData items.
     Requires authentication and access to the 'Testing' tab.
+    Async view: the query runs on the async ORM when served through ASGI.
     """
     queryset = TestData.objects.all().order_by('-fetched_at') # Ordenar por más reciente
     serializer_class = TestDataSerializer
@@ -43,6 +64,12 @@ class TestDataListView(generics.ListAPIView):
     # Opcional: Podrías añadir paginación si esperas muchos datos
     # pagination_class = YourPaginationClass
 
+    async def get(self, request, *args, **kwargs):
+        items = [item async for item in self.get_queryset()]
+        with timed('serialize'):
+            data = self.get_serializer(items, many=True).data
+        return Response(data)
+
 
 class HasDataCardAccess(permissions.BasePermission):
     """
@@ -62,18 +89,14 @@ class HasDataCardAccess(permissions.BasePermission):
             return False
 
 
-class DataCardReportListView(generics.ListAPIView):
+class DataCardReportFilterMixin:
     """
-    Vista API para listar datos de DataCard.
-    Requiere autenticación y acceso a la pestaña correspondiente.
+    Filters shared by the DataCard list and export.
     """
-    serializer_class = DataCardReportSerializer
-    permission_classes = [permissions.IsAuthenticated, HasDataCardAccess]
-    
     def get_queryset(self):
         """
-        Filtra los resultados según parámetros de URL y permisos del usuario.
-        Soporta filtrado por año, semana y warehouse_id.
+        Filters the results by URL parameters and user permissions.
+        Supports filtering by year, week, warehouse_id and warehouse_id__in.
         """
         # Obtener año y semana de los parámetros de la URL o usar valores predeterminados
         year = self.request.query_params.get('year')
@@ -90,6 +113,9 @@ class DataCardReportListView(generics.ListAPIView):
             queryset = queryset.filter(week=week)
         if warehouse_id:
             queryset = queryset.filter(warehouse_id=warehouse_id)
+        warehouse_ids = self.get_warehouse_ids()
+        if warehouse_ids is not None:
+            queryset = queryset.filter(warehouse_id__in=warehouse_ids)
             
         # Filtrar por warehouses permitidos (si se implementa luego)
         # profile = self.request.user.access_profile
@@ -98,3 +124,207 @@ class DataCardReportListView(generics.ListAPIView):
         
         # Ordenar resultados
         return queryset.order_by('warehouse_id', 'section', 'list_order')
+
+    def get_warehouse_ids(self):
+        """
+        List of warehouse_id__in, comma-separated (?warehouse_id__in=1,12,20)
+        or with the parameter repeated. None if not sent.
+        """
+        values = self.request.query_params.getlist('warehouse_id__in')
+        if not values:
+            return None
+        warehouse_ids = []
+        for value in ','.join(values).split(','):
+            value = value.strip()
+            if not value.isdigit():
+                raise ValidationError({'warehouse_id__in': 'Must be a comma-separated list of integers.'})
+            if int(value) not in warehouse_ids:
+                warehouse_ids.append(int(value))
+        return warehouse_ids
+
+
+
+class DataCardReportListView(DataCardReportFilterMixin, AsyncGenericAPIView):
+    """
+    API view to list DataCard data.
+    Requires authentication and access to the corresponding tab.
+    Async view: under ASGI the query does not block the worker.
+    """
+    serializer_class = DataCardReportSerializer
+    permission_classes = [permissions.IsAuthenticated, HasDataCardAccess]
+
+    async def get(self, request, *args, **kwargs):
+        """
+        With warehouse_id__in the response is grouped by warehouse
+        ({"1": [...], "12": [...]}) from a single query.
+        """
+        reports = [report async for report in self.get_queryset()]
+        with timed('serialize'):
+            rows = self.get_serializer(reports, many=True).data
+
+        warehouse_ids = self.get_warehouse_ids()
+        if warehouse_ids is None:
+            return Response(rows)
+
+        grouped = {str(warehouse_id): [] for warehouse_id in warehouse_ids}
+        for row in rows:
+            grouped[str(row['warehouse_id'])].append(row)
+        return Response(grouped)
+
+
+class DataCardReportExportView(StreamingExportMixin, DataCardReportFilterMixin, generics.GenericAPIView):
+    """
+    Streams the DataCard data as CSV or NDJSON.
+    Uses the same filters (year, week, warehouse_id, warehouse_id__in) and permissions as the list.
+    """
+    permission_classes = [permissions.IsAuthenticated, HasDataCardAccess]
+    export_fields = DataCardReportSerializer.Meta.fields
+    export_filename = 'datacard_reports'
+
+
+def parse_positive_int(params, name, default=None):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    if not value.isdigit() or int(value) < 1:
+        raise ValidationError({name: 'Must be a positive integer.'})
+    return int(value)
+
+
+class DataCardTrendView(AsyncGenericAPIView):
+    """
+    Week-over-week trend of the DataCard metrics of a warehouse.
+    Parameters: warehouse_id (required), weeks (default 8, maximum 52) and,
+    optionally, year + week as the last week of the series.
+    Each metric (section, list_order) comes with its values aligned with `weeks`.
+    """
+    permission_classes = [permissions.IsAuthenticated, HasDataCardAccess]
+
+    async def get(self, request, *args, **kwargs):
+        params = request.query_params
+        warehouse_id = parse_positive_int(params, 'warehouse_id')
+        if warehouse_id is None:
+            raise ValidationError({'warehouse_id': 'This parameter is required.'})
+        weeks = min(parse_positive_int(params, 'weeks', TREND_DEFAULT_WEEKS), TREND_MAX_WEEKS)
+        year = parse_positive_int(params, 'year')
+        week = parse_positive_int(params, 'week')
+        if (year is None) != (week is None):
+            raise ValidationError({'week': 'year and week must be provided together.'})
+
+        trend = await aget_trend(warehouse_id, weeks, year, week)
+        return Response({'warehouse_id': warehouse_id, **trend})
+
+
+class HasOrdersAccess(permissions.BasePermission):
+    """
+    Custom permission to only allow users with access to the 'Orders' tab.
+    """
+    message = 'You do not have permission to access this data.'
+    REQUIRED_TAB_ID_NAME = 'orders'
+
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return False
+
+        try:
+            profile = request.user.access_profile
+            return profile.allowed_tabs.filter(id_name=self.REQUIRED_TAB_ID_NAME).exists()
+        except (UserProfile.DoesNotExist, AttributeError):
+            return False
+
+
+ORDERS_EXPORT_FIELDS = [
+    'id', 'customer', 'warehouse', 'warehouse_city_state', 'order_number', 'shipment_number',
+    'order_type', 'date', 'order_class', 'source_state', 'destination_state',
+    'year', 'month', 'month_name', 'quarter', 'week', 'day', 'fetched_at',
+]
+
+
+class OrdersFilterMixin:
+    """
+    Filters shared by the Orders views.
+    Supports date_from/date_to (YYYY-MM-DD), year, month and warehouse.
+    The date filters let PostgreSQL prune monthly partitions.
+    """
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = Orders.objects.all()
+
+        for param, lookup in (('date_from', 'date__gte'), ('date_to', 'date__lte')):
+            value = params.get(param)
+            if value:
+                parsed = parse_date(value)
+                if parsed is None:
+                    raise ValidationError({param: 'Invalid date, expected YYYY-MM-DD.'})
+                queryset = queryset.filter(**{lookup: parsed})
+
+        for param in ('year', 'month'):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({param: 'Must be an integer.'})
+                queryset = queryset.filter(**{param: int(value)})
+
+        warehouse = params.get('warehouse')
+        if warehouse:
+            queryset = queryset.filter(warehouse=warehouse)
+
+        return queryset.order_by('date', 'id')
+
+
+class OrdersExportView(StreamingExportMixin, OrdersFilterMixin, generics.GenericAPIView):
+    """
+    Streams Orders as CSV or NDJSON.
+    Requires authentication and access to the 'Orders' tab.
+    """
+    permission_classes = [permissions.IsAuthenticated, HasOrdersAccess]
+    export_fields = ORDERS_EXPORT_FIELDS
+    export_filename = 'orders'
+
+
+class OrdersSearchView(OrdersFilterMixin, AsyncGenericAPIView):
+    """
+    Searches Orders by partial code (order_number / shipment_number) or customer.
+    Parameters: q (at least 3 characters), limit (default 20, maximum 100) and the
+    OrdersFilterMixin filters. Returns results ordered by relevance.
+
+    The query has a budget of ORDERS_SEARCH_TIMEOUT_MS; if it is exceeded,
+    PostgreSQL cancels it and a 503 is returned so the client narrows the search.
+    """
+    serializer_class = OrderSearchResultSerializer
+    permission_classes = [permissions.IsAuthenticated, HasOrdersAccess]
+
+    async def get(self, request, *args, **kwargs):
+        term = request.query_params.get('q', '').strip()
+        if len(term) < SEARCH_MIN_LENGTH:
+            raise ValidationError({'q': f'Search term must be at least {SEARCH_MIN_LENGTH} characters.'})
+
+        limit = request.query_params.get('limit', str(SEARCH_DEFAULT_LIMIT))
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValidationError({'limit': 'Must be a positive integer.'})
+        limit = min(int(limit), SEARCH_MAX_LIMIT)
+
+        queryset = search_orders(self.get_queryset(), term)[:limit]
+        timeout_ms = getattr(settings, 'ORDERS_SEARCH_TIMEOUT_MS', 2000)
+        started = time.monotonic()
+        try:
+            # statement_timeout lives in a transaction, which the async ORM does not support:
+            # the whole query runs in a thread
+            results = await sync_to_async(fetch_with_timeout)(queryset, timeout_ms)
+        except OperationalError as e:
+            if not is_query_canceled(e):
+                raise
+            return Response(
+                {'detail': 'Search exceeded its time budget. Please use a more specific term.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        took_ms = round((time.monotonic() - started) * 1000, 1)
+        with timed('serialize'):
+            rows = self.get_serializer(results, many=True).data
+        return Response({
+            'query': term,
+            'count': len(results),
+            'took_ms': took_ms,
+            'results': rows,
+        })
@@ -0,0 +1,11 @@
+# backend/gunicorn.conf.py
+# gunicorn loads it automatically from the working directory (see start.sh).
+import os
+
+
+def child_exit(server, worker):
+    # The counters of a finished worker are kept, but its "live" gauges are discarded
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,87 @@
+# backend/monitoring/metrics.py
+"""
+Prometheus metrics of the backend, exposed at /metrics.
+
+With several gunicorn workers each process has its own counters: if
+PROMETHEUS_MULTIPROC_DIR is set (start.sh prepares it before starting)
+prometheus_client writes the values to mmap files in that directory and
+/metrics aggregates them with MultiProcessCollector, whichever worker serves it.
+gunicorn.conf.py cleans up the files of finished workers.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from .timing import LATENCY_BUCKETS_MS
+
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by view, method and status code.', ['view', 'method', 'status'],
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request wall time by view.', ['view'],
+    buckets=[upper / 1000 for upper in LATENCY_BUCKETS_MS],
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries per request by view.', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, float('inf')),
+)
+REQUEST_DB_TIME = Counter(
+    'http_request_db_seconds_total', 'Time spent in SQL queries by view.', ['view'],
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Cache lookups by cache and result (hit/miss).', ['cache', 'result'],
+)
+THROTTLE_REJECTIONS = Counter(
+    'throttle_rejections_total', 'Requests rejected by a DRF throttle, by scope.', ['scope'],
+)
+
+
+def observe_request(view_name, method, status_code, total_seconds, timing):
+    REQUESTS.labels(view_name, method, str(status_code)).inc()
+    REQUEST_LATENCY.labels(view_name).observe(total_seconds)
+    REQUEST_DB_QUERIES.labels(view_name).observe(timing.query_count)
+    REQUEST_DB_TIME.labels(view_name).inc(timing.db_seconds)
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_LOOKUPS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+class TokenBlacklistCollector:
+    """Rows of the simplejwt.token_blacklist tables, read on every scrape."""
+
+    def collect(self):
+        from rest_framework_simplejwt.token_blacklist.models import (
+            BlacklistedToken,
+            OutstandingToken,
+        )
+
+        gauge = GaugeMetricFamily(
+            'token_blacklist_rows', 'Rows in the JWT token blacklist tables.', labels=['table'],
+        )
+        gauge.add_metric([OutstandingToken._meta.db_table], OutstandingToken.objects.count())
+        gauge.add_metric([BlacklistedToken._meta.db_table], BlacklistedToken.objects.count())
+        yield gauge
+
+
+def render_metrics():
+    """Returns (body, content type) in the Prometheus text format."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        output = generate_latest(registry)
+    else:
+        output = generate_latest(REGISTRY)
+    # Table sizes are global: queried once per scrape, not aggregated per worker
+    scrape_registry = CollectorRegistry()
+    scrape_registry.register(TokenBlacklistCollector())
+    return output + generate_latest(scrape_registry), CONTENT_TYPE_LATEST
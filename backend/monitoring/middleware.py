@@ -0,0 +1,66 @@
+# backend/monitoring/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .metrics import observe_request
+from .timing import RequestTiming, current_timing, install_query_recorders, view_timings
+
+
+class RequestTimingMiddleware:
+    """
+    Optional middleware that times each request: total time, SQL queries
+    (count and time) and spans marked with `timed()`.
+
+    - REQUEST_TIMING_ENABLED: Server-Timing header and per-view histograms,
+      visible to staff at /api/monitoring/timings/.
+    - METRICS_ENABLED: per-view Prometheus metrics, exposed at /metrics.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.timing_enabled = getattr(settings, 'REQUEST_TIMING_ENABLED', False)
+        self.metrics_enabled = getattr(settings, 'METRICS_ENABLED', False)
+        if not (self.timing_enabled or self.metrics_enabled):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        install_query_recorders()
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        # The async ORM runs the queries in the request's sync thread
+        await sync_to_async(install_query_recorders)()
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    def finish(self, request, response, timing):
+        total_seconds = timing.elapsed()
+        match = getattr(request, 'resolver_match', None)
+        # Unresolved paths are grouped so as not to create one entry per URL
+        view_name = (match.view_name or match._func_path) if match else '<unresolved>'
+        if self.timing_enabled:
+            response['Server-Timing'] = timing.server_timing_header(total_seconds)
+            view_timings.record(view_name, total_seconds, timing)
+        if self.metrics_enabled:
+            observe_request(view_name, request.method, response.status_code, total_seconds, timing)
+        return response
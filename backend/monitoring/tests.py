@@ -0,0 +1,208 @@
+import os
+import runpy
+from pathlib import Path
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.tests import UserFactory
+from authentication.throttling import LoginRateThrottle
+from data.tests import make_authorized_user, make_datacard_report
+
+from .timing import current_timing, timed, view_timings
+
+
+class DatabasePoolStatsViewTest(TestCase):
+    """Tests for the operator-facing database pool statistics endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(user=UserFactory())
+        self.assertEqual(self.client.get('/api/monitoring/db-pool/').status_code, 403)
+
+    def test_reports_pool_configuration(self):
+        staff = get_user_model().objects.create_user('ops', 'ops@example.com', 'x', is_staff=True)
+        self.client.force_authenticate(user=staff)
+
+        response = self.client.get('/api/monitoring/db-pool/')
+
+        self.assertEqual(response.status_code, 200)
+        stats = response.data['default']
+        self.assertEqual(stats['mode'], settings.DB_POOL_MODE)
+        if settings.DATABASES['default']['OPTIONS'].get('pool'):
+            self.assertEqual(stats['driver'], 'psycopg')
+            self.assertEqual(stats['pool']['max_size'], settings.DB_POOL_MAX_SIZE)
+            self.assertIn('pool_available', stats['pool'])
+        else:
+            self.assertIn(stats['driver'], ('psycopg', 'psycopg2'))
+            self.assertNotIn('pool', stats)
+            self.assertEqual(stats['conn_health_checks'], settings.DATABASES['default'].get('CONN_HEALTH_CHECKS'))
+
+
+def database_settings(**environ):
+    """DATABASES built by the database settings component under `environ`."""
+    component = Path(settings.BASE_DIR) / 'project' / 'settings' / 'components' / 'database.py'
+    keep = {name: value for name, value in os.environ.items() if name not in ('IS_RENDER', 'DB_POOL_MODE')}
+    with patch.dict(os.environ, {**keep, **environ}, clear=True):
+        return runpy.run_path(str(component))['DATABASES']['default']
+
+
+class DatabaseSettingsTest(TestCase):
+    """Pooling is opt-in: without DB_POOL_MODE development keeps its non-persistent connections."""
+
+    def test_development_default_keeps_connections_per_request(self):
+        db = database_settings()
+        self.assertNotIn('CONN_MAX_AGE', db)
+        self.assertNotIn('CONN_HEALTH_CHECKS', db)
+        self.assertNotIn('pool', db['OPTIONS'])
+
+    def test_explicit_modes(self):
+        db = database_settings(DB_POOL_MODE='none', DB_CONN_MAX_AGE='60')
+        self.assertEqual((db['CONN_MAX_AGE'], db['CONN_HEALTH_CHECKS']), (60, True))
+        db = database_settings(DB_POOL_MODE='pgbouncer')
+        self.assertTrue(db['DISABLE_SERVER_SIDE_CURSORS'])
+        with self.assertRaisesMessage(ValueError, 'Invalid DB_POOL_MODE'):
+            database_settings(DB_POOL_MODE='bouncer')
+
+
+@override_settings(REQUEST_TIMING_ENABLED=True)
+class RequestTimingMiddlewareTest(TestCase):
+    """Tests for the opt-in Server-Timing / per-view histogram instrumentation."""
+
+    def setUp(self):
+        view_timings.reset()
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user('ops', 'ops@example.com', 'x', is_staff=True)
+
+    def test_disabled_by_default(self):
+        with override_settings(REQUEST_TIMING_ENABLED=False):
+            client = APIClient()
+            client.force_authenticate(user=self.staff)
+            response = client.get('/api/monitoring/db-pool/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_server_timing_header_and_histograms(self):
+        self.client.force_authenticate(user=self.staff)
+
+        response = self.client.get('/api/monitoring/db-pool/')
+
+        header = response['Server-Timing']
+        self.assertRegex(header, r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"')
+        stats = self.client.get('/api/monitoring/timings/').data
+        self.assertTrue(stats['enabled'])
+        db_pool = stats['views']['monitoring-db-pool']
+        self.assertEqual(db_pool['count'], 1)
+        self.assertEqual(sum(db_pool['latency_buckets_ms'].values()), 1)
+
+    def test_counts_queries_and_serialization_in_async_views(self):
+        user = make_authorized_user('datacard')
+        make_datacard_report(warehouse_id=1)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        response = async_to_sync(self.async_client.get)(
+            '/api/data/datacard-reports/', {'warehouse_id': 1}, headers=headers
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        stats = view_timings.snapshot()['datacard-reports-list']
+        self.assertGreaterEqual(stats['max_queries'], 1)
+        self.assertIn('serialize', stats['mean_spans_ms'])
+
+    def test_timings_endpoint_requires_staff_and_resets(self):
+        self.client.force_authenticate(user=UserFactory())
+        self.assertEqual(self.client.get('/api/monitoring/timings/').status_code, 403)
+
+        self.client.force_authenticate(user=self.staff)
+        self.client.get('/api/monitoring/db-pool/')
+        self.assertEqual(self.client.delete('/api/monitoring/timings/').status_code, 204)
+        self.assertNotIn('monitoring-db-pool', view_timings.snapshot())
+
+    def test_timed_outside_a_request_is_a_no_op(self):
+        with timed('serialize'):
+            pass
+        self.assertIsNone(current_timing.get())
+
+
+class MetricsEndpointTest(TestCase):
+    """Tests for the Prometheus /metrics endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user('ops', 'ops@example.com', 'x', is_staff=True)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_requires_staff_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.client.force_authenticate(user=UserFactory())
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        self.client.force_authenticate(user=self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_wrong_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-the-secret')
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_client_address_alone_grants_nothing(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_token_needs_no_user(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('token_blacklist_rows{table="token_blacklist_outstandingtoken"} 0.0', body)
+        self.assertIn('token_blacklist_rows{table="token_blacklist_blacklistedtoken"} 0.0', body)
+
+    @override_settings(METRICS_ENABLED=True)
+    def test_exports_per_view_requests_and_queries(self):
+        self.client.force_authenticate(user=self.staff)
+        labels = {'view': 'monitoring-db-pool', 'method': 'GET', 'status': '200'}
+        before = REGISTRY.get_sample_value('http_requests_total', labels) or 0
+
+        response = self.client.get('/api/monitoring/db-pool/')
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(REGISTRY.get_sample_value('http_requests_total', labels), before + 1)
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{le="0.005",view="monitoring-db-pool"}', body)
+        self.assertIn('http_request_db_queries_count{view="monitoring-db-pool"}', body)
+
+    def test_counts_throttle_rejections(self):
+        before = REGISTRY.get_sample_value('throttle_rejections_total', {'scope': 'login'}) or 0
+
+        self.assertFalse(LoginRateThrottle().throttle_failure())
+
+        self.assertEqual(REGISTRY.get_sample_value('throttle_rejections_total', {'scope': 'login'}), before + 1)
+
+    def test_counts_trend_cache_hits_and_misses(self):
+        user = make_authorized_user('datacard')
+        make_datacard_report(warehouse_id=1)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+        def lookups(result):
+            return REGISTRY.get_sample_value(
+                'cache_lookups_total', {'cache': 'datacard_trend', 'result': result}
+            ) or 0
+
+        misses, hits = lookups('miss'), lookups('hit')
+        for _ in range(2):
+            self.client.get('/api/data/datacard-reports/trend/', {'warehouse_id': 1}, headers=headers)
+
+        self.assertEqual(lookups('miss'), misses + 1)
+        self.assertEqual(lookups('hit'), hits + 1)
@@ -0,0 +1,148 @@
+# backend/monitoring/timing.py
+"""
+Per-request timing: total time, SQL query count and time, and named spans
+(e.g. serialization) measured with `timed()`.
+
+The current request is kept in a ContextVar, so the query wrapper and
+`timed()` work in both sync and async views (sync_to_async copies the
+context to the thread that runs the ORM).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+# Upper bounds (ms) of the buckets of the per-view histograms
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    __slots__ = ('db_seconds', 'query_count', 'spans', 'started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_seconds = 0.0
+        self.spans = {}
+
+    def add_span(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing_header(self, total_seconds):
+        """Value of the Server-Timing header (durations in ms)."""
+        entries = [
+            f'total;dur={total_seconds * 1000:.1f}',
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.query_count} queries"',
+        ]
+        entries += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.spans.items()]
+        return ', '.join(entries)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper that adds the query to the current request, if any."""
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.query_count += 1
+        timing.db_seconds += time.perf_counter() - started
+
+
+def install_query_recorders():
+    """Adds record_query to the connections of the current thread (idempotent)."""
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if record_query not in wrappers:
+            wrappers.append(record_query)
+
+
+@contextmanager
+def timed(name):
+    """Times a span of the current request; does nothing if it is not being timed."""
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add_span(name, time.perf_counter() - started)
+
+
+class ViewTimingHistograms:
+    """
+    In-memory per-view aggregate of the requests timed in this process.
+    Each gunicorn worker has its own.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view_name, total_seconds, timing):
+        total_ms = total_seconds * 1000
+        with self.lock:
+            stats = self.views.get(view_name)
+            if stats is None:
+                stats = self.views[view_name] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'db_ms': 0.0,
+                    'queries': 0,
+                    'max_queries': 0,
+                    'spans_ms': {},
+                    'buckets': [0] * len(LATENCY_BUCKETS_MS),
+                }
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['db_ms'] += timing.db_seconds * 1000
+            stats['queries'] += timing.query_count
+            stats['max_queries'] = max(stats['max_queries'], timing.query_count)
+            for name, seconds in timing.spans.items():
+                stats['spans_ms'][name] = stats['spans_ms'].get(name, 0.0) + seconds * 1000
+            for index, upper in enumerate(LATENCY_BUCKETS_MS):
+                if total_ms <= upper:
+                    stats['buckets'][index] += 1
+                    break
+
+    def snapshot(self):
+        """Per-view summary: means, maximums and latency histogram."""
+        with self.lock:
+            result = {}
+            for view_name, stats in self.views.items():
+                count = stats['count']
+                result[view_name] = {
+                    'count': count,
+                    'mean_ms': round(stats['total_ms'] / count, 2),
+                    'max_ms': round(stats['max_ms'], 2),
+                    'mean_db_ms': round(stats['db_ms'] / count, 2),
+                    'mean_queries': round(stats['queries'] / count, 2),
+                    'max_queries': stats['max_queries'],
+                    'mean_spans_ms': {
+                        name: round(total / count, 2) for name, total in stats['spans_ms'].items()
+                    },
+                    'latency_buckets_ms': {
+                        ('+Inf' if upper == float('inf') else str(upper)): bucket_count
+                        for upper, bucket_count in zip(LATENCY_BUCKETS_MS, stats['buckets'])
+                    },
+                }
+            return result
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+view_timings = ViewTimingHistograms()
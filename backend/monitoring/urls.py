@@ -0,0 +1,9 @@
+# backend/monitoring/urls.py
+from django.urls import path
+
+from .views import DatabasePoolStatsView, RequestTimingStatsView
+
+urlpatterns = [
+    path('db-pool/', DatabasePoolStatsView.as_view(), name='monitoring-db-pool'),
+    path('timings/', RequestTimingStatsView.as_view(), name='monitoring-timings'),
+]
@@ -0,0 +1,124 @@
+# backend/monitoring/views.py
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework import authentication, permissions, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .metrics import render_metrics
+from .timing import LATENCY_BUCKETS_MS, view_timings
+
+
+def database_pool_stats(alias='default'):
+    """
+    State of the `alias` connections in this worker process.
+    With the native pool it includes the psycopg_pool statistics (size,
+    available connections, waiting requests, wait times...).
+    """
+    connection = connections[alias]
+    db_settings = connection.settings_dict
+    stats = {
+        'alias': alias,
+        'mode': getattr(settings, 'DB_POOL_MODE', 'none'),
+        # psycopg (3) or psycopg2: Django picks psycopg 3 whenever it is installed
+        'driver': connection.Database.__name__,
+        'conn_max_age': db_settings.get('CONN_MAX_AGE'),
+        'conn_health_checks': db_settings.get('CONN_HEALTH_CHECKS'),
+    }
+    pool_options = db_settings.get('OPTIONS', {}).get('pool')
+    if pool_options:
+        # connection.pool creates the pool if it does not exist in this process yet
+        pool = connection.pool
+        stats['pool'] = {
+            'name': pool.name,
+            'min_size': pool.min_size,
+            'max_size': pool.max_size,
+            'timeout': pool.timeout,
+            'max_idle': pool.max_idle,
+            'max_lifetime': pool.max_lifetime,
+            **pool.get_stats(),
+        }
+    return stats
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    PostgreSQL connection pool statistics for operators (staff only).
+    The figures are those of the worker serving the request, not of all of gunicorn.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({alias: database_pool_stats(alias) for alias in connections})
+
+
+class RequestTimingStatsView(APIView):
+    """
+    Per-view histograms of RequestTimingMiddleware (staff only): latency,
+    SQL queries and serialization time. The figures are those of the worker
+    serving the request; DELETE resets them.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'enabled': getattr(settings, 'REQUEST_TIMING_ENABLED', False),
+            'buckets_ms': [str(upper) for upper in LATENCY_BUCKETS_MS[:-1]] + ['+Inf'],
+            'views': view_timings.snapshot(),
+        })
+
+    def delete(self, request, *args, **kwargs):
+        view_timings.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# request.auth of a request authenticated with METRICS_TOKEN
+METRICS_SCRAPER = 'metrics-scraper'
+
+
+class MetricsTokenAuthentication(authentication.BaseAuthentication):
+    """
+    `Authorization: Bearer <METRICS_TOKEN>` for the Prometheus scraper, which has
+    no user. A token is used instead of a network allow-list because behind the
+    Render proxy REMOTE_ADDR is the proxy's address. Other bearer tokens fall
+    through to the JWT authentication.
+    """
+    def authenticate(self, request):
+        expected = getattr(settings, 'METRICS_TOKEN', '')
+        parts = authentication.get_authorization_header(request).split()
+        if not expected or len(parts) != 2 or parts[0].lower() != b'bearer':
+            return None
+        if not hmac.compare_digest(parts[1], expected.encode()):
+            return None
+        return AnonymousUser(), METRICS_SCRAPER
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="metrics"'
+
+
+class IsStaffOrMetricsScraper(permissions.BasePermission):
+    """Authenticated staff, or the scraper authenticated with METRICS_TOKEN."""
+    def has_permission(self, request, view):
+        if request.auth == METRICS_SCRAPER:
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """
+    Metrics in the Prometheus text format, aggregated across all the
+    gunicorn workers (see monitoring/metrics.py).
+    """
+    authentication_classes = [MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [IsStaffOrMetricsScraper]
+    # Periodic scrapes must not use up the anonymous rate quota
+    throttle_classes = []
+
+    def get(self, request, *args, **kwargs):
+        output, content_type = render_metrics()
+        return HttpResponse(output, content_type=content_type)
@@ -0,0 +1,90 @@
+"""
+Structured, non-blocking logging for the `authentication` and `access` apps.
+
+- StructuredFormatter: one JSON line per record, with the fields passed in `extra`.
+- SamplingFilter: lets only a fraction of the DEBUG/INFO records through
+  (WARNING and above always pass).
+- NonBlockingStreamHandler: QueueHandler whose QueueListener writes to stderr
+  from its own thread; the request thread only enqueues the record.
+- make_non_blocking: swaps the StreamHandlers configured by LOGGING for
+  NonBlockingStreamHandlers (run from AuthenticationConfig.ready()).
+"""
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Standard LogRecord attributes; the rest come from `extra`
+RESERVED_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+class StructuredFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in RESERVED_ATTRS and not key.startswith('_')
+        )
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate=1.0, name=''):
+        super().__init__(name)
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingStreamHandler(QueueHandler):
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        # QueueHandler.prepare() already applies the configured formatter; the target only writes the message
+        self.listener = QueueListener(self.queue, logging.StreamHandler(stream or sys.stderr))
+        self.listener.start()
+
+    def close(self):
+        # logging.shutdown() closes the handlers on exit: the queue is drained before stopping
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
+
+
+def make_non_blocking(logger_names):
+    """
+    Replaces the StreamHandlers of the `logger_names` loggers with
+    NonBlockingStreamHandlers on the same stream, keeping their level,
+    formatter and filters. A handler shared by several loggers gets a single
+    replacement (one listener thread).
+
+    LOGGING itself only declares stdlib handlers: dictConfig treats QueueHandler
+    subclasses differently across Python versions (3.12.0 and 3.12.1 reject
+    NonBlockingStreamHandler), so the queue is set up here, after it ran.
+    """
+    replacements = {}
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            if type(handler) is not logging.StreamHandler:
+                continue
+            if handler not in replacements:
+                queued = NonBlockingStreamHandler(handler.stream)
+                queued.setLevel(handler.level)
+                queued.setFormatter(handler.formatter)
+                for log_filter in handler.filters:
+                    queued.addFilter(log_filter)
+                replacements[handler] = queued
+            logger.removeHandler(handler)
+            logger.addHandler(replacements[handler])
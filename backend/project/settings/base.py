@@ -40,11 +40,13 @@ INSTALLED_APPS = [
     # Your apps
     'authentication',
     'access',
-    'data'
+    'data',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'monitoring.middleware.RequestTimingMiddleware', # Optional: REQUEST_TIMING_ENABLED / METRICS_ENABLED
     'whitenoise.middleware.WhiteNoiseMiddleware', # Para servir archivos estáticos
     # Mantener SessionMiddleware pero comentario para explicar su propósito
     'django.contrib.sessions.middleware.SessionMiddleware',  # Solo necesario para admin y OAuth
@@ -108,6 +110,28 @@ STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Admin: changelists over large tables (see data/admin_utils.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = int(os.environ.get('ADMIN_ESTIMATED_COUNT_THRESHOLD', 100000))
+ADMIN_FILTER_CHOICES_CACHE_TIMEOUT = int(os.environ.get('ADMIN_FILTER_CHOICES_CACHE_TIMEOUT', 600))
+
+# Trigram indexes (data/trigram.py): migrate fails if the server lacks pg_trgm, unless this
+# is set on purpose; the indexes are then recorded but not created, as with `migrate --fake`
+TRIGRAM_INDEXES_OPTIONAL = os.environ.get('TRIGRAM_INDEXES_OPTIONAL', 'False') == 'True'
+
+# Latency budget (statement_timeout) for /api/data/orders/search/
+ORDERS_SEARCH_TIMEOUT_MS = int(os.environ.get('ORDERS_SEARCH_TIMEOUT_MS', 2000))
+
+# Cache of /api/data/datacard-reports/trend/ (the key already changes with every ETL load)
+DATACARD_TREND_CACHE_TIMEOUT = int(os.environ.get('DATACARD_TREND_CACHE_TIMEOUT', 3600))
+
+# Per-request timing (Server-Timing + histograms at /api/monitoring/timings/)
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', 'False') == 'True'
+
+# Prometheus metrics at /metrics: available to staff or to the scraper that sends
+# `Authorization: Bearer <METRICS_TOKEN>` (empty: staff only)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'False') == 'True'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
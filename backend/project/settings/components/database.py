@@ -1,19 +1,51 @@
 """
 Database settings for the project.
 """
+import importlib.util
 import os
+
 import dj_database_url
 
 # Determinar si estamos en entorno Render (producción)
 IS_RENDER = os.environ.get('IS_RENDER', False)
 
+# --- Connection pooling ---
+# DB_POOL_MODE:
+#   'django'    -> Django's native pool (psycopg 3 + psycopg_pool), one per worker process.
+#   'pgbouncer' -> behind PgBouncer in transaction mode: persistent connections to
+#                  PgBouncer and no server-side cursors (they do not survive across transactions).
+#   'none'      -> persistent connections (CONN_MAX_AGE) without a pool.
+# Defaults to 'none': pooling is opt-in per deployment, even when psycopg_pool is installed.
+# psycopg 3 is only installed for 'django' (requirements-pool.txt): once importable,
+# Django uses it instead of psycopg2 for every connection, whatever the mode.
+DB_POOL_AVAILABLE = (
+    importlib.util.find_spec('psycopg') is not None
+    and importlib.util.find_spec('psycopg_pool') is not None
+)
+DB_POOL_MODE_SET = 'DB_POOL_MODE' in os.environ
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'none').lower()
+if DB_POOL_MODE not in ('django', 'pgbouncer', 'none'):
+    raise ValueError(f"Invalid DB_POOL_MODE '{DB_POOL_MODE}'. Use 'django', 'pgbouncer' or 'none'.")
+if DB_POOL_MODE == 'django' and not DB_POOL_AVAILABLE:
+    raise ValueError("DB_POOL_MODE='django' requires the 'psycopg[pool]' package.")
+
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', '2'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '10'))
+# Seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+# Seconds an idle connection (above min_size) is kept open
+DB_POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', '300'))
+# Maximum lifetime of a connection, to rebalance after failovers of the managed Postgres
+DB_POOL_MAX_LIFETIME = float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800'))
+# CONN_MAX_AGE for the modes without the native pool (in development only with DB_POOL_MODE set)
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '600'))
+
 # --- Database Configuration ---
 if IS_RENDER:
     # Configuración de base de datos para Render (producción)
     DATABASES = {
         'default': dj_database_url.config(
             default=f"postgresql://{os.environ.get('POSTGRES_USER')}:{os.environ.get('POSTGRES_PASSWORD')}@{os.environ.get('POSTGRES_HOST')}:{os.environ.get('POSTGRES_PORT')}/{os.environ.get('POSTGRES_DB')}",
-            conn_max_age=600
         )
     }
 else:
@@ -27,4 +59,24 @@ else:
             'HOST': os.environ.get('POSTGRES_HOST'),
             'PORT': os.environ.get('POSTGRES_PORT', '5432'),  # Mantiene tu puerto local
         }
-    }
\ No newline at end of file
+    }
+
+DATABASES['default'].setdefault('OPTIONS', {})
+if DB_POOL_MODE == 'django':
+    # The pool manages the connection lifetime; Django requires CONN_MAX_AGE = 0
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+        'max_idle': DB_POOL_MAX_IDLE,
+        'max_lifetime': DB_POOL_MAX_LIFETIME,
+    }
+elif IS_RENDER or DB_POOL_MODE_SET:
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    # Checks the persistent connection before reusing it for a new request
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL_MODE == 'pgbouncer':
+        # Also makes QuerySet.iterator() fetch the whole result set: the streaming
+        # exports lose their constant memory (see the data.W001 system check)
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
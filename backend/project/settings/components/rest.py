@@ -26,8 +26,9 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.JSONParser',
     ),
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        # DRF subclasses that count rejections for /metrics
+        'authentication.throttling.AnonRateThrottle',
+        'authentication.throttling.UserRateThrottle',
         # LoginRateThrottle is applied specifically in authentication views, not globally needed here.
     ],
     'DEFAULT_THROTTLE_RATES': {
@@ -50,5 +50,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'access': {
+            'handlers': ['console'],
+            'level': 'DEBUG',
+            'propagate': False,
+        },
     },
 }
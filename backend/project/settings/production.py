@@ -23,7 +23,14 @@ RENDER_EXTERNAL_HOSTNAME = os.environ.get('RENDER_EXTERNAL_HOSTNAME')
 if RENDER_EXTERNAL_HOSTNAME:
     ALLOWED_HOSTS.append(RENDER_EXTERNAL_HOSTNAME)
 
+# Fraction of the authentication/access DEBUG/INFO records that are kept (WARNING+ always)
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+
 # Logging settings for production - más restringido que en desarrollo
+# The authentication and access apps write JSON through a queue: the request
+# thread never waits on stdout/stderr (see project/logging_utils.py).
+NON_BLOCKING_LOGGERS = ('authentication', 'access')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -32,12 +39,27 @@ LOGGING = {
             'format': '[{levelname}] {message}',
             'style': '{',
         },
+        'structured': {
+            '()': 'project.logging_utils.StructuredFormatter',
+        },
+    },
+    'filters': {
+        'sampled': {
+            '()': 'project.logging_utils.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+        },
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        # Moved behind a queue by AuthenticationConfig.ready() (NON_BLOCKING_LOGGERS)
+        'structured': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'structured',
+            'filters': ['sampled'],
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -50,7 +72,12 @@ LOGGING = {
             'propagate': False,
         },
         'authentication': {
-            'handlers': ['console'],
+            'handlers': ['structured'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'access': {
+            'handlers': ['structured'],
             'level': 'INFO',
             'propagate': False,
         },
@@ -2,6 +2,8 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from monitoring.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('social_django.urls', namespace='social')), # OAuth URLs provided by social-auth-app-django
@@ -14,4 +16,8 @@ urlpatterns = [
 
     # Include data-related endpoints
     path('api/data/', include('data.urls')), # NEW: Data app URLs
+
+    # Operational endpoints (staff only)
+    path('api/monitoring/', include('monitoring.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'), # Prometheus (staff or METRICS_TOKEN)
 ]
\ No newline at end of file
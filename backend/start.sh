@@ -0,0 +1,21 @@
+#!/usr/bin/env bash
+# Exit on error
+set -o errexit
+
+# SERVER_MODE=asgi  -> uvicorn workers (async views of /api/data/ and /api/access/permissions/)
+# SERVER_MODE=wsgi  -> classic sync workers (default)
+# The number of workers is set with WEB_CONCURRENCY (standard gunicorn variable).
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+BIND="0.0.0.0:${PORT:-8000}"
+
+# /metrics values shared across workers (prometheus_client in multiprocess mode).
+# The directory is emptied on every start; gunicorn.conf.py cleans up finished workers.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus-multiproc}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
+if [ "$SERVER_MODE" = "asgi" ]; then
+    exec gunicorn project.asgi:application --worker-class uvicorn_worker.UvicornWorker --bind "$BIND"
+else
+    exec gunicorn project.wsgi:application --bind "$BIND"
+fi
@@ -0,0 +1,45 @@
+import logging
+
+class WarmConnection:
+    """
+    Keeps a database connection open between the runs of a long-running agent.
+    `get()` checks it with a trivial query first and reconnects if the server
+    closed it (restart, idle timeout, network drop); it returns None if the
+    database cannot be reached.
+    """
+
+    def __init__(self, name, connect):
+        self.name = name
+        self.connect = connect
+        self.conn = None
+
+    def _healthy(self):
+        try:
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            # Ends the transaction opened by the check (and any left open by a failed run)
+            self.conn.rollback()
+            return True
+        except Exception as e:
+            logging.warning(f"{self.name} connection failed its health check, reconnecting: {e}")
+            return False
+
+    def get(self):
+        if self.conn is not None and not self._healthy():
+            self.close()
+        if self.conn is None:
+            self.conn = self.connect()
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception as e:
+                # A dead connection may fail to close; it is dropped either way
+                logging.debug(f"Error closing the {self.name} connection: {e}")
+            self.conn = None
@@ -1,5 +1,6 @@
 import logging
 import pyodbc
+from rows import RowBatch
 
 def extract_datacard_reports(mssql_conn, year, week, warehouses=None):
     """
@@ -11,7 +12,7 @@ def extract_datacard_reports(mssql_conn, year, week, warehouses=None):
         week: Week for the report (int)
         warehouses: List of warehouse IDs or comma-separated string (optional)
     Returns:
-        List of dictionaries with transformed DataCard data
+        RowBatch with the DataCard rows
     """
     cursor = mssql_conn.cursor()
     try:
@@ -94,12 +95,11 @@ def extract_datacard_reports(mssql_conn, year, week, warehouses=None):
         """
         logging.info(f"Executing DataCard query: year={year}, week={week}, warehouses={warehouses_param}")
         cursor.execute(query, (year, week, warehouses_param))
-        columns = [column[0] for column in cursor.description]
-        datacard_data = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        datacard_data = RowBatch.from_cursor(cursor, cursor.fetchall())
         logging.info(f"Extracted {len(datacard_data)} DataCard records from MSSQL.")
         return datacard_data
     except pyodbc.Error as ex:
         logging.error(f"Error executing DataCard query: {ex}")
-        return []
+        return RowBatch((), [])
     finally:
         cursor.close()
@@ -0,0 +1,95 @@
+from state.dimensions import DimensionCache
+
+# Dimension tables used to resolve the keys of the Orders extract: name -> (table, columns).
+# The first column is the key.
+ORDER_DIMENSIONS = {
+    'projects': ('datex_footprint.Projects', ('id', 'name')),
+    'warehouses': ('datex_footprint.Warehouses', ('id', 'name', 'notes')),
+    'order_classes': ('datex_footprint.OrderClasses', ('id', 'name')),
+}
+
+def dimension_version(mssql_conn, table, columns):
+    """
+    Cheap version of a dimension table on the source: row count plus an
+    aggregate checksum of the cached columns.
+    """
+    cursor = mssql_conn.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*), CHECKSUM_AGG(BINARY_CHECKSUM({', '.join(columns)})) FROM {table}")
+        count, checksum = cursor.fetchone()
+        return f'{count}:{checksum}'
+    finally:
+        cursor.close()
+
+def extract_dimension(mssql_conn, table, columns):
+    """Extracts a whole dimension table as (id, *values) tuples."""
+    cursor = mssql_conn.cursor()
+    try:
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {table}")
+        return [tuple(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def extract_order_dimensions(mssql_conn, cache=None, force=False, names=None):
+    """
+    Returns the Orders dimensions (or only `names`) as {name: {id: tuple of values}},
+    served from the local DimensionCache when it is still valid.
+    """
+    cache = cache or DimensionCache()
+    return {
+        name: cache.get(
+            name,
+            lambda table=table, columns=columns: dimension_version(mssql_conn, table, columns),
+            lambda table=table, columns=columns: extract_dimension(mssql_conn, table, columns),
+            force=force,
+        )
+        for name, (table, columns) in ORDER_DIMENSIONS.items()
+        if names is None or name in names
+    }
+
+
+class OrderDimensions:
+    """
+    Orders dimensions of one run, refreshed on the source when the extract
+    brings keys that are not in them (see transform_orders).
+
+    Args:
+        mssql_conn: connection used for the initial load.
+        connect: opens the connection used by `refresh()`; it is separate because
+            in pipeline mode the transform thread refreshes while the extract
+            thread is still reading from `mssql_conn`.
+        cache: DimensionCache shared with later runs.
+        force: check the version of every dimension even if the cache is fresh.
+    """
+
+    def __init__(self, mssql_conn, connect, cache=None, force=False):
+        self.connect = connect
+        self.cache = cache or DimensionCache()
+        self.current = extract_order_dimensions(mssql_conn, self.cache, force=force)
+        # Keys still unknown after a refresh: they are not looked up again in this run
+        self.missing = {name: set() for name in ORDER_DIMENSIONS}
+        self.conn = None
+
+    def refresh(self, unknown):
+        """
+        Checks the version of the dimensions with keys in `unknown` ({name: set of
+        ids}) that were not already missing after an earlier refresh, fetching them
+        again if they changed. Returns the refreshed dimensions, or None if there
+        was nothing new to look up.
+        """
+        names = [name for name, keys in unknown.items() if keys - self.missing[name]]
+        if not names:
+            return None
+        if self.conn is None:
+            self.conn = self.connect()
+        self.current = {
+            **self.current, **extract_order_dimensions(self.conn, self.cache, force=True, names=names),
+        }
+        for name in names:
+            self.missing[name] |= unknown[name] - self.current[name].keys()
+        return self.current
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
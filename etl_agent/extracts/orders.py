@@ -1,43 +1,219 @@
+import collections
+import datetime
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-def extract_orders(mssql_conn, start_date='2024-01-01', warehouse_ids=(1,12,20,23,27), excluded_owner_id=701):
+from rows import RowBatch
+
+ORDERS_BATCH_SIZE = 5000
+ORDERS_START_DATE = '2024-01-01'
+ORDERS_WAREHOUSE_IDS = (1, 12, 20, 23, 27)
+ORDERS_EXCLUDED_OWNER_ID = 701
+# Rows read ahead by the parallel extract workers, all partitions together
+ORDERS_PARALLEL_BUFFER_ROWS = 200_000
+
+def iter_orders_batches(mssql_conn, start_date=ORDERS_START_DATE, warehouse_ids=ORDERS_WAREHOUSE_IDS,
+                        excluded_owner_id=ORDERS_EXCLUDED_OWNER_ID, batch_size=ORDERS_BATCH_SIZE,
+                        end_date=None, ordered=False, after_key=None):
     """
-    Extracts order and shipment data from MSSQL for the Orders table.
+    Extracts order and shipment keys from MSSQL for the Orders table,
+    yielding RowBatches of at most `batch_size` rows as they are fetched.
+    `end_date` (exclusive) bounds the date range; `ordered` sorts the rows
+    so that the output is deterministic. `after_key` (order_number,
+    shipment_number of a load checkpoint, requires `ordered`) resumes the
+    ordered output at that key; the rows of the key itself are sent again.
     """
+    if after_key and not ordered:
+        raise ValueError("after_key requires an ordered extraction")
     cursor = mssql_conn.cursor()
     warehouse_ids_str = ','.join(str(w) for w in warehouse_ids)
+    params = [start_date]
+    end_date_filter = ''
+    if end_date:
+        end_date_filter = 'AND o.fulfillmentDate < ?'
+        params.append(end_date)
+    after_key_filter = ''
+    if after_key:
+        after_key_filter = 'AND (o.lookupCode > ? OR (o.lookupCode = ? AND s.lookupCode >= ?))'
+        params.extend((after_key[0], after_key[0], after_key[1]))
+    params.append(excluded_owner_id)
+    order_by = 'ORDER BY order_number, shipment_number, warehouse_id, date' if ordered else ''
+    # Only keys and dates: names are resolved from the cached dimensions in transform_orders
     query = f'''
-        SELECT DISTINCT --TOP 4000
-            p.name AS customer,
-            w.name AS warehouse,
-            w.notes AS warehouse_city_state,
+        SELECT DISTINCT
+            o.projectId AS project_id,
+            COALESCE(s.actualWarehouseId, s.expectedWarehouseId) AS warehouse_id,
             o.lookupCode AS order_number,
             s.lookupCode AS shipment_number,
-            CASE 
+            CASE
                 WHEN s.typeId = 1 THEN 'Inbound'
                 WHEN s.typeId = 2 THEN 'Outbound'
                 ELSE 'Other'
             END AS order_type,
-            o.fulfillmentDate AS date,
-            oc.name AS order_class
+            CAST(o.fulfillmentDate AS date) AS date,
+            o.orderClassId AS order_class_id
         FROM datex_footprint.Orders o
-            JOIN datex_footprint.Projects p ON p.id = o.projectId
-            JOIN datex_footprint.Owners ow ON ow.id = p.ownerId
             JOIN datex_footprint.ShipmentOrderLookup sol ON sol.orderId = o.id
             JOIN datex_footprint.Shipments s ON s.id = sol.shipmentId
-            JOIN datex_footprint.Warehouses w ON w.id = COALESCE(s.actualWarehouseId, s.expectedWarehouseId)
-            JOIN datex_footprint.OrderClasses oc ON oc.id = o.orderClassId
         WHERE s.statusId = 8
             AND o.fulfillmentDate >= ?
-            AND w.id IN ({warehouse_ids_str})
-            AND ow.id NOT IN (?)
+            {end_date_filter}
+            {after_key_filter}
+            AND COALESCE(s.actualWarehouseId, s.expectedWarehouseId) IN ({warehouse_ids_str})
+            AND o.projectId NOT IN (SELECT id FROM datex_footprint.Projects WHERE ownerId IN (?))
+        {order_by}
     '''
     try:
-        cursor.execute(query, (start_date, excluded_owner_id))
-        columns = [col[0] for col in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        return results
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield RowBatch.from_cursor(cursor, rows)
+    finally:
+        cursor.close()
+
+def extract_orders(mssql_conn, start_date=ORDERS_START_DATE, warehouse_ids=ORDERS_WAREHOUSE_IDS,
+                   excluded_owner_id=ORDERS_EXCLUDED_OWNER_ID):
+    """
+    Extracts order and shipment data from MSSQL for the Orders table as a single RowBatch.
+    """
+    try:
+        return RowBatch.concat(iter_orders_batches(mssql_conn, start_date, warehouse_ids, excluded_owner_id))
     except Exception:
         # Handle/log error as needed
-        return []
+        return RowBatch((), [])
+
+# --- Parallel extraction ---
+
+def orders_partitions(partition_by, start_date=ORDERS_START_DATE, warehouse_ids=ORDERS_WAREHOUSE_IDS, today=None):
+    """
+    Splits the Orders extract into independent partitions, in a fixed order:
+    one per warehouse ('warehouse') or one per calendar month from start_date
+    to the current month ('month'). Each partition is a dict of
+    iter_orders_batches arguments.
+    """
+    if partition_by == 'warehouse':
+        return [{'start_date': start_date, 'warehouse_ids': (warehouse_id,)} for warehouse_id in warehouse_ids]
+    if partition_by != 'month':
+        raise ValueError(f"Unknown Orders partitioning: {partition_by}")
+
+    today = today or datetime.date.today()
+    month = datetime.date.fromisoformat(str(start_date)).replace(day=1)
+    partitions = []
+    while month <= today:
+        next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+        partitions.append({
+            'start_date': max(month, datetime.date.fromisoformat(str(start_date))).isoformat(),
+            # The last partition stays open-ended to include rows dated in the future
+            'end_date': next_month.isoformat() if next_month <= today else None,
+            'warehouse_ids': warehouse_ids,
+        })
+        month = next_month
+    return partitions
+
+class _PartitionDone:
+    __slots__ = ('rows',)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+def iter_orders_batches_parallel(connect, partitions, parallelism=4, batch_size=ORDERS_BATCH_SIZE,
+                                 buffer_rows=ORDERS_PARALLEL_BUFFER_ROWS):
+    """
+    Runs the Orders extract of each partition concurrently on a pool of
+    `parallelism` MSSQL connections (opened with `connect()`) and yields the
+    batches partition by partition, in the order given. The rows of each
+    partition are sorted, so the output does not depend on thread timing: when
+    the same order/shipment key is extracted by two partitions, the later
+    partition always wins the upsert.
+
+    The partitions after the one being yielded read ahead into one buffer of at
+    most `buffer_rows` rows (at least one batch per connection), a memory budget
+    for the whole extract. The partition being yielded may always buffer one
+    batch beyond that budget, so it never waits for the ones read ahead.
+    """
+    connections = queue.Queue()
+    for _ in range(min(parallelism, len(partitions))):
+        conn = connect()
+        if not conn:
+            raise RuntimeError("Could not open an MSSQL connection for parallel extraction.")
+        connections.put(conn)
+    pool_size = connections.qsize()
+    buffer_rows = max(buffer_rows, pool_size * batch_size)
+    logging.info(
+        f"Parallel Orders extraction: {len(partitions)} partitions on {pool_size} connections, "
+        f"read-ahead of {buffer_rows} rows."
+    )
+
+    buffers = [collections.deque() for _ in partitions]
+    condition = threading.Condition()
+    stop = threading.Event()
+    current = 0
+    buffered = 0
+    failure = None
+
+    def put(index, batch):
+        nonlocal buffered
+        with condition:
+            while not stop.is_set():
+                if buffered + len(batch) <= buffer_rows or (index == current and not buffers[index]):
+                    buffers[index].append(batch)
+                    buffered += len(batch)
+                    condition.notify_all()
+                    return True
+                condition.wait()
+        return False
+
+    def extract_partition(index, partition):
+        nonlocal failure
+        conn = connections.get()
+        rows = 0
+        try:
+            for batch in iter_orders_batches(conn, batch_size=batch_size, ordered=True, **partition):
+                rows += len(batch)
+                if not put(index, batch):
+                    return
+            with condition:
+                buffers[index].append(_PartitionDone(rows))
+                condition.notify_all()
+        except Exception as e:
+            with condition:
+                failure = failure or e
+                condition.notify_all()
+        finally:
+            connections.put(conn)
+
+    executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='orders-extract')
+    try:
+        # Submitted in order: a running partition never waits for one not started yet
+        for index, partition in enumerate(partitions):
+            executor.submit(extract_partition, index, partition)
+        for index, partition in enumerate(partitions):
+            with condition:
+                current = index
+                condition.notify_all()
+            while True:
+                with condition:
+                    while not buffers[index] and failure is None:
+                        condition.wait()
+                    if failure is not None:
+                        raise failure
+                    item = buffers[index].popleft()
+                    if not isinstance(item, _PartitionDone):
+                        buffered -= len(item)
+                        condition.notify_all()
+                if isinstance(item, _PartitionDone):
+                    logging.info(f"Orders partition {partition} extracted: {item.rows} rows.")
+                    break
+                yield item
     finally:
-        cursor.close()
+        # Also reached when the consumer stops early: unblock and drain the workers
+        stop.set()
+        with condition:
+            condition.notify_all()
+        executor.shutdown(wait=True, cancel_futures=True)
+        while not connections.empty():
+            connections.get().close()
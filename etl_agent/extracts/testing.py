@@ -1,8 +1,9 @@
 import logging
 import pyodbc
+from rows import RowBatch
 
 def extract_recent_orders(mssql_conn, limit=5):
-    """Extracts the top N recent orders from MSSQL."""
+    """Extracts the top N recent orders from MSSQL as a RowBatch."""
     cursor = mssql_conn.cursor()
     try:
         query = f"""
@@ -13,12 +14,11 @@ def extract_recent_orders(mssql_conn, limit=5):
         """
         logging.info(f"Executing MSSQL query: {query}")
         cursor.execute(query)
-        columns = [column[0] for column in cursor.description]
-        orders = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        orders = RowBatch.from_cursor(cursor, cursor.fetchall())
         logging.info(f"Extracted {len(orders)} orders from MSSQL.")
         return orders
     except pyodbc.Error as ex:
         logging.error(f"Error executing MSSQL query: {ex}")
-        return []
+        return RowBatch((), [])
     finally:
         cursor.close()
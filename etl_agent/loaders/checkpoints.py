@@ -0,0 +1,81 @@
+from psycopg2.extras import Json
+
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+
+class LoadCheckpoint:
+    """
+    Progress of a load in data_etl_checkpoint (model data.EtlCheckpoint), one row per job.
+
+    `save()` runs on the loader's cursor, inside the transaction of the batches
+    it describes, so the checkpoint and the data become visible together.
+
+    Args:
+        job: job name ('orders'...).
+        run_id: identifies the load (a timestamp, or the spool segment it ships).
+        previous: checkpoint row being resumed (see `fetch()`); its counters are carried over.
+    """
+
+    def __init__(self, job, run_id, previous=None):
+        self.job = job
+        self.run_id = run_id
+        self.batches = previous['batches_committed'] if previous else 0
+        self.rows = previous['rows_committed'] if previous else 0
+        self.started_at = previous['started_at'] if previous else None
+
+    @staticmethod
+    def fetch(pg_conn, job):
+        """Returns the checkpoint row of a job as a dict, or None."""
+        cursor = pg_conn.cursor()
+        try:
+            cursor.execute(
+                'SELECT run_id, status, batches_committed, rows_committed, first_key, last_key, started_at'
+                ' FROM data_etl_checkpoint WHERE job = %s',
+                (job,),
+            )
+            row = cursor.fetchone()
+            pg_conn.commit()
+        finally:
+            cursor.close()
+        if row is None:
+            return None
+        columns = ('run_id', 'status', 'batches_committed', 'rows_committed', 'first_key', 'last_key', 'started_at')
+        return dict(zip(columns, row))
+
+    @classmethod
+    def resumable(cls, pg_conn, job):
+        """The checkpoint of an interrupted load of the job, or None."""
+        previous = cls.fetch(pg_conn, job)
+        if previous and previous['status'] == STATUS_RUNNING:
+            return previous
+        return None
+
+    def save(self, cursor, batches, rows, first_key, last_key, completed=False):
+        """Records `batches` more batches (`rows` rows) ending at `last_key`; does not commit."""
+        self.batches += batches
+        self.rows += rows
+        cursor.execute(
+            """
+            INSERT INTO data_etl_checkpoint (
+                job, run_id, status, batches_committed, rows_committed, first_key, last_key, started_at, updated_at
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s, COALESCE(%s, NOW()), NOW())
+            ON CONFLICT (job) DO UPDATE SET
+                run_id = EXCLUDED.run_id,
+                status = EXCLUDED.status,
+                batches_committed = EXCLUDED.batches_committed,
+                rows_committed = EXCLUDED.rows_committed,
+                first_key = COALESCE(EXCLUDED.first_key, data_etl_checkpoint.first_key),
+                last_key = COALESCE(EXCLUDED.last_key, data_etl_checkpoint.last_key),
+                started_at = EXCLUDED.started_at,
+                updated_at = EXCLUDED.updated_at
+            RETURNING started_at
+            """,
+            (
+                self.job, self.run_id, STATUS_COMPLETED if completed else STATUS_RUNNING,
+                self.batches, self.rows,
+                Json(first_key) if first_key is not None else None,
+                Json(last_key) if last_key is not None else None,
+                self.started_at,
+            ),
+        )
+        self.started_at = cursor.fetchone()[0]
@@ -1,15 +1,36 @@
 import logging
 import psycopg2
 from datetime import datetime
+from state.row_hashes import RowHashIndex
+from transformers.datacard import DAY_COLUMNS, NUMERIC_COLUMNS
 
-def load_datacard_data(pg_conn, data, year, week):
+# Target columns in the order of the prepared records (and of the INSERT below)
+DATACARD_COLUMNS = (
+    'warehouse_id', 'warehouse_order', 'warehouse', 'section', 'list_order', 'description',
+    'day1_value', 'day2_value', 'day3_value', 'day4_value', 'day5_value', 'day6_value', 'day7_value',
+    'total', 'is_integer', 'is_percentage', 'is_text', 'is_title', 'has_heat_colors',
+    'year', 'week', 'fetched_at',
+    'day1_number', 'day2_number', 'day3_number', 'day4_number', 'day5_number', 'day6_number', 'day7_number',
+    'total_number',
+)
+DATACARD_KEY_COLUMNS = ('warehouse_id', 'section', 'list_order', 'year', 'week')
+
+def datacard_row_hash_index():
+    """Local change-detection index for data_datacardreport (see state/row_hashes.py)."""
+    return RowHashIndex('data_datacardreport', DATACARD_COLUMNS, DATACARD_KEY_COLUMNS, ignored_columns=('fetched_at',))
+
+def load_datacard_data(pg_conn, data, year, week, row_hashes=None, stats=None):
     """
     Loads DataCard data into PostgreSQL.
     Args:
         pg_conn: PostgreSQL connection
-        data: List of dictionaries with DataCard data
+        data: RowBatch with transformed DataCard data (see transform_datacard)
         year: Report year
         week: Report week
+        row_hashes: optional RowHashIndex; rows unchanged since the last load are not sent
+        stats: optional runs.StageRecord receiving the row and inserted/updated/skipped counts
+    Returns:
+        True if the data was committed (or there was nothing to load), False on error.
     """
     cursor = pg_conn.cursor()
     insert_query = """
@@ -17,8 +38,11 @@ def load_datacard_data(pg_conn, data, year, week):
             warehouse_id, warehouse_order, warehouse, section, list_order, description,
             day1_value, day2_value, day3_value, day4_value, day5_value, day6_value, day7_value,
             total, is_integer, is_percentage, is_text, is_title, has_heat_colors,
-            year, week, fetched_at
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            year, week, fetched_at,
+            day1_number, day2_number, day3_number, day4_number, day5_number, day6_number, day7_number,
+            total_number
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                  %s, %s, %s, %s, %s, %s, %s, %s)
         ON CONFLICT (warehouse_id, section, list_order, year, week) DO UPDATE SET
             warehouse_order = EXCLUDED.warehouse_order,
             warehouse = EXCLUDED.warehouse,
@@ -36,40 +60,39 @@ def load_datacard_data(pg_conn, data, year, week):
             is_text = EXCLUDED.is_text,
             is_title = EXCLUDED.is_title,
             has_heat_colors = EXCLUDED.has_heat_colors,
-            fetched_at = EXCLUDED.fetched_at
+            fetched_at = EXCLUDED.fetched_at,
+            day1_number = EXCLUDED.day1_number,
+            day2_number = EXCLUDED.day2_number,
+            day3_number = EXCLUDED.day3_number,
+            day4_number = EXCLUDED.day4_number,
+            day5_number = EXCLUDED.day5_number,
+            day6_number = EXCLUDED.day6_number,
+            day7_number = EXCLUDED.day7_number,
+            total_number = EXCLUDED.total_number
         RETURNING (xmax = 0) as inserted;
     """
     try:
         now = datetime.now()
-        prepared_data = []
-        for item in data:
-            prepared_data.append((
-                item['warehouseId'],
-                item.get('warehouseOrder'),
-                item['warehouse'],
-                item['section'],
-                item['listOrder'],
-                item['description'],
-                item['day1_value'],
-                item['day2_value'],
-                item['day3_value'],
-                item['day4_value'],
-                item['day5_value'],
-                item['day6_value'],
-                item['day7_value'],
-                item.get('total'),
-                bool(item['is_integer']),
-                bool(item['is_percentage']),
-                bool(item['is_text']),
-                bool(item.get('is_title', 0)),
-                bool(item.get('has_heat_colors', 0)),
-                year,
-                week,
-                now
-            ))
+        if data.rows:
+            # Column positions are resolved once for the whole batch
+            values = data.getter(
+                'warehouseId', 'warehouseOrder', 'warehouse', 'section', 'listOrder', 'description',
+                *(f'{column}_value' for column in DAY_COLUMNS), 'total',
+            )
+            flags = data.getter('is_integer', 'is_percentage', 'is_text', 'is_title', 'has_heat_colors')
+            numbers = data.getter(*NUMERIC_COLUMNS)
+            prepared_data = [
+                (*values(row), *map(bool, flags(row)), year, week, now, *numbers(row))
+                for row in data.rows
+            ]
+        else:
+            prepared_data = []
         if not prepared_data:
             logging.info("No DataCard data to load into PostgreSQL.")
-            return
+            return True
+        total_records = len(prepared_data)
+        if row_hashes is not None:
+            prepared_data = row_hashes.changed(prepared_data)
         results = []
         for record in prepared_data:
             cursor.execute(insert_query, record)
@@ -77,14 +100,29 @@ def load_datacard_data(pg_conn, data, year, week):
         inserted = sum(1 for r in results if r)
         updated = len(results) - inserted
         pg_conn.commit()
+        if row_hashes is not None:
+            row_hashes.commit()
+        if stats is not None:
+            stats.rows_in = total_records
+            stats.rows_out = len(results)
+            stats.inserted, stats.updated = inserted, updated
+            stats.skipped = total_records - len(prepared_data)
         print("\n=== DataCard ETL Summary ===")
         print(f"Year: {year}, Week: {week}")
-        print(f"Total records processed: {len(prepared_data)}")
+        print(f"Total records processed: {total_records}")
         print(f"New records inserted: {inserted}")
         print(f"Existing records updated: {updated}")
+        if row_hashes is not None:
+            print(f"Unchanged records skipped: {total_records - len(prepared_data)}")
         print("============================\n")
+        return True
     except psycopg2.Error as e:
         logging.error(f"Error loading DataCard data into PostgreSQL: {e}")
         pg_conn.rollback()
+        if row_hashes is not None:
+            row_hashes.discard()
+        if stats is not None:
+            stats.error = str(e)
+        return False
     finally:
         cursor.close()
@@ -1,20 +1,92 @@
+import logging
+from datetime import timedelta
+
+from state.row_hashes import RowHashIndex
+
+ORDER_COLUMNS = (
+    'customer', 'warehouse', 'warehouse_city_state', 'order_number', 'shipment_number',
+    'order_type', 'date', 'order_class', 'source_state', 'destination_state',
+    'year', 'month', 'month_name', 'quarter', 'week', 'day',
+)
+ORDER_KEY_COLUMNS = ('order_number', 'shipment_number')
+# How far (in days) an order's date may move between loads and still replace its stale row
+ORDERS_MOVED_WINDOW_DAYS = 62
+
+def orders_row_hash_index():
+    """Local change-detection index for data_orders (see state/row_hashes.py)."""
+    return RowHashIndex('data_orders', ORDER_COLUMNS, ORDER_KEY_COLUMNS)
 
 def load_orders(pg_conn, data):
     """
-    Loads extracted order data into the Orders table in PostgreSQL.
+    Loads a RowBatch of transformed orders into the Orders table in PostgreSQL.
+    """
+    return load_orders_batches(pg_conn, [data])
+
+def load_orders_batches(pg_conn, batches, row_hashes=None, commit_every=0, checkpoint=None, stats=None,
+                        moved_window_days=ORDERS_MOVED_WINDOW_DAYS):
+    """
+    Loads an iterable of order RowBatches into the Orders table. With
+    `commit_every` N > 0 the transaction is committed every N batches;
+    with 0 the whole load is a single transaction, committed once every batch
+    has been written (the new state becomes visible atomically).
+
+    `checkpoint` (a LoadCheckpoint) is updated in the same transaction as the
+    batches it covers, recording their count and key range, and marked
+    completed in the last commit.
+
+    data_orders is range-partitioned by month on `date`, so its unique key is
+    (order_number, shipment_number, date). If an order's date changed since the
+    last load, the stale row (living in another partition) is deleted in the
+    same statement before the upsert. `xmax` cannot be returned from a
+    partitioned table, so inserts are detected against the pre-statement snapshot.
+    Both probes bound `date` with literal values (the row's date, and for stale
+    rows `moved_window_days` around it), so that PostgreSQL prunes them to a few
+    partitions instead of probing the index of every month: the cost of a row
+    stays constant as partitions accumulate. A date that moved further than
+    the window leaves its stale row behind, which
+    `manage.py create_orders_partitions` reports as a duplicate key.
+
+    With `row_hashes` (a RowHashIndex) rows identical to the last committed
+    load are not sent at all. `stats` (a runs.StageRecord) receives the row,
+    inserted, updated and skipped counts and the error. Returns True if the
+    load was committed, False on error (batches committed before the error stay committed).
     """
     cursor = pg_conn.cursor()
     insert_query = """
+        WITH incoming (
+            customer, warehouse, warehouse_city_state, order_number, shipment_number,
+            order_type, date, order_class, source_state, destination_state, year, month, month_name, quarter, week, day
+        ) AS (
+            VALUES (
+                %s::text, %s::text, %s::text, %s::text, %s::text,
+                %s::text, %s::date, %s::text, %s::text, %s::text,
+                %s::integer, %s::integer, %s::text, %s::integer, %s::integer, %s::integer
+            )
+        ), moved AS (
+            DELETE FROM data_orders o
+            USING incoming i
+            WHERE o.order_number = i.order_number AND o.shipment_number = i.shipment_number
+                AND o.date <> i.date
+                AND o.date BETWEEN %s::date AND %s::date
+        ), existing AS (
+            SELECT 1 FROM data_orders o
+            JOIN incoming i ON o.order_number = i.order_number AND o.shipment_number = i.shipment_number
+                AND o.date = i.date
+            WHERE o.date = %s::date
+        )
         INSERT INTO data_orders (
             customer, warehouse, warehouse_city_state, order_number, shipment_number,
             order_type, date, order_class, source_state, destination_state, year, month, month_name, quarter, week, day, fetched_at
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
-        ON CONFLICT (order_number, shipment_number) DO UPDATE SET
+        )
+        SELECT
+            customer, warehouse, warehouse_city_state, order_number, shipment_number,
+            order_type, date, order_class, source_state, destination_state, year, month, month_name, quarter, week, day, NOW()
+        FROM incoming
+        ON CONFLICT (order_number, shipment_number, date) DO UPDATE SET
             customer = EXCLUDED.customer,
             warehouse = EXCLUDED.warehouse,
             warehouse_city_state = EXCLUDED.warehouse_city_state,
             order_type = EXCLUDED.order_type,
-            date = EXCLUDED.date,
             order_class = EXCLUDED.order_class,
             source_state = EXCLUDED.source_state,
             destination_state = EXCLUDED.destination_state,
@@ -25,32 +97,81 @@ def load_orders(pg_conn, data):
             week = EXCLUDED.week,
             day = EXCLUDED.day,
             fetched_at = EXCLUDED.fetched_at
-        RETURNING (xmax = 0) as inserted;
+        RETURNING NOT EXISTS (SELECT 1 FROM existing) AS inserted;
     """
-    try:
-        inserted = 0
-        updated = 0
-        for row in data:
-            cursor.execute(insert_query, (
-                row.get('customer'), row.get('warehouse'), row.get('warehouse_city_state'),
-                row.get('order_number'), row.get('shipment_number'), row.get('order_type'),
-                row.get('date'), row.get('order_class'),
-                row.get('source_state'), row.get('destination_state'),
-                row.get('year'), row.get('month'), row.get('month_name'), row.get('quarter'), row.get('week'), row.get('day')
-            ))
-            result = cursor.fetchone()
-            if result and result[0]:
-                inserted += 1
-            else:
-                updated += 1
+    window = timedelta(days=moved_window_days)
+    date_index = ORDER_COLUMNS.index('date')
+    inserted = 0
+    updated = 0
+    received = 0
+    pending = {'batches': 0, 'rows': 0, 'first_key': None, 'last_key': None}
+
+    def commit(completed=False):
+        if checkpoint is not None:
+            checkpoint.save(
+                cursor, pending['batches'], pending['rows'], pending['first_key'], pending['last_key'], completed,
+            )
         pg_conn.commit()
+        if row_hashes is not None:
+            row_hashes.commit()
+        pending.update(batches=0, rows=0, first_key=None)
+
+    try:
+        for batch in batches:
+            if batch.rows:
+                key = batch.getter(*ORDER_KEY_COLUMNS)
+                if pending['first_key'] is None:
+                    pending['first_key'] = list(key(batch.rows[0]))
+                pending['last_key'] = list(key(batch.rows[-1]))
+            # Rows go out as positional tuples in ORDER_COLUMNS order (the VALUES row above)
+            records = batch.select(ORDER_COLUMNS)
+            if row_hashes is not None:
+                records = row_hashes.changed(records)
+            for record in records:
+                date = record[date_index]
+                bounds = (date - window, date + window, date) if date is not None else (None, None, None)
+                cursor.execute(insert_query, (*record, *bounds))
+                result = cursor.fetchone()
+                if result and result[0]:
+                    inserted += 1
+                else:
+                    updated += 1
+            received += len(batch)
+            pending['batches'] += 1
+            pending['rows'] += len(batch)
+            if commit_every and pending['batches'] >= commit_every:
+                commit()
+                if checkpoint is not None:
+                    logging.info(
+                        f"Orders: {checkpoint.batches} batches ({checkpoint.rows} rows) committed, "
+                        f"last key {pending['last_key']}."
+                    )
+        commit(completed=True)
+        skipped = 0
+        if row_hashes is not None:
+            skipped = row_hashes.skipped
+        if stats is not None:
+            stats.rows_in = received
+            stats.rows_out = inserted + updated
+            stats.inserted, stats.updated, stats.skipped = inserted, updated, skipped
         print("\n=== Orders ETL Summary ===")
-        print(f"Total records processed: {len(data)}")
+        print(f"Total records processed: {inserted + updated + skipped}")
         print(f"New records inserted: {inserted}")
         print(f"Existing records updated: {updated}")
+        if row_hashes is not None:
+            print(f"Unchanged records skipped: {skipped}")
         print("==========================\n")
+        return True
     except Exception as e:
         pg_conn.rollback()
-        print(f"Error loading Orders data: {e}")
+        if row_hashes is not None:
+            row_hashes.discard()
+        logging.exception("Error loading Orders data")
+        if stats is not None:
+            stats.rows_in = received
+            stats.error = str(e)
+        if checkpoint is not None and checkpoint.batches:
+            print(f"{checkpoint.batches} batches ({checkpoint.rows} rows) were committed before the error; --resume (or the next sync of a spooled load) continues from there.")
+        return False
     finally:
         cursor.close()
@@ -3,7 +3,7 @@ import psycopg2
 from datetime import datetime
 
 def load_test_data(pg_conn, data):
-    """Loads the extracted data into the PostgreSQL test table."""
+    """Loads the extracted RowBatch into the PostgreSQL test table."""
     cursor = pg_conn.cursor()
     insert_query = """
         INSERT INTO data_testdata (order_id, order_class_id, order_status_id, lookup_code, fetched_at)
@@ -17,15 +17,11 @@ def load_test_data(pg_conn, data):
     """
     try:
         now = datetime.now()
-        prepared_data = []
-        for item in data:
-            prepared_data.append((
-                item['id'],
-                item['orderClassId'],
-                item['orderStatusId'],
-                item['lookupCode'],
-                now
-            ))
+        if data.rows:
+            order = data.getter('id', 'orderClassId', 'orderStatusId', 'lookupCode')
+            prepared_data = [(*order(row), now) for row in data.rows]
+        else:
+            prepared_data = []
         if not prepared_data:
             logging.info("No data to load into PostgreSQL.")
             return
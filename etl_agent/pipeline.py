@@ -0,0 +1,184 @@
+# etl_agent/pipeline.py
+"""
+Pipelined execution of an ETL job.
+
+Extraction, transformation and loading run concurrently and exchange row
+batches through bounded queues: while the loader waits on the PostgreSQL
+round-trips, the extractor is already fetching the next batches from MSSQL.
+A full queue blocks its producer (backpressure), so memory stays bounded by
+`queue_size` batches per queue.
+
+    run_pipeline('orders', source, transform, sink)
+
+- source: iterable of batches, consumed in the extractor thread.
+- transform: function batch -> batch, run in the transformer thread.
+- sink: function that receives an iterator of transformed batches and loads
+  them; it runs in the calling thread and owns the target transaction.
+"""
+import logging
+import queue
+import threading
+import time
+
+_DONE = object()
+# Seconds between checks of the stop flag while blocked on a queue
+_POLL_SECONDS = 0.5
+
+
+class StageStats:
+    """Counters of one pipeline stage."""
+    __slots__ = ('batches', 'busy_seconds', 'depth_samples', 'depth_total', 'max_depth', 'name', 'rows')
+
+    def __init__(self, name):
+        self.name = name
+        self.batches = 0
+        self.rows = 0
+        self.busy_seconds = 0.0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.max_depth = 0
+
+    def add_batch(self, batch, seconds):
+        self.batches += 1
+        self.rows += len(batch)
+        self.busy_seconds += seconds
+
+    def sample_depth(self, depth):
+        """Records the depth of the stage's input queue when it takes a batch."""
+        self.depth_samples += 1
+        self.depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    def rows_per_second(self):
+        return self.rows / self.busy_seconds if self.busy_seconds else 0.0
+
+    def summary(self):
+        summary = (
+            f"{self.name}: {self.rows} rows in {self.batches} batches, "
+            f"busy {self.busy_seconds:.1f}s ({self.rows_per_second():.0f} rows/s)"
+        )
+        if self.depth_samples:
+            summary += (
+                f", input queue depth avg {self.depth_total / self.depth_samples:.1f} max {self.max_depth}"
+            )
+        return summary
+
+
+class _Stop(Exception):
+    """The pipeline was stopped by another stage."""
+
+    def __init__(self):
+        super().__init__("pipeline stopped by another stage")
+
+
+def _put(target, item, stop):
+    while True:
+        if stop.is_set():
+            raise _Stop
+        try:
+            target.put(item, timeout=_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+
+def _get(source, stop):
+    while True:
+        if stop.is_set():
+            raise _Stop
+        try:
+            return source.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+
+
+def run_pipeline(name, source, transform, sink, queue_size=4, log_every=10):
+    """
+    Runs source -> transform -> sink concurrently. Returns the per-stage
+    StageStats; the first error raised by any stage is re-raised here.
+    """
+    extracted = queue.Queue(maxsize=queue_size)
+    transformed = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    errors = []
+    stats = {stage: StageStats(stage) for stage in ('extract', 'transform', 'load')}
+
+    def log_progress(stage_stats):
+        if stage_stats.batches % log_every == 0:
+            logging.info(
+                f"[{name}] {stage_stats.summary()} "
+                f"(queues: extracted={extracted.qsize()}, transformed={transformed.qsize()})"
+            )
+
+    def extract_worker():
+        try:
+            iterator = iter(source)
+            while True:
+                started = time.perf_counter()
+                batch = next(iterator, _DONE)
+                if batch is _DONE:
+                    break
+                stats['extract'].add_batch(batch, time.perf_counter() - started)
+                log_progress(stats['extract'])
+                _put(extracted, batch, stop)
+            _put(extracted, _DONE, stop)
+        except _Stop:
+            pass
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    def transform_worker():
+        try:
+            while True:
+                stats['transform'].sample_depth(extracted.qsize())
+                batch = _get(extracted, stop)
+                if batch is _DONE:
+                    break
+                started = time.perf_counter()
+                batch = transform(batch)
+                stats['transform'].add_batch(batch, time.perf_counter() - started)
+                _put(transformed, batch, stop)
+            _put(transformed, _DONE, stop)
+        except _Stop:
+            pass
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+
+    def transformed_batches():
+        # The time between yields is the time the sink spends loading the batch
+        while True:
+            stats['load'].sample_depth(transformed.qsize())
+            batch = _get(transformed, stop)
+            if batch is _DONE:
+                return
+            started = time.perf_counter()
+            yield batch
+            stats['load'].add_batch(batch, time.perf_counter() - started)
+            log_progress(stats['load'])
+
+    threads = [
+        threading.Thread(target=extract_worker, name=f'{name}-extract', daemon=True),
+        threading.Thread(target=transform_worker, name=f'{name}-transform', daemon=True),
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        sink(transformed_batches())
+    except _Stop:
+        pass
+    finally:
+        # If the sink stopped early (or failed) the producers must not stay blocked
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    elapsed = time.perf_counter() - started
+    for stage_stats in stats.values():
+        logging.info(f"[{name}] {stage_stats.summary()}")
+    logging.info(f"[{name}] pipeline finished in {elapsed:.1f}s")
+    if errors:
+        raise errors[0]
+    return stats
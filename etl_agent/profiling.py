@@ -0,0 +1,228 @@
+# etl_agent/profiling.py
+"""
+Profiling of the ETL stages (`run_etl.py ... --profile`).
+
+A StageProfiler runs every stage of a job under cProfile, in the thread that
+executes the stage, and follows its Python allocations with tracemalloc (peak
+traced memory and the source lines whose allocations grew the most). When the
+job ends, `close()` writes to <dir>/<job>/<run_id>/ (by default <dir> is
+ETL_STATE_DIR/profiles; run_id is the one recorded in data_etl_run):
+
+    <stage>.prof   pstats file (`python -m pstats`, snakeviz...)
+    summary.txt    top-N functions by cumulative and own time, and top-N
+                   allocation sites, per stage
+
+Without --profile no profiler is created and the stages run unwrapped.
+
+Notes: tracemalloc is process-wide, so the memory figures of stages that run at
+the same time (pipeline threads, overlapping `serve` jobs) include each other's
+allocations. From Python 3.12 only one cProfile profiler can be active at once;
+a stage that cannot enable its own is timed without CPU profile.
+"""
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from state import state_dir
+
+DEFAULT_TOP = 25
+
+_DONE = object()
+
+# The profiler's own bookkeeping is left out of the allocation sites
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    global _tracing_started, _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_started, _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        # Only stops tracing it started itself (not e.g. python -X tracemalloc)
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def _megabytes(size, sign=False):
+    return f"{size / 2**20:{'+' if sign else ''},.1f} MB"
+
+
+class _StageProfile:
+    def __init__(self, name):
+        self.name = name
+        self.profile = cProfile.Profile()
+        self.profiled = False
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_bytes = None
+        self.allocations = {}  # traceback -> [size_diff, count_diff]
+
+    def add_allocations(self, differences):
+        for difference in differences:
+            totals = self.allocations.setdefault(difference.traceback, [0, 0])
+            totals[0] += difference.size_diff
+            totals[1] += difference.count_diff
+
+    def summary(self, top):
+        lines = [f"== {self.name}: {self.seconds:.2f}s in {self.calls} call(s)"]
+        if self.peak_bytes is not None:
+            lines[0] += f", peak traced memory {_megabytes(self.peak_bytes)}"
+        lines[0] += " =="
+        if self.profiled:
+            for sort, title in (('cumulative', 'cumulative time'), ('tottime', 'own time')):
+                output = io.StringIO()
+                pstats.Stats(self.profile, stream=output).sort_stats(sort).print_stats(top)
+                lines += [f"-- top {top} functions by {title} --", output.getvalue().strip(), '']
+        grown = sorted(
+            ((size, count, traceback) for traceback, (size, count) in self.allocations.items() if size > 0),
+            key=lambda item: item[0],
+            reverse=True,
+        )[:top]
+        if grown:
+            lines.append(f"-- top {top} allocation sites (memory still held at the end of the stage) --")
+            lines += [f"{traceback}: {_megabytes(size, sign=True)} ({count:+,} blocks)" for size, count, traceback in grown]
+        lines.append('')
+        return lines
+
+
+class StageProfiler:
+    """
+    Args:
+        job: job name, used in the output path.
+        run_id: run identifier (RunRecorder.run_id), used in the output path.
+        directory: base directory; True uses ETL_STATE_DIR/profiles.
+        top: number of entries of each list in summary.txt.
+    """
+
+    def __init__(self, job, run_id, directory=True, top=DEFAULT_TOP):
+        base = directory if isinstance(directory, str) else os.path.join(state_dir(), 'profiles')
+        self.job = job
+        self.run_id = run_id
+        self.directory = os.path.join(base, job, run_id)
+        self.top = top
+        self.stages = {}
+        self.lock = threading.Lock()
+        self.warned = False
+        self.closed = False
+        _start_tracing()
+
+    def _stage(self, name):
+        with self.lock:
+            if name not in self.stages:
+                self.stages[name] = _StageProfile(name)
+            return self.stages[name]
+
+    def _enable(self, stage):
+        try:
+            stage.profile.enable()
+        except ValueError as e:  # Python 3.12+: another profiler is active
+            if not self.warned:
+                logging.warning(f"[{self.job}] stage '{stage.name}' runs without CPU profile: {e}")
+                self.warned = True
+            return False
+        stage.profiled = True
+        return True
+
+    @contextmanager
+    def _timed(self, stage, cpu):
+        profiling = cpu and self._enable(stage)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profiling:
+                stage.profile.disable()
+            stage.seconds += time.perf_counter() - started
+            stage.calls += 1
+
+    @contextmanager
+    def stage(self, name, cpu=True):
+        """Profiles the block as stage `name` (CPU in the calling thread, and memory)."""
+        stage = self._stage(name)
+        before = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            with self._timed(stage, cpu):
+                yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            stage.peak_bytes = max(stage.peak_bytes or 0, peak)
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            stage.add_allocations(after.compare_to(before, 'lineno'))
+
+    def wrap_iter(self, name, iterable):
+        """Yields from `iterable` profiling each step as stage `name` (CPU only), in the consuming thread."""
+        stage = self._stage(name)
+
+        def profiled():
+            iterator = iter(iterable)
+            try:
+                while True:
+                    with self._timed(stage, cpu=True):
+                        item = next(iterator, _DONE)
+                    if item is _DONE:
+                        return
+                    yield item
+            finally:
+                close = getattr(iterator, 'close', None)
+                if close is not None:
+                    close()
+
+        return profiled()
+
+    def wrap_call(self, name, function):
+        """Returns `function` profiling each call as stage `name` (CPU only)."""
+        stage = self._stage(name)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self._timed(stage, cpu=True):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    def close(self):
+        """Stops tracing and writes the per-stage .prof files and summary.txt."""
+        if self.closed:
+            return
+        self.closed = True
+        _stop_tracing()
+        if not self.stages:
+            return
+        lines = [f"Profile of {self.job} run {self.run_id}", '']
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for stage in self.stages.values():
+                if stage.profiled:
+                    stage.profile.dump_stats(os.path.join(self.directory, f"{stage.name}.prof"))
+                lines += stage.summary(self.top)
+            with open(os.path.join(self.directory, 'summary.txt'), 'w', encoding='utf-8') as summary:
+                summary.write('\n'.join(lines))
+        except OSError as e:
+            logging.error(f"[{self.job}] could not write the profile to {self.directory}: {e}")
+            return
+        logging.info(f"[{self.job}] profile written to {self.directory}")
@@ -0,0 +1,67 @@
+# etl_agent/rows.py
+"""
+Compact row model shared by extractors, transformers and loaders.
+
+A RowBatch holds the rows of one batch as positional tuples (or the pyodbc
+Row objects returned by the cursor) plus the column names they share.
+Column positions are resolved once per batch with `getter()`/`position()`,
+so no per-row dicts are built anywhere in the pipeline.
+"""
+from operator import itemgetter
+
+
+class RowBatch:
+    __slots__ = ('columns', 'positions', 'rows')
+
+    def __init__(self, columns, rows):
+        self.columns = tuple(columns)
+        self.positions = {column: index for index, column in enumerate(self.columns)}
+        self.rows = rows
+
+    @classmethod
+    def from_cursor(cls, cursor, rows):
+        return cls([column[0] for column in cursor.description], rows)
+
+    @classmethod
+    def concat(cls, batches):
+        """Merges batches that share the same columns into one RowBatch."""
+        columns, rows = (), []
+        for batch in batches:
+            columns = batch.columns
+            rows.extend(batch.rows)
+        return cls(columns, rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def position(self, column):
+        return self.positions[column]
+
+    def getter(self, *columns):
+        """
+        itemgetter returning the given columns of a row; with several columns it
+        returns a tuple in that order.
+        """
+        return itemgetter(*(self.positions[column] for column in columns))
+
+    def split(self, size):
+        """Consecutive sub-batches of at most `size` rows."""
+        return [RowBatch(self.columns, self.rows[start:start + size]) for start in range(0, len(self.rows), size)]
+
+    def select(self, columns):
+        """Rows as tuples with exactly `columns`, in that order."""
+        columns = tuple(columns)
+        if columns == self.columns:
+            return self.rows
+        if len(columns) == 1:
+            pick = self.getter(*columns)
+            return [(pick(row),) for row in self.rows]
+        pick = self.getter(*columns)
+        return [pick(row) for row in self.rows]
+
+    def to_dicts(self):
+        """Rows as dicts (debugging and ad-hoc inspection only)."""
+        return [dict(zip(self.columns, row)) for row in self.rows]
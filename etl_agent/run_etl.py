@@ -4,17 +4,44 @@ from datetime import datetime
 import logging
 import os
 import argparse
+import signal
+import time
+from functools import partial
 from database.mssql import get_mssql_connection
 from database.postgres import get_postgres_connection
+from database.warm import WarmConnection
 from extracts.testing import extract_recent_orders
-from extracts.orders import extract_orders
+from extracts.orders import (
+    ORDERS_BATCH_SIZE,
+    ORDERS_PARALLEL_BUFFER_ROWS,
+    iter_orders_batches,
+    iter_orders_batches_parallel,
+    orders_partitions,
+)
 from extracts.datacard import extract_datacard_reports
+from extracts.dimensions import OrderDimensions
 from loaders.testing import load_test_data
-from loaders.orders import load_orders
-from loaders.datacard import load_datacard_data
+from loaders.orders import load_orders_batches, orders_row_hash_index
+from loaders.datacard import datacard_row_hash_index, load_datacard_data
+from loaders.checkpoints import LoadCheckpoint
+from transformers.datacard import transform_datacard
 from transformers.orders import transform_orders
+from pipeline import run_pipeline
+from scheduler import CronSchedule, Job, Scheduler
+from rows import RowBatch
+from profiling import DEFAULT_TOP
+from runs import RunRecorder, StageRecord
+from state.dimensions import DEFAULT_TTL_SECONDS, DimensionCache
+from state.spool import SpoolWriter, pending_segments
 
 # --- Configuration ---
+# Default schedules of serve mode (overridden with ETL_SCHEDULE_<JOB> in the .env)
+DEFAULT_SCHEDULES = {
+    'testing': '0 6 * * *',
+    'datacard': '*/15 * * * *',
+    'orders': '0 * * * *',
+}
+
 # --- Database Connection Functions ---
 def get_db_connection(db_type):
     """Establece conexión a la base de datos especificada."""
@@ -42,11 +69,146 @@ def get_current_year_week():
     logging.info(f"Usando año={year}, semana={week} (semana actual)")
     return year, week
 
-# --- Main Execution ---
-def main(args): # Cambiamos para aceptar el objeto args completo
-    environment = args.environment
-    query_target = args.query_target
-    logging.info(f"Starting ETL process for environment: {environment}, target: {query_target}")
+def get_row_hash_index(args, pg_conn, factory):
+    """
+    Local row hash index (state/row_hashes.py) if --skip_unchanged or
+    --rebuild_hash_index was given; with the latter it is first rebuilt from PostgreSQL.
+    """
+    if not (args.skip_unchanged or args.rebuild_hash_index):
+        return None
+    row_hashes = factory()
+    if args.rebuild_hash_index:
+        print(f"Rebuilding the hash index of {row_hashes.table} from PostgreSQL...")
+        row_hashes.rebuild(pg_conn)
+    return row_hashes
+
+def orders_source(args, mssql_conn, after_key=None):
+    """
+    Orders batches extracted from MSSQL: with --parallel_extract N > 1 the partitions
+    (--partition_by) are extracted in parallel over N connections of their own. With
+    per-batch commits (--commit_every > 0) the output is ordered by key, so that a
+    checkpoint can be resumed from `after_key`.
+    """
+    if args.parallel_extract > 1:
+        partitions = orders_partitions(args.partition_by)
+        print(f"Parallel extract: {len(partitions)} partitions by {args.partition_by}, {args.parallel_extract} connections.")
+        return iter_orders_batches_parallel(
+            get_mssql_connection, partitions, parallelism=args.parallel_extract, batch_size=args.batch_size,
+            buffer_rows=args.extract_buffer_rows,
+        )
+    return iter_orders_batches(
+        mssql_conn, batch_size=args.batch_size, ordered=args.commit_every > 0, after_key=after_key,
+    )
+
+def orders_checkpoint(args, pg_conn):
+    """
+    Checkpoint of the direct Orders load (loaders/checkpoints.py) and the key to resume
+    the extract from; without per-batch commits (--commit_every 0) there is no checkpoint.
+    """
+    if not args.commit_every:
+        if args.resume:
+            logging.warning("--resume ignored: only loads with per-batch commits (--commit_every N > 0) leave a checkpoint.")
+        return None, None
+    previous = None
+    if args.resume:
+        previous = LoadCheckpoint.resumable(pg_conn, 'orders')
+        if previous is None:
+            print("--resume: no interrupted Orders load; loading everything.")
+        elif args.parallel_extract > 1:
+            logging.warning("--resume ignored with --parallel_extract: the parallel output is ordered by partition, not by key.")
+            previous = None
+        else:
+            print(
+                f"Resuming Orders load {previous['run_id']} after {previous['batches_committed']} batches "
+                f"({previous['rows_committed']} rows), from key {previous['last_key']}."
+            )
+    run_id = previous['run_id'] if previous else datetime.now().strftime('%Y%m%dT%H%M%S')
+    return LoadCheckpoint('orders', run_id, previous=previous), previous['last_key'] if previous else None
+
+def orders_transform(args, mssql_conn, record):
+    """
+    Returns transform_orders with the dimensions (projects, warehouses, order
+    classes) resolved from the local cache, and the OrderDimensions to close.
+    Unknown keys refresh the affected dimensions on MSSQL and the batch is
+    transformed again; rows still unknown are counted in `record.skipped`.
+    """
+    dimensions = OrderDimensions(
+        mssql_conn, get_mssql_connection, DimensionCache(ttl_seconds=args.dimension_ttl), force=args.refresh_dimensions,
+    )
+
+    def on_dropped(count):
+        record.skipped = (record.skipped or 0) + count
+
+    def transform(batch):
+        return transform_orders(batch, dimensions.current, refresh=dimensions.refresh, on_dropped=on_dropped)
+
+    return transform, dimensions
+
+# Jobs that can go through the spool, with the factory of their hash index
+SPOOLED_JOBS = {'datacard': datacard_row_hash_index, 'orders': orders_row_hash_index}
+
+def run_recorder(args, job):
+    """RunRecorder of the job; with --profile it also profiles its stages (profiling.py)."""
+    profile = (args.profile_dir or True) if args.profile else None
+    return RunRecorder(job, profile=profile, profile_top=args.profile_top)
+
+def sync_spool(pg_conn, args, jobs=tuple(SPOOLED_JOBS)):
+    """
+    Sends the complete spool segments (state/spool.py) of `jobs` to PostgreSQL, oldest
+    first. Each segment is removed only after its load committed; if a load fails,
+    the sync stops and the rest stays in the spool for the next 'sync', without
+    extracting from MSSQL again.
+    """
+    for job in jobs:
+        factory = SPOOLED_JOBS[job]
+        segments = pending_segments(job)
+        if not segments:
+            continue
+        print(f"\n=== Spool sync of {job}: {len(segments)} pending segment(s) ===")
+        recorder = run_recorder(args, f'{job}_sync')
+        row_hashes = get_row_hash_index(args, pg_conn, factory)
+        for segment in segments:
+            logging.info(f"Sync of {job}: segment {segment.name} ({segment.meta['rows']} rows).")
+            if row_hashes is not None:
+                row_hashes.skipped = 0  # the load summary is per segment
+            stage = StageRecord('load')
+            started = time.perf_counter()
+            try:
+                with recorder.profile('load'):
+                    if job == 'orders':
+                        # A half-sent segment continues after its last committed batch
+                        previous = LoadCheckpoint.resumable(pg_conn, 'orders_spool')
+                        if previous and previous['run_id'] != segment.name:
+                            previous = None
+                        skip = previous['batches_committed'] if previous else 0
+                        if skip:
+                            logging.info(f"Sync of orders: segment {segment.name} continues after {skip} batches already committed.")
+                        loaded = load_orders_batches(
+                            pg_conn, segment.batches(skip=skip), row_hashes=row_hashes, commit_every=args.commit_every,
+                            checkpoint=LoadCheckpoint('orders_spool', segment.name, previous=previous), stats=stage,
+                        )
+                    else:
+                        loaded = all(
+                            load_datacard_data(
+                                pg_conn, batch, segment.meta['year'], segment.meta['week'], row_hashes=row_hashes, stats=stage,
+                            )
+                            for batch in segment.batches()
+                        )
+            except Exception as e:
+                logging.error(f"Error sending segment {segment.name} of {job}: {e}")
+                stage.error = str(e)
+                loaded = False
+            recorder.add_record(stage, time.perf_counter() - started)
+            if not loaded:
+                logging.error(f"Sync of {job} stopped at segment {segment.name}; it stays in the spool for the next 'sync'.")
+                break
+            segment.remove()
+        if row_hashes is not None:
+            row_hashes.close()
+        recorder.save(pg_conn)
+
+def load_environment(environment):
+    """Loads etl_agent/.env.<environment>; returns False if the file does not exist."""
     # Construir la ruta al archivo .env basado en el argumento
     env_file = f".env.{environment}"
     # __file__ da la ruta del script actual (run_etl.py)
@@ -57,88 +219,219 @@ def main(args): # Cambiamos para aceptar el objeto args completo
     if not os.path.exists(env_path):
         logging.error(f"El archivo de entorno '{env_file}' no se encontró en {os.path.dirname(__file__)}")
         logging.error(f"Ruta buscada: {env_path}")
-        return
+        return False
 
     # Cargar las variables de entorno desde el archivo especificado
     load_dotenv(dotenv_path=env_path)
     logging.info(f"Cargando configuración desde: {env_path}")
+    return True
 
-    mssql_conn = get_mssql_connection()
-    pg_conn = get_postgres_connection()
-
-    if not mssql_conn or not pg_conn:
-        logging.error("Failed to establish database connections. Exiting.")
+# --- Jobs ---
+def run_testing(args, mssql_conn, pg_conn):
+    """Test process (recent orders)."""
+    if not pg_conn:
+        logging.warning("Process 'testing' skipped: PostgreSQL is not available.")
         return
-
+    print("\n=== Iniciando proceso ETL de Test Orders (testing) ===")
+    logging.info("Ejecutando proceso 'testing' (órdenes recientes).")
+    recorder = run_recorder(args, 'testing')
     try:
-        # 1. Proceso de prueba (órdenes recientes)
-        if query_target == "testing" or query_target == "all":
-            print("\n=== Iniciando proceso ETL de Test Orders (testing) ===")
-            logging.info("Ejecutando proceso 'testing' (órdenes recientes).")
+        with recorder.stage('extract') as stage:
             recent_orders = extract_recent_orders(mssql_conn, limit=5)
-            if recent_orders:
+            stage.rows_out = len(recent_orders)
+        if recent_orders:
+            with recorder.stage('load', rows_in=len(recent_orders)):
                 load_test_data(pg_conn, recent_orders)
+        else:
+            logging.info("No recent orders found to load for 'testing' process.")
+            print("No se encontraron órdenes recientes para cargar (proceso 'testing').")
+    finally:
+        recorder.save(pg_conn)
+
+def run_datacard(args, mssql_conn, pg_conn):
+    """Proceso DataCard - "datacard"."""
+    print("\n=== Iniciando proceso ETL de DataCard (datacard) ===")
+    logging.info("Ejecutando proceso 'datacard'.")
+
+    # Determinar año y semana para DataCard
+    current_dt = datetime.now()
+    if args.week is not None:
+        week = args.week
+        year = args.year if args.year is not None else current_dt.year
+        logging.info(f"DataCard: Usando año={year}, semana={week} (especificados por argumentos CLI o año actual por defecto para semana especificada).")
+    else:
+        # Si la semana no se especifica, el argumento de año se ignora y usamos el año/semana actuales.
+        if args.year is not None:
+            logging.warning("DataCard: El argumento --year se ignora cuando --week no está especificado. Usando año y semana actuales.")
+        year, week = get_current_year_week() # Esta función ya registra "Usando año=Y, semana=W (semana actual)"
+
+    # Lista específica de warehouses IDs que funcionan
+    warehouses = '1,12,20,23,27'  # Lista de warehouses específicos que funcionan
+
+    print(f"Extrayendo DataCard para año={year}, semana={week}, warehouses='{warehouses}'")
+    logging.info(f"Iniciando extracción de DataCard para año={year}, semana={week}")
+    recorder = run_recorder(args, 'datacard')
+    try:
+        with recorder.stage('extract') as stage:
+            datacard_data = extract_datacard_reports(mssql_conn, year, week, warehouses)
+            stage.rows_out = len(datacard_data) if datacard_data else 0
+
+        if datacard_data:
+            print(f"Se extrajeron {len(datacard_data)} registros de DataCard.")
+            with recorder.stage('transform', rows_in=len(datacard_data)) as stage:
+                datacard_data = transform_datacard(datacard_data)
+                stage.rows_out = len(datacard_data)
+            if args.spool:
+                with recorder.stage('spool', rows_in=len(datacard_data)) as stage:
+                    spool = SpoolWriter('datacard', meta={'year': year, 'week': week})
+                    spool.write(datacard_data)
+                    spool.close()
+                    stage.rows_out = spool.rows
             else:
-                logging.info("No recent orders found to load for 'testing' process.")
-                print("No se encontraron órdenes recientes para cargar (proceso 'testing').")
-                
-        # 2. Proceso DataCard - "datacard"
-        if query_target == "datacard" or query_target == "all":
-            print("\n=== Iniciando proceso ETL de DataCard (datacard) ===")
-            logging.info("Ejecutando proceso 'datacard'.")
-
-            # Determinar año y semana para DataCard
-            current_dt = datetime.now()
-            if args.week is not None:
-                week = args.week
-                year = args.year if args.year is not None else current_dt.year
-                logging.info(f"DataCard: Usando año={year}, semana={week} (especificados por argumentos CLI o año actual por defecto para semana especificada).")
+                row_hashes = get_row_hash_index(args, pg_conn, datacard_row_hash_index)
+                try:
+                    with recorder.stage('load') as stage:
+                        if not load_datacard_data(pg_conn, datacard_data, year, week, row_hashes=row_hashes, stats=stage):
+                            raise RuntimeError(f"DataCard load failed: {stage.error}")
+                finally:
+                    if row_hashes is not None:
+                        row_hashes.close()
+        else:
+            message = f"No se encontraron datos de DataCard para cargar (año: {year}, semana: {week}, warehouses: '{warehouses}')."
+            logging.info(message)
+            print(f"⚠️ {message}")
+    except Exception as e:
+        error_message = f"❌ Error procesando DataCard: {str(e)}"
+        logging.error(error_message)
+        print(error_message)
+        recorder.fail(e)
+    finally:
+        recorder.save(pg_conn)
+
+def run_orders(args, mssql_conn, pg_conn):
+    """Proceso Orders - "orders"."""
+    print("\n=== Iniciando proceso ETL de Orders (orders) ===")
+    logging.info("Ejecutando proceso 'orders'.")
+    spool = None
+    row_hashes = None
+    recorder = run_recorder(args, 'orders')
+    # The load (or spool write) fills this record with its counts
+    load_stage = StageRecord('spool' if args.spool else 'load')
+    # Rows dropped for unknown dimension keys are counted as skipped by the transform
+    transform_stage = StageRecord('transform')
+    dimensions = None
+    try:
+        if args.spool:
+            # Batches go to the local spool first; the sync sends them afterwards
+            spool = SpoolWriter('orders')
+
+            def sink(batches):
+                spool.write_all(batches)
+                load_stage.rows_in = load_stage.rows_out = spool.rows
+
+            resume_key = None
+        else:
+            row_hashes = get_row_hash_index(args, pg_conn, orders_row_hash_index)
+            checkpoint, resume_key = orders_checkpoint(args, pg_conn)
+
+            def sink(batches):
+                # A failed load stops the pipeline and fails the run; batches already
+                # committed (--commit_every N > 0) keep their checkpoint for --resume
+                if not load_orders_batches(
+                    pg_conn, batches, row_hashes=row_hashes, commit_every=args.commit_every, checkpoint=checkpoint,
+                    stats=load_stage,
+                ):
+                    raise RuntimeError(f"Orders load failed: {load_stage.error}")
+
+        transform, dimensions = orders_transform(args, mssql_conn, transform_stage)
+        if args.pipeline:
+            # Overlapped extract, transform and load (see pipeline.py)
+            print(f"Pipeline: batches of {args.batch_size} rows, queues of {args.queue_size} batches.")
+            source = orders_source(args, mssql_conn, after_key=resume_key)
+            if recorder.profiler:
+                # Each stage is profiled in its own thread; memory, for the whole pipeline
+                source = recorder.profiler.wrap_iter('extract', source)
+                transform = recorder.profiler.wrap_call('transform', transform)
+                sink = recorder.profiler.wrap_call(load_stage.name, sink)
+            with recorder.profile('pipeline', cpu=False):
+                stats = run_pipeline('orders', source, transform, sink, queue_size=args.queue_size)
+            # Busy time of each stage (without the waits between queues)
+            recorder.add_stage('extract', stats['extract'].busy_seconds, rows_out=stats['extract'].rows)
+            transform_stage.rows_in, transform_stage.rows_out = stats['extract'].rows, stats['transform'].rows
+            recorder.add_record(transform_stage, stats['transform'].busy_seconds)
+            recorder.add_record(load_stage, stats['load'].busy_seconds)
+        else:
+            with recorder.stage('extract') as stage:
+                orders_data = RowBatch.concat(orders_source(args, mssql_conn, after_key=resume_key))
+                stage.rows_out = len(orders_data)
+            if orders_data:
+                print(f"Se extrajeron {len(orders_data)} registros de Orders.")
+                # Add transformation step
+                print("Transforming Orders data (resolving dimension names, adding year, month, quarter, week, day fields)...")
+                logging.info("Transforming Orders data (resolving dimension names, adding year, month, quarter, week, day fields).")
+                with recorder.stage('transform', rows_in=len(orders_data)) as stage:
+                    orders_data = transform(orders_data)
+                    stage.rows_out = len(orders_data)
+                    stage.skipped = transform_stage.skipped
+                started = time.perf_counter()
+                with recorder.profile(load_stage.name):
+                    sink(orders_data.split(args.batch_size))
+                recorder.add_record(load_stage, time.perf_counter() - started)
             else:
-                # Si la semana no se especifica, el argumento de año se ignora y usamos el año/semana actuales.
-                if args.year is not None:
-                    logging.warning("DataCard: El argumento --year se ignora cuando --week no está especificado. Usando año y semana actuales.")
-                year, week = get_current_year_week() # Esta función ya registra "Usando año=Y, semana=W (semana actual)"
-
-            # Lista específica de warehouses IDs que funcionan
-            warehouses = '1,12,20,23,27'  # Lista de warehouses específicos que funcionan
-            
-            print(f"Extrayendo DataCard para año={year}, semana={week}, warehouses='{warehouses}'")
-            logging.info(f"Iniciando extracción de DataCard para año={year}, semana={week}")
-            try:
-                datacard_data = extract_datacard_reports(mssql_conn, year, week, warehouses)
-                
-                if datacard_data:
-                    print(f"Se extrajeron {len(datacard_data)} registros de DataCard.")
-                    load_datacard_data(pg_conn, datacard_data, year, week)
-                else:
-                    message = f"No se encontraron datos de DataCard para cargar (año: {year}, semana: {week}, warehouses: '{warehouses}')."
-                    logging.info(message)
-                    print(f"⚠️ {message}")
-            except Exception as e:
-                error_message = f"❌ Error procesando DataCard: {str(e)}"
-                logging.error(error_message)
-                print(error_message)
-
-        # 3. Proceso Orders - "orders"
-        if query_target == "orders" or query_target == "all":
-            print("\n=== Iniciando proceso ETL de Orders (orders) ===")
-            logging.info("Ejecutando proceso 'orders'.")
-            try:
-                orders_data = extract_orders(mssql_conn)
-                if orders_data:
-                    print(f"Se extrajeron {len(orders_data)} registros de Orders.")
-                    # Add transformation step
-                    print("Transforming Orders data (adding year, month, quarter, week, day fields)...")
-                    logging.info("Transforming Orders data (adding year, month, quarter, week, day fields).")
-                    orders_data = transform_orders(orders_data)
-                    load_orders(pg_conn, orders_data)
-                else:
-                    logging.info("No se encontraron datos de Orders para cargar.")
-                    print("⚠️ No se encontraron datos de Orders para cargar.")
-            except Exception as e:
-                error_message = f"❌ Error procesando Orders: {str(e)}"
-                logging.error(error_message)
-                print(error_message)
+                logging.info("No se encontraron datos de Orders para cargar.")
+                print("⚠️ No se encontraron datos de Orders para cargar.")
+        if spool:
+            spool.close()
+    except Exception as e:
+        if spool:
+            spool.abort()
+        error_message = f"❌ Error procesando Orders: {str(e)}"
+        logging.error(error_message)
+        print(error_message)
+        recorder.fail(e)
+    finally:
+        if row_hashes is not None:
+            row_hashes.close()
+        if dimensions is not None:
+            dimensions.close()
+        recorder.save(pg_conn)
+
+# Run in this order with --query_target all
+JOBS = {'testing': run_testing, 'datacard': run_datacard, 'orders': run_orders}
+
+def selected_jobs(query_target):
+    return [job for job in JOBS if query_target in (job, 'all')]
+
+# --- Main Execution ---
+def main(args): # Cambiamos para aceptar el objeto args completo
+    environment = args.environment
+    query_target = args.query_target
+    logging.info(f"Starting ETL {args.command} for environment: {environment}, target: {query_target}")
+    if not load_environment(environment):
+        return
+
+    # 'sync' only sends what was left in the spool: it does not need MSSQL
+    mssql_conn = get_mssql_connection() if args.command == 'run' else None
+    pg_conn = get_postgres_connection()
+
+    if (args.command == 'run' and not mssql_conn) or (not pg_conn and not (args.command == 'run' and args.spool)):
+        logging.error("Failed to establish database connections. Exiting.")
+        return
+    if not pg_conn:
+        logging.warning("PostgreSQL is not available: the extracted data stays in the spool until the next 'sync'.")
+
+    spooled = [job for job in selected_jobs(query_target) if job in SPOOLED_JOBS]
+    try:
+        if args.command == 'sync':
+            sync_spool(pg_conn, args, spooled)
+            return
+
+        for job in selected_jobs(query_target):
+            JOBS[job](args, mssql_conn, pg_conn)
+
+        # Send what this run extracted to the spool (and what is pending from earlier runs)
+        if args.spool and pg_conn:
+            sync_spool(pg_conn, args, spooled)
 
     finally:
         # Ensure connections are closed
@@ -151,8 +444,63 @@ def main(args): # Cambiamos para aceptar el objeto args completo
 
     logging.info("ETL process finished.")
 
+def run_scheduled_job(job, args, mssql, postgres):
+    """One scheduled run of `job` in serve mode, over its persistent connections."""
+    mssql_conn = mssql.get()
+    pg_conn = postgres.get()
+    if not mssql_conn or (not pg_conn and not args.spool):
+        logging.error(f"[{job}] Connections not available; retrying on the next run.")
+        return
+    JOBS[job](args, mssql_conn, pg_conn)
+    if args.spool and pg_conn and job in SPOOLED_JOBS:
+        sync_spool(pg_conn, args, [job])
+
+def serve(args):
+    """
+    Daemon mode: the process stays alive and runs each job on its schedule
+    (ETL_SCHEDULE_<JOB> in the .env, 5-field cron format, 'off' disables it).
+    Each job keeps its own connections open between runs and checks them
+    before use; see scheduler.py for the jitter and overlaps.
+    """
+    logging.info(f"Starting ETL agent daemon for environment: {args.environment}, target: {args.query_target}")
+    if not load_environment(args.environment):
+        return
+
+    jobs = []
+    connections = []
+    for job in selected_jobs(args.query_target):
+        expression = os.getenv(f'ETL_SCHEDULE_{job.upper()}', DEFAULT_SCHEDULES[job]).strip()
+        if expression.lower() == 'off':
+            logging.info(f"[{job}] disabled (ETL_SCHEDULE_{job.upper()}=off).")
+            continue
+        mssql = WarmConnection('MSSQL', get_mssql_connection)
+        postgres = WarmConnection('PostgreSQL', get_postgres_connection)
+        connections.extend((mssql, postgres))
+        jobs.append(Job(job, CronSchedule(expression), partial(run_scheduled_job, job, args, mssql, postgres)))
+    if not jobs:
+        logging.error("No scheduled jobs. Exiting.")
+        return
+
+    scheduler = Scheduler(jobs, jitter_seconds=args.jitter)
+    # Ctrl+C or a service stop end after the runs in progress
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: scheduler.stop.set())
+    try:
+        scheduler.run()
+    finally:
+        for connection in connections:
+            connection.close()
+    logging.info("ETL agent daemon stopped.")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Ejecuta el proceso ETL para un entorno específico.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=['run', 'sync', 'serve'],
+        default='run',
+        help="'run' extracts and loads (default); 'sync' only sends the pending batches of the local spool to PostgreSQL; 'serve' keeps running and starts each job on its schedule."
+    )
     parser.add_argument(
         "environment",
         choices=['dev', 'prod'],
@@ -176,7 +524,107 @@ if __name__ == "__main__":
         default=None,
         help="Especifica la semana para el reporte DataCard (opcional, por defecto la semana actual)."
     )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Orders: overlap extract, transform and load in threads with bounded queues (see pipeline.py)."
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=ORDERS_BATCH_SIZE,
+        help=f"Orders: rows per extracted and loaded batch (default {ORDERS_BATCH_SIZE})."
+    )
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=4,
+        help="Maximum batches in each pipeline queue before the producer is held back (default 4)."
+    )
+
+    parser.add_argument(
+        "--parallel_extract",
+        type=int,
+        default=1,
+        help="Orders: number of MSSQL connections to extract the partitions in parallel (default 1, unpartitioned)."
+    )
+    parser.add_argument(
+        "--partition_by",
+        choices=['warehouse', 'month'],
+        default='warehouse',
+        help="Orders: how the extract is split with --parallel_extract (by warehouse or by fulfillmentDate month)."
+    )
+    parser.add_argument(
+        "--extract_buffer_rows",
+        type=int,
+        default=ORDERS_PARALLEL_BUFFER_ROWS,
+        help=f"Orders: rows the --parallel_extract workers read ahead of the partition being loaded, all partitions together (default {ORDERS_PARALLEL_BUFFER_ROWS})."
+    )
+    parser.add_argument(
+        "--dimension_ttl",
+        type=int,
+        default=DEFAULT_TTL_SECONDS,
+        help=f"Orders: seconds the local dimension cache is used without checking its version on MSSQL (default {DEFAULT_TTL_SECONDS})."
+    )
+    parser.add_argument(
+        "--refresh_dimensions",
+        action="store_true",
+        help="Orders: check the version of the dimensions on MSSQL even if the local cache has not expired."
+    )
+    parser.add_argument(
+        "--spool",
+        action="store_true",
+        help="DataCard/Orders: write the transformed data to the local spool (ETL_STATE_DIR/spool) and then send it; if PostgreSQL fails, it stays pending for 'sync'."
+    )
+    parser.add_argument(
+        "--commit_every",
+        type=int,
+        default=0,
+        help="Orders: commit the load every N batches, saving a checkpoint in data_etl_checkpoint that --resume can continue from; "
+             "the extract is then ordered by key and readers see each committed batch. 0 (default) loads everything in a single transaction."
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Orders: if the last load was interrupted, continue after the last committed batch of its checkpoint."
+    )
+    parser.add_argument(
+        "--jitter",
+        type=int,
+        default=30,
+        help="serve: maximum random delay, in seconds, of each scheduled run relative to its schedule (default 30)."
+    )
+    parser.add_argument(
+        "--skip_unchanged",
+        action="store_true",
+        help="DataCard/Orders: do not send rows identical to the last load, according to the local hash index (ETL_STATE_DIR)."
+    )
+    parser.add_argument(
+        "--rebuild_hash_index",
+        action="store_true",
+        help="Rebuild the local hash index from PostgreSQL before loading (implies --skip_unchanged)."
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each stage (cProfile + tracemalloc) and write the .prof files and a hotspot summary to <profile_dir>/<job>/<run_id>/."
+    )
+    parser.add_argument(
+        "--profile_dir",
+        help="With --profile: base directory of the profiles (default ETL_STATE_DIR/profiles)."
+    )
+    parser.add_argument(
+        "--profile_top",
+        type=int,
+        default=DEFAULT_TOP,
+        help=f"With --profile: entries of each hotspot list in the summary (default {DEFAULT_TOP})."
+    )
 
     args = parser.parse_args()
 
-    main(args)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(threadName)s] %(message)s")
+    if args.command == 'serve':
+        serve(args)
+    else:
+        main(args)
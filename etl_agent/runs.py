@@ -0,0 +1,183 @@
+# etl_agent/runs.py
+"""
+Run history of the ETL jobs, stored in data_etl_run (model data.EtlRun).
+
+A RunRecorder times each stage of one job run and collects its row counts,
+load results, peak RSS and error; `save()` writes one row per stage plus a
+'total' row when the job ends.
+
+    recorder = RunRecorder('datacard')
+    with recorder.stage('extract') as stage:
+        data = extract(...)
+        stage.rows_out = len(data)
+    ...
+    recorder.save(pg_conn)
+
+With `profile` the stages also run under a StageProfiler (profiling.py).
+"""
+import logging
+import socket
+import sys
+import time
+import uuid
+from contextlib import contextmanager, nullcontext, suppress
+from datetime import datetime, timezone
+
+from profiling import DEFAULT_TOP, StageProfiler
+
+try:
+    import psutil
+except ImportError:  # optional: without it peak RSS comes from `resource` (not available on Windows)
+    psutil = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+STATUS_SUCCESS = 'success'
+STATUS_FAILED = 'failed'
+STAGE_TOTAL = 'total'
+
+
+def peak_rss_bytes():
+    """Peak resident memory of the agent process so far, or None if it cannot be read."""
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        if getattr(info, 'peak_wset', None):  # Windows
+            return info.peak_wset
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+
+class StageRecord:
+    """Measurements of one stage; the loaders fill inserted/updated/skipped."""
+    __slots__ = (
+        'error', 'inserted', 'name', 'peak_rss', 'rows_in', 'rows_out', 'seconds', 'skipped', 'started_at', 'updated',
+    )
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.started_at = datetime.now(timezone.utc)
+        self.seconds = 0.0
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.inserted = None
+        self.updated = None
+        self.skipped = None
+        self.peak_rss = None
+        self.error = ''
+
+    def rows_per_second(self):
+        # Rows handled by the stage: what it received, or what it produced if it is a source
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        if rows is None or not self.seconds:
+            return None
+        return rows / self.seconds
+
+
+class RunRecorder:
+    """
+    Args:
+        job: job name ('orders', 'datacard', 'orders_sync'...).
+        run_id: identifier shared by the rows of this run (generated if omitted).
+        profile: profile the stages; True or the base directory of the profiles (see profiling.py).
+        profile_top: entries of each hotspot list in the profile summary.
+    """
+
+    def __init__(self, job, run_id=None, profile=None, profile_top=DEFAULT_TOP):
+        self.job = job
+        self.run_id = run_id or f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.stages = []
+        self.error = ''
+        self.profiler = StageProfiler(job, self.run_id, profile, top=profile_top) if profile else None
+
+    def profile(self, name, cpu=True):
+        """Profiles the block as stage `name` if profiling is enabled (no-op otherwise)."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name, cpu=cpu)
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Times the block as stage `name`; an exception is recorded and re-raised."""
+        record = StageRecord(name, rows_in)
+        started = time.perf_counter()
+        try:
+            with self.profile(name):
+                yield record
+        except Exception as e:
+            record.error = record.error or str(e)
+            raise
+        finally:
+            record.seconds = time.perf_counter() - started
+            record.peak_rss = peak_rss_bytes()
+            self.stages.append(record)
+
+    def add_stage(self, name, seconds, rows_in=None, rows_out=None):
+        """Adds a stage measured elsewhere (e.g. the StageStats of a pipeline run)."""
+        record = StageRecord(name, rows_in)
+        record.rows_out = rows_out
+        return self.add_record(record, seconds)
+
+    def add_record(self, record, seconds):
+        """Adds a StageRecord filled elsewhere (e.g. by a loader), with its duration."""
+        record.seconds = seconds
+        record.peak_rss = peak_rss_bytes()
+        self.stages.append(record)
+        return record
+
+    def fail(self, error):
+        """Marks the run as failed (errors handled by the job without raising)."""
+        self.error = self.error or str(error)
+
+    def _rows(self):
+        total = StageRecord(STAGE_TOTAL)
+        total.started_at = self.started_at
+        total.seconds = time.perf_counter() - self.started
+        total.peak_rss = peak_rss_bytes()
+        total.error = self.error or next((stage.error for stage in self.stages if stage.error), '')
+        if self.stages:
+            total.rows_in = self.stages[0].rows_in if self.stages[0].rows_in is not None else self.stages[0].rows_out
+            total.rows_out = self.stages[-1].rows_out
+        host = socket.gethostname()
+        for record in (*self.stages, total):
+            yield (
+                self.run_id, self.job, record.name, STATUS_FAILED if record.error else STATUS_SUCCESS,
+                record.started_at, record.seconds, record.rows_in, record.rows_out, record.rows_per_second(),
+                record.inserted, record.updated, record.skipped, record.peak_rss, record.error, host,
+            )
+
+    def save(self, pg_conn):
+        """
+        Writes the run to data_etl_run in its own transaction (and the profile,
+        if any). A failure is only logged: the history must never break a load.
+        """
+        if self.profiler is not None:
+            self.profiler.close()
+        if not pg_conn:
+            logging.warning(f"[{self.job}] run {self.run_id} not recorded: PostgreSQL is not available.")
+            return
+        try:
+            pg_conn.rollback()  # leftovers of a failed load must not block the insert
+            with pg_conn.cursor() as cursor:
+                cursor.executemany(
+                    """
+                    INSERT INTO data_etl_run (
+                        run_id, job, stage, status, started_at, duration_seconds, rows_in, rows_out, rows_per_second,
+                        inserted, updated, skipped, peak_rss_bytes, error, host
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    list(self._rows()),
+                )
+            pg_conn.commit()
+        except Exception as e:
+            logging.error(f"[{self.job}] could not record run {self.run_id}: {e}")
+            with suppress(Exception):
+                pg_conn.rollback()
@@ -0,0 +1,164 @@
+# etl_agent/scheduler.py
+"""
+In-process scheduler for the long-running agent (`run_etl.py serve`).
+
+Each job has a cron-like schedule (5 fields: minute hour day-of-month month
+day-of-week, with `*`, lists, ranges and `/step`) and runs in its own thread,
+so a long Orders load does not delay a 15-minute DataCard refresh. Every run
+starts a random 0..jitter seconds after its slot (several agents do not hit
+the sources at the same second), and a job whose previous run is still in
+progress skips the slot instead of overlapping with itself.
+
+    Scheduler([Job('datacard', CronSchedule('*/15 * * * *'), run_datacard)], jitter_seconds=30).run()
+"""
+import datetime
+import logging
+import random
+import threading
+import time
+
+# Seconds between wake-ups while waiting for the next slot (clock changes, stop requests)
+_MAX_SLEEP_SECONDS = 60
+# Every schedule matches at least once in this span (Feb 29 on a given weekday repeats within 28 years)
+_SEARCH_DAYS = 366 * 28
+
+_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7),
+)
+
+
+def _parse_field(text, name, low, high):
+    values = set()
+    for part in text.split(','):
+        part, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(value) for value in part.split('-', 1))
+        else:
+            start = end = int(part)
+            if step > 1:
+                end = high
+        if not (low <= start <= end <= high) or step < 1:
+            raise ValueError(f"Invalid {name} field in schedule: {text!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """A 5-field cron expression, evaluated in local time."""
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != len(_FIELDS):
+            raise ValueError(f"A schedule needs {len(_FIELDS)} fields (minute hour day month weekday): {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            _parse_field(text, name, low, high) for text, (name, low, high) in zip(fields, _FIELDS)
+        )
+        # cron: 0 and 7 are Sunday; datetime.weekday(): Monday is 0
+        self.weekdays = frozenset((weekday - 1) % 7 for weekday in weekdays)
+        # As in cron, if both day fields are restricted a day matching either one qualifies
+        self.day_restricted = fields[2] != '*'
+        self.weekday_restricted = fields[4] != '*'
+
+    def __str__(self):
+        return self.expression
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment):
+        """The first matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = candidate + datetime.timedelta(days=_SEARCH_DAYS)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + datetime.timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += datetime.timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Schedule never matches: {self.expression!r}")
+
+
+class Job:
+    """
+    Args:
+        name: job name, used in logs and thread names.
+        schedule: CronSchedule of the job.
+        run: callable run on every slot; exceptions are logged and do not stop the scheduler.
+    """
+
+    def __init__(self, name, schedule, run):
+        self.name = name
+        self.schedule = schedule
+        self.run = run
+        self.lock = threading.Lock()
+        self.slot = None
+        self.due = None
+
+
+class Scheduler:
+    def __init__(self, jobs, jitter_seconds=0):
+        self.jobs = list(jobs)
+        self.jitter_seconds = jitter_seconds
+        self.stop = threading.Event()
+        self.threads = []
+
+    def _plan(self, job, after):
+        job.slot = job.schedule.next_after(after)
+        job.due = job.slot + datetime.timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        logging.info(f"[{job.name}] next run at {job.due:%Y-%m-%d %H:%M:%S} (schedule '{job.schedule}').")
+
+    def _run_job(self, job):
+        started = time.perf_counter()
+        try:
+            job.run()
+            logging.info(f"[{job.name}] run finished in {time.perf_counter() - started:.1f}s.")
+        except Exception:
+            logging.exception(f"[{job.name}] run failed after {time.perf_counter() - started:.1f}s.")
+        finally:
+            job.lock.release()
+
+    def _launch(self, job):
+        if not job.lock.acquire(blocking=False):
+            logging.warning(f"[{job.name}] previous run still in progress: skipping the {job.slot:%H:%M} slot.")
+            return
+        thread = threading.Thread(target=self._run_job, args=(job,), name=f'job-{job.name}', daemon=True)
+        self.threads = [running for running in self.threads if running.is_alive()]
+        self.threads.append(thread)
+        thread.start()
+
+    def run(self):
+        """Runs the jobs until `stop` is set, then waits for the runs in progress."""
+        now = datetime.datetime.now()
+        for job in self.jobs:
+            self._plan(job, now)
+        try:
+            while not self.stop.is_set():
+                job = min(self.jobs, key=lambda job: job.due)
+                delay = (job.due - datetime.datetime.now()).total_seconds()
+                if delay > 0:
+                    self.stop.wait(min(delay, _MAX_SLEEP_SECONDS))
+                    continue
+                self._launch(job)
+                # Slots missed while the process was suspended are not replayed
+                self._plan(job, max(job.slot, datetime.datetime.now()))
+        finally:
+            self.stop.set()
+            for thread in self.threads:
+                thread.join()
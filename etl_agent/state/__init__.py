@@ -0,0 +1,25 @@
+# etl_agent/state/__init__.py
+"""
+Local state of the ETL agent, kept next to the agent in SQLite databases
+(ETL_STATE_DIR, by default etl_agent/.etl_state/). It only holds caches and
+bookkeeping that can be rebuilt from the source or the target.
+"""
+import os
+import sqlite3
+
+DEFAULT_STATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.etl_state')
+
+
+def state_dir():
+    # Read on every call: the .env file is loaded after the modules are imported
+    return os.getenv('ETL_STATE_DIR') or DEFAULT_STATE_DIR
+
+
+def connect_state_db(name='state.sqlite3'):
+    """Opens (creating it if needed) a SQLite database in the state directory."""
+    os.makedirs(state_dir(), exist_ok=True)
+    conn = sqlite3.connect(os.path.join(state_dir(), name))
+    # WAL: readers do not block the writer and commits are cheap
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
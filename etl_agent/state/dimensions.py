@@ -0,0 +1,92 @@
+# etl_agent/state/dimensions.py
+"""
+Local cache of small source dimension tables (projects, warehouses...).
+
+Each dimension is stored as {id: values} together with a version string
+computed on the source (e.g. COUNT + CHECKSUM_AGG). Within `ttl_seconds` of
+the last check the cached copy is used without touching the source; after
+that only the version query runs, and the table is fetched again only if
+the version changed.
+
+Every call opens its own SQLite connection, so the cache can be used (and
+invalidated) from any thread.
+"""
+import json
+import logging
+import time
+
+from state import connect_state_db
+
+DEFAULT_TTL_SECONDS = 3600
+
+_DB_NAME = 'dimensions.sqlite3'
+
+
+def _connect():
+    conn = connect_state_db(_DB_NAME)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS dimensions ('
+        ' name TEXT PRIMARY KEY, version TEXT NOT NULL, checked_at REAL NOT NULL, rows TEXT NOT NULL)'
+    )
+    return conn
+
+
+class DimensionCache:
+    """
+    Args:
+        ttl_seconds: how long a cached dimension is trusted without checking
+            its version on the source.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, name, version, fetch, force=False):
+        """
+        Returns the dimension `name` as a dict {id: tuple of values}.
+
+        `version()` returns the current version string on the source and
+        `fetch()` the full table as (id, *values) rows; they are only called
+        when the cached copy is missing, expired or `force` is set.
+        """
+        conn = _connect()
+        try:
+            cached = conn.execute(
+                'SELECT version, checked_at, rows FROM dimensions WHERE name = ?', (name,)
+            ).fetchone()
+            now = time.time()
+            if cached and not force and now - cached[1] < self.ttl_seconds:
+                return self._decode(cached[2])
+
+            current_version = str(version())
+            if cached and cached[0] == current_version:
+                with conn:
+                    conn.execute('UPDATE dimensions SET checked_at = ? WHERE name = ?', (now, name))
+                logging.info(f"Dimension {name}: unchanged on the source (version {current_version}).")
+                return self._decode(cached[2])
+
+            rows = [tuple(row) for row in fetch()]
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO dimensions (name, version, checked_at, rows) VALUES (?, ?, ?, ?)',
+                    (name, current_version, now, json.dumps(rows, default=str)),
+                )
+            logging.info(f"Dimension {name}: {len(rows)} rows fetched from the source (version {current_version}).")
+            return {row[0]: tuple(row[1:]) for row in rows}
+        finally:
+            conn.close()
+
+    def invalidate(self, *names):
+        """Forces a version check of the given dimensions on the next `get()`."""
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany(
+                    'UPDATE dimensions SET checked_at = 0 WHERE name = ?', ((name,) for name in names)
+                )
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _decode(text):
+        return {row[0]: tuple(row[1:]) for row in json.loads(text)}
@@ -0,0 +1,140 @@
+# etl_agent/state/row_hashes.py
+"""
+Client-side change detection for the loaders.
+
+For each target table the index stores, per natural key, a digest of the
+columns last loaded. Before an upsert the loader keeps only the rows whose
+key is new or whose digest changed, so re-sent unchanged rows cost neither
+network transfer nor a rewrite (new tuple, WAL, fetched_at bump) on the target.
+
+The digests of a load are staged in memory and only written to the index
+after the target transaction commits (`commit()`); on rollback `discard()`
+drops them. If the target is modified outside the agent (restore, manual
+deletes...), `rebuild()` recomputes the index from the target table.
+"""
+import datetime
+import hashlib
+import logging
+from decimal import Decimal
+
+from state import connect_state_db
+
+# SQLite limit on host parameters per statement is 999 in older builds
+_LOOKUP_CHUNK = 900
+_SEPARATOR = '\x1f'
+
+
+def _canonical(value):
+    """Text form of a value that is identical for the source row and the target row."""
+    if value is None:
+        return '\x00'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (float, Decimal)):
+        # 1, 1.0 and Decimal('1.0000') must hash the same (column types differ between source and target)
+        return format(Decimal(str(value)).normalize(), 'f')
+    return str(value)
+
+
+class RowHashIndex:
+    """
+    Args:
+        table: target table name (also the namespace in the index).
+        columns: column names of the records handed to `changed()`, in order.
+        key_columns: natural key of the table.
+        ignored_columns: columns left out of the digest (e.g. fetched_at).
+    """
+
+    def __init__(self, table, columns, key_columns, ignored_columns=()):
+        self.table = table
+        self.columns = tuple(columns)
+        self.key_positions = [self.columns.index(column) for column in key_columns]
+        self.value_positions = [
+            index for index, column in enumerate(self.columns) if column not in ignored_columns
+        ]
+        self.pending = {}
+        self.skipped = 0
+        self.conn = connect_state_db('row_hashes.sqlite3')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS row_hashes ('
+            ' target TEXT NOT NULL, key TEXT NOT NULL, digest BLOB NOT NULL,'
+            ' PRIMARY KEY (target, key)) WITHOUT ROWID'
+        )
+
+    def key_of(self, record):
+        return _SEPARATOR.join(_canonical(record[index]) for index in self.key_positions)
+
+    def digest_of(self, record):
+        text = _SEPARATOR.join(_canonical(record[index]) for index in self.value_positions)
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _stored_digests(self, keys):
+        stored = {}
+        for start in range(0, len(keys), _LOOKUP_CHUNK):
+            chunk = keys[start:start + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            stored.update(self.conn.execute(
+                f'SELECT key, digest FROM row_hashes WHERE target = ? AND key IN ({placeholders})',
+                (self.table, *chunk),
+            ))
+        return stored
+
+    def changed(self, records):
+        """
+        Returns the records that are new or changed since the last committed
+        load and stages their digests until `commit()`.
+        """
+        keyed = [(self.key_of(record), self.digest_of(record), record) for record in records]
+        stored = self._stored_digests([key for key, _, _ in keyed])
+        result = []
+        for key, digest, record in keyed:
+            if stored.get(key) == digest or self.pending.get(key) == digest:
+                self.skipped += 1
+                continue
+            self.pending[key] = digest
+            result.append(record)
+        return result
+
+    def commit(self):
+        """Persists the staged digests; call it once the target transaction committed."""
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO row_hashes (target, key, digest) VALUES (?, ?, ?)',
+                ((self.table, key, digest) for key, digest in self.pending.items()),
+            )
+        self.pending.clear()
+
+    def discard(self):
+        """Drops the staged digests after a rollback of the target transaction."""
+        self.pending.clear()
+
+    def rebuild(self, pg_conn, batch_size=10000):
+        """Recomputes the index of this table from the rows currently in the target."""
+        cursor = pg_conn.cursor(name=f'rebuild_{self.table}')  # server-side: streams large tables
+        cursor.itersize = batch_size
+        rows = 0
+        try:
+            cursor.execute(f"SELECT {', '.join(self.columns)} FROM {self.table}")
+            with self.conn:
+                self.conn.execute('DELETE FROM row_hashes WHERE target = ?', (self.table,))
+                while True:
+                    records = cursor.fetchmany(batch_size)
+                    if not records:
+                        break
+                    self.conn.executemany(
+                        'INSERT OR REPLACE INTO row_hashes (target, key, digest) VALUES (?, ?, ?)',
+                        ((self.table, self.key_of(record), self.digest_of(record)) for record in records),
+                    )
+                    rows += len(records)
+        finally:
+            cursor.close()
+            pg_conn.rollback()
+        logging.info(f"Row hash index for {self.table} rebuilt from the target: {rows} rows.")
+        return rows
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,120 @@
+# etl_agent/state/spool.py
+"""
+Local spool of transformed batches waiting to be loaded into PostgreSQL.
+
+Each run of a job writes one segment, a directory under
+<ETL_STATE_DIR>/spool/<job>/ with one pickle file per RowBatch. The segment
+is only considered complete once `meta.json` is written (`SpoolWriter.close()`),
+so a crashed extraction never ships half a dataset. The sync stage loads the
+complete segments oldest first and removes each one after its load committed;
+a failed upload leaves the segment in place for the next sync, without
+extracting from MSSQL again.
+
+The files are only written and read by the agent itself.
+"""
+import json
+import logging
+import os
+import pickle
+import shutil
+from datetime import datetime
+
+from rows import RowBatch
+from state import state_dir
+
+_META_FILE = 'meta.json'
+
+
+def spool_dir(job):
+    return os.path.join(state_dir(), 'spool', job)
+
+
+class SpoolWriter:
+    """
+    Writes the batches of one job run to a new segment.
+
+    Args:
+        job: job name ('orders', 'datacard'...).
+        meta: JSON-serializable load parameters stored with the segment
+            (e.g. year and week of a DataCard report).
+    """
+
+    def __init__(self, job, meta=None):
+        self.job = job
+        self.meta = dict(meta or {})
+        self.path = os.path.join(spool_dir(job), f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}")
+        os.makedirs(self.path)
+        self.batches = 0
+        self.rows = 0
+
+    def write(self, batch):
+        name = os.path.join(self.path, f'batch-{self.batches:06d}.pkl')
+        with open(name + '.tmp', 'wb') as f:
+            pickle.dump((batch.columns, [tuple(row) for row in batch.rows]), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(name + '.tmp', name)
+        self.batches += 1
+        self.rows += len(batch)
+
+    def write_all(self, batches):
+        """Spools an iterable of batches (usable as a pipeline sink)."""
+        for batch in batches:
+            self.write(batch)
+
+    def close(self):
+        """
+        Marks the segment complete, making it visible to the sync stage. A
+        segment without batches is dropped instead.
+        """
+        if not self.batches:
+            self.abort()
+            return
+        meta = {**self.meta, 'job': self.job, 'batches': self.batches, 'rows': self.rows}
+        with open(os.path.join(self.path, _META_FILE + '.tmp'), 'w') as f:
+            json.dump(meta, f)
+        os.replace(os.path.join(self.path, _META_FILE + '.tmp'), os.path.join(self.path, _META_FILE))
+        logging.info(f"Spooled {self.rows} {self.job} rows in {self.batches} batches to {self.path}.")
+
+    def abort(self):
+        """Drops an incomplete segment (extraction or transformation failed)."""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class SpoolSegment:
+    """A complete segment found in the spool."""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+
+    @property
+    def name(self):
+        return os.path.basename(self.path)
+
+    def batches(self, skip=0):
+        """Yields the spooled RowBatches in the order they were written, after the first `skip`."""
+        names = sorted(name for name in os.listdir(self.path) if name.endswith('.pkl'))
+        for name in names[skip:]:
+            with open(os.path.join(self.path, name), 'rb') as f:
+                columns, rows = pickle.load(f)
+            yield RowBatch(columns, rows)
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def pending_segments(job):
+    """Complete segments of a job, oldest first. Incomplete ones are skipped."""
+    root = spool_dir(job)
+    if not os.path.isdir(root):
+        return []
+    segments = []
+    for name in sorted(os.listdir(root)):
+        path = os.path.join(root, name)
+        try:
+            with open(os.path.join(path, _META_FILE)) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            logging.warning(f"Skipping incomplete spool segment {path} (still being written or its run failed).")
+            continue
+        segments.append(SpoolSegment(path, meta))
+    return segments
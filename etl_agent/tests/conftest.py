@@ -0,0 +1,6 @@
+# etl_agent/tests/conftest.py
+import os
+import sys
+
+# The agent modules import each other as top-level packages (run from etl_agent/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
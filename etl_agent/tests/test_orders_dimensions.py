@@ -0,0 +1,117 @@
+# etl_agent/tests/test_orders_dimensions.py
+import datetime
+
+import pytest
+
+from extracts.dimensions import ORDER_DIMENSIONS, OrderDimensions
+from rows import RowBatch
+from state.dimensions import DimensionCache
+from transformers.orders import transform_orders
+
+COLUMNS = ('project_id', 'warehouse_id', 'order_class_id', 'order_number', 'shipment_number', 'order_type', 'date')
+DATE = datetime.date(2025, 1, 15)
+
+
+class FakeSource:
+    """Dimension tables of a fake MSSQL source, keyed by table name; records the queries run."""
+
+    def __init__(self):
+        self.tables = {
+            'datex_footprint.Projects': [(1, 'Project 1')],
+            'datex_footprint.Warehouses': [(10, 'MIA', 'Miami, FL')],
+            'datex_footprint.OrderClasses': [(5, 'Outbound')],
+        }
+        self.queries = []
+        self.connections = []
+
+    def connect(self):
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+class FakeCursor:
+    def __init__(self, source):
+        self.source = source
+        self.result = None
+
+    def execute(self, query):
+        self.source.queries.append(query)
+        table = query.rsplit(' FROM ', 1)[1]
+        rows = self.source.tables[table]
+        if query.startswith('SELECT COUNT(*)'):
+            self.result = [(len(rows), hash(tuple(rows)))]
+        else:
+            self.result = rows
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, source):
+        self.source = source
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.source)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setenv('ETL_STATE_DIR', str(tmp_path))
+    return FakeSource()
+
+
+def order(number, project_id=1, warehouse_id=10, order_class_id=5):
+    return (project_id, warehouse_id, order_class_id, number, f'{number}-1', 'Sale', DATE)
+
+
+def transform(batch, dimensions, dropped):
+    return transform_orders(batch, dimensions.current, refresh=dimensions.refresh, on_dropped=dropped.append)
+
+
+def test_unknown_key_refreshes_the_dimension_and_keeps_the_batch_order(source):
+    dimensions = OrderDimensions(source.connect(), source.connect, DimensionCache())
+    source.tables['datex_footprint.Warehouses'].append((15, 'DAL', 'Dallas, TX'))
+    source.queries.clear()
+    dropped = []
+
+    result = transform(RowBatch(COLUMNS, [order('A'), order('B', warehouse_id=15), order('C')]), dimensions, dropped)
+
+    assert [row[3] for row in result.rows] == ['A', 'B', 'C']
+    assert result.rows[1][1:3] == ('DAL', 'Dallas, TX')
+    source_state = result.position('source_state')
+    assert [row[source_state] for row in result.rows] == ['Florida', 'Texas', 'Florida']
+    assert dropped == []
+    # Only the dimension with the unknown key is checked again
+    assert all(query.endswith('datex_footprint.Warehouses') for query in source.queries)
+    dimensions.close()
+    assert source.connections[-1].closed
+
+
+def test_keys_still_unknown_are_dropped_counted_and_not_looked_up_again(source):
+    dimensions = OrderDimensions(source.connect(), source.connect, DimensionCache())
+    source.queries.clear()
+    dropped = []
+
+    result = transform(RowBatch(COLUMNS, [order('A'), order('B', project_id=99)]), dimensions, dropped)
+    assert [row[3] for row in result.rows] == ['A']
+    assert dropped == [1]
+    # Unchanged version: checked, not fetched again
+    assert source.queries == [f"SELECT COUNT(*), CHECKSUM_AGG(BINARY_CHECKSUM(id, name)) FROM {ORDER_DIMENSIONS['projects'][0]}"]
+
+    source.queries.clear()
+    result = transform(RowBatch(COLUMNS, [order('C', project_id=99), order('D')]), dimensions, dropped)
+    assert [row[3] for row in result.rows] == ['D']
+    assert dropped == [1, 1]
+    assert source.queries == []
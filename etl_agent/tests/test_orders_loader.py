@@ -0,0 +1,71 @@
+# etl_agent/tests/test_orders_loader.py
+import datetime
+import logging
+
+from loaders.orders import ORDER_COLUMNS, load_orders_batches
+from rows import RowBatch
+from runs import StageRecord
+
+DATE = datetime.date(2025, 4, 20)
+
+
+class FakeCursor:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+
+    def execute(self, query, params):
+        self.executed.append(params)
+        if params[3] == self.fail_on:
+            raise RuntimeError('duplicate key value')
+
+    def fetchone(self):
+        return (True,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def order(number, date=DATE):
+    return ('Customer', 'WH', 'Miami, FL', number, f'{number}-1', 'Sale', date, 'Outbound', 'FL', 'TX',
+            date.year, date.month, date.strftime('%B'), 2, 16, date.day)
+
+
+def test_probes_are_bounded_by_literal_dates():
+    cursor = FakeCursor()
+
+    assert load_orders_batches(FakeConnection(cursor), [RowBatch(ORDER_COLUMNS, [order('A')])], moved_window_days=10)
+
+    # Moved-row window, then the row's own date for the existing probe
+    assert cursor.executed[0][len(ORDER_COLUMNS):] == (
+        datetime.date(2025, 4, 10), datetime.date(2025, 4, 30), DATE,
+    )
+
+
+def test_failed_load_logs_the_traceback(caplog):
+    connection = FakeConnection(FakeCursor(fail_on='B'))
+    stats = StageRecord('load')
+
+    with caplog.at_level(logging.ERROR):
+        loaded = load_orders_batches(connection, [RowBatch(ORDER_COLUMNS, [order('A'), order('B')])], stats=stats)
+
+    assert not loaded
+    assert connection.rollbacks == 1
+    assert stats.error == 'duplicate key value'
+    assert caplog.records[-1].exc_info is not None
@@ -0,0 +1,145 @@
+# etl_agent/tests/test_parallel_extract.py
+import threading
+import time
+
+import pytest
+
+from extracts.orders import iter_orders_batches_parallel
+
+BATCH_SIZE = 2
+BATCHES_PER_PARTITION = 20
+
+
+class FakeCursor:
+    """Serves BATCHES_PER_PARTITION batches of the partition named in the query parameters."""
+
+    description = (('partition',), ('row',))
+
+    def __init__(self, on_fetch):
+        self.on_fetch = on_fetch
+        self.partition = None
+        self.fetches = 0
+
+    def execute(self, query, params):
+        # params[0] is the start date, which identifies the partition in these tests
+        self.partition = params[0]
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        if self.fetches > BATCHES_PER_PARTITION:
+            return []
+        self.on_fetch(self.partition, self.fetches)
+        return [(self.partition, (self.fetches - 1) * size + offset) for offset in range(size)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, on_fetch):
+        self.on_fetch = on_fetch
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.on_fetch)
+
+    def close(self):
+        self.closed = True
+
+
+def partitions(count):
+    return [{'start_date': f'2025-{month:02d}-01'} for month in range(1, count + 1)]
+
+
+def test_partitions_progress_at_the_same_time():
+    # Every partition must reach its last batch while the others are still running:
+    # with partitions extracted one after another the barrier would never be reached.
+    count = 3
+    barrier = threading.Barrier(count, timeout=10)
+
+    def on_fetch(partition, fetch):
+        if fetch == BATCHES_PER_PARTITION:
+            barrier.wait()
+
+    batches = iter_orders_batches_parallel(
+        lambda: FakeConnection(on_fetch), partitions(count), parallelism=count,
+        batch_size=BATCH_SIZE, buffer_rows=count * BATCHES_PER_PARTITION * BATCH_SIZE,
+    )
+    rows = [row for batch in batches for row in batch]
+
+    assert len(rows) == count * BATCHES_PER_PARTITION * BATCH_SIZE
+    assert {partition for partition, _ in rows} == {partition['start_date'] for partition in partitions(count)}
+    assert not barrier.broken
+
+
+def test_output_follows_the_partition_order_whatever_finishes_first():
+    # Both partitions carry the same keys (the row numbers); the second one finishes
+    # before the first one starts, and its rows must still come last so that they
+    # win the upsert on every run.
+    second_finished = threading.Event()
+
+    def on_fetch(partition, fetch):
+        if partition == '2025-02-01' and fetch == BATCHES_PER_PARTITION:
+            second_finished.set()
+        if partition == '2025-01-01' and fetch == 1:
+            assert second_finished.wait(timeout=10)
+
+    batches = iter_orders_batches_parallel(
+        lambda: FakeConnection(on_fetch), partitions(2), parallelism=2, batch_size=BATCH_SIZE,
+        buffer_rows=BATCHES_PER_PARTITION * BATCH_SIZE,
+    )
+    rows = [row for batch in batches for row in batch]
+
+    keys = [key for _, key in rows]
+    assert keys == list(range(BATCHES_PER_PARTITION * BATCH_SIZE)) * 2
+    assert [partition for partition, _ in rows] == ['2025-01-01'] * (len(rows) // 2) + ['2025-02-01'] * (len(rows) // 2)
+    assert {key: partition for partition, key in rows} == dict.fromkeys(keys, '2025-02-01')
+
+
+def test_read_ahead_is_bounded():
+    fetched = {}
+
+    def on_fetch(partition, fetch):
+        fetched[partition] = fetch
+
+    batches = iter_orders_batches_parallel(
+        lambda: FakeConnection(on_fetch), partitions(2), parallelism=2, batch_size=BATCH_SIZE, buffer_rows=4 * BATCH_SIZE,
+    )
+    next(batches)
+    time.sleep(0.2)
+    # The second partition stops at the budget; its next fetch is waiting to be buffered
+    assert fetched['2025-02-01'] <= 4 + 1
+    assert len([row for batch in batches for row in batch]) == (2 * BATCHES_PER_PARTITION - 1) * BATCH_SIZE
+
+
+def test_partition_error_is_raised_and_connections_are_closed():
+    connections = []
+
+    def on_fetch(partition, fetch):
+        if partition == '2025-02-01' and fetch == 3:
+            raise RuntimeError('fetch failed')
+
+    def connect():
+        connections.append(FakeConnection(on_fetch))
+        return connections[-1]
+
+    with pytest.raises(RuntimeError, match='fetch failed'):
+        for _ in iter_orders_batches_parallel(connect, partitions(3), parallelism=2, batch_size=BATCH_SIZE):
+            pass
+    assert len(connections) == 2
+    assert all(connection.closed for connection in connections)
+
+
+def test_consumer_can_stop_early():
+    connections = []
+
+    def connect():
+        connections.append(FakeConnection(lambda partition, fetch: None))
+        return connections[-1]
+
+    batches = iter_orders_batches_parallel(
+        connect, partitions(4), parallelism=2, batch_size=BATCH_SIZE, buffer_rows=BATCH_SIZE,
+    )
+    next(batches)
+    batches.close()
+    assert all(connection.closed for connection in connections)
@@ -0,0 +1,43 @@
+# etl_agent/tests/test_run_orders.py
+from argparse import Namespace
+
+import pytest
+
+import run_etl
+from loaders.orders import ORDER_COLUMNS
+from rows import RowBatch
+from runs import RunRecorder
+
+
+def args(**overrides):
+    return Namespace(**{
+        'spool': False, 'pipeline': False, 'batch_size': 1, 'queue_size': 1, 'commit_every': 1, 'resume': False,
+        'parallel_extract': 1, 'skip_unchanged': False, 'rebuild_hash_index': False,
+        'profile': False, 'profile_dir': None, 'profile_top': 5, **overrides,
+    })
+
+
+@pytest.fixture
+def saved_runs(monkeypatch):
+    runs = []
+    batches = [RowBatch(ORDER_COLUMNS, [(f'row {index}',) * len(ORDER_COLUMNS)]) for index in range(5)]
+
+    def failing_load(pg_conn, batches, stats=None, **kwargs):
+        next(iter(batches))
+        stats.error = 'connection lost'
+        return False
+
+    monkeypatch.setattr(run_etl, 'orders_checkpoint', lambda args, pg_conn: (None, None))
+    monkeypatch.setattr(run_etl, 'orders_source', lambda args, mssql_conn, after_key=None: iter(batches))
+    monkeypatch.setattr(run_etl, 'orders_transform', lambda args, mssql_conn, record: (lambda batch: batch, None))
+    monkeypatch.setattr(run_etl, 'load_orders_batches', failing_load)
+    monkeypatch.setattr(RunRecorder, 'save', lambda recorder, pg_conn: runs.append(recorder))
+    return runs
+
+
+@pytest.mark.parametrize('pipeline', [False, True])
+def test_failed_load_fails_the_run(saved_runs, pipeline):
+    run_etl.run_orders(args(pipeline=pipeline), None, None)
+
+    [recorder] = saved_runs
+    assert recorder.error == 'Orders load failed: connection lost'
@@ -0,0 +1,46 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from rows import RowBatch
+
+# Same rule as backend migration 0010: commas, '%' and whitespace are ignored and
+# only values that fit in NUMERIC(18, 4) are accepted.
+NUMERIC_PATTERN = re.compile(r'^-?[0-9]{1,14}(\.[0-9]+)?$')
+CLEANUP_PATTERN = re.compile(r'[\s,%]')
+
+DAY_COLUMNS = [f'day{day}' for day in range(1, 8)]
+
+def parse_numeric(value):
+    """
+    Parses a DataCard display value ('1,234', '95.5%', '12') into a Decimal.
+    Returns None for empty, non-numeric or out-of-range values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float, Decimal)):
+        value = str(value)
+    cleaned = CLEANUP_PATTERN.sub('', str(value))
+    if not NUMERIC_PATTERN.match(cleaned):
+        return None
+    try:
+        return Decimal(cleaned).quantize(Decimal('0.0001'))
+    except InvalidOperation:
+        return None
+
+# Columns appended by transform_datacard to each extracted row, in this order
+NUMERIC_COLUMNS = tuple(f'{column}_number' for column in DAY_COLUMNS) + ('total_number',)
+
+_NO_NUMBERS = (None,) * len(NUMERIC_COLUMNS)
+
+def transform_datacard(batch):
+    """
+    Transform a RowBatch of DataCard rows, appending the pre-parsed NUMERIC_COLUMNS
+    (day1_number..day7_number, total_number). Text rows (is_text) keep them as None.
+    """
+    values = batch.getter(*(f'{column}_value' for column in DAY_COLUMNS), 'total')
+    is_text_at = batch.position('is_text')
+    rows = [
+        (*row, *_NO_NUMBERS) if row[is_text_at] else (*row, *map(parse_numeric, values(row)))
+        for row in batch.rows
+    ]
+    return RowBatch(batch.columns + NUMERIC_COLUMNS, rows)
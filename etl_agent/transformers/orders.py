@@ -1,4 +1,8 @@
 import datetime
+import logging
+from functools import lru_cache
+
+from rows import RowBatch
 
 # Mapping from warehouse ID to source state
 WAREHOUSE_TO_STATE_MAPPING = {
@@ -24,19 +28,35 @@ def _get_source_state_from_warehouse(warehouse_value):
         # If warehouse_value cannot be converted to int, or is not a suitable type
         return None
 
-def extract_date_fields(order):
+# Columns resolved by transform_orders from the keys of the extract, in this order
+RESOLVED_COLUMNS = (
+    'customer', 'warehouse', 'warehouse_city_state', 'order_number', 'shipment_number',
+    'order_type', 'date', 'order_class',
+)
+# Columns appended by transform_orders after the resolved ones, in this order
+DERIVED_COLUMNS = ('year', 'month', 'month_name', 'quarter', 'week', 'day', 'source_state', 'destination_state')
+
+_EMPTY_DATE_FIELDS = (None, None, None, None, None, None)
+
+@lru_cache(maxsize=4096)
+def _date_fields(date_obj):
+    # A few hundred distinct dates per run: each one is computed once
+    return (
+        date_obj.year,
+        date_obj.month,
+        date_obj.strftime('%B'),
+        (date_obj.month - 1) // 3 + 1,
+        date_obj.isocalendar()[1],
+        date_obj.day,
+    )
+
+def extract_date_fields(date_val):
     """
-    Given an order dict with a 'date' key (YYYY-MM-DD or datetime/date), extract year, month, quarter, week, day, and month_name.
+    Given a date value (YYYY-MM-DD string or datetime/date), returns the tuple
+    (year, month, month_name, quarter, week, day); all None if missing or invalid.
     """
-    date_val = order.get('date')
     if not date_val:
-        order['year'] = None
-        order['month'] = None
-        order['month_name'] = None
-        order['quarter'] = None
-        order['week'] = None
-        order['day'] = None
-        return order
+        return _EMPTY_DATE_FIELDS
     try:
         if isinstance(date_val, str):
             date_obj = datetime.datetime.strptime(date_val, '%Y-%m-%d').date()
@@ -45,44 +65,81 @@ def extract_date_fields(order):
         elif isinstance(date_val, datetime.date):
             date_obj = date_val
         else:
-            order['year'] = None
-            order['month'] = None
-            order['month_name'] = None
-            order['quarter'] = None
-            order['week'] = None
-            order['day'] = None
-            return order
-        order['year'] = date_obj.year
-        order['month'] = date_obj.month
-        order['month_name'] = date_obj.strftime('%B')
-        order['day'] = date_obj.day
-        order['week'] = date_obj.isocalendar()[1]
-        order['quarter'] = (date_obj.month - 1) // 3 + 1
+            return _EMPTY_DATE_FIELDS
+        return _date_fields(date_obj)
     except Exception:
-        order['year'] = None
-        order['month'] = None
-        order['month_name'] = None
-        order['quarter'] = None
-        order['week'] = None
-        order['day'] = None
-    return order
+        return _EMPTY_DATE_FIELDS
 
-def add_source_state(order):
-    """
-    Adds the 'source_state' to the order dictionary based on the 'warehouse' field.
-    Modifies the order dictionary in place and returns it.
-    """
-    warehouse_identifier = order.get('warehouse')
-    order['source_state'] = _get_source_state_from_warehouse(warehouse_identifier)
-    return order
+def _resolve_orders(batch, dimensions):
+    """Resolved rows of `batch`, and the {name: set of ids} not found in `dimensions`."""
+    projects = dimensions['projects']
+    order_classes = dimensions['order_classes']
+    # name, city/state and source state of each warehouse, computed once per batch
+    # (WAREHOUSE_TO_STATE_MAPPING is keyed by warehouse id)
+    warehouses = {
+        warehouse_id: (name, notes, _get_source_state_from_warehouse(warehouse_id))
+        for warehouse_id, (name, notes) in dimensions['warehouses'].items()
+    }
+    project_at, warehouse_at, class_at = (
+        batch.position('project_id'), batch.position('warehouse_id'), batch.position('order_class_id')
+    )
+    order_fields = batch.getter('order_number', 'shipment_number', 'order_type')
+    date_at = batch.position('date')
 
-def transform_orders(data):
+    rows = []
+    unknown = {'projects': set(), 'warehouses': set(), 'order_classes': set()}
+    for row in batch.rows:
+        project = projects.get(row[project_at])
+        warehouse = warehouses.get(row[warehouse_at])
+        order_class = order_classes.get(row[class_at])
+        if project is None or warehouse is None or order_class is None:
+            if project is None:
+                unknown['projects'].add(row[project_at])
+            if warehouse is None:
+                unknown['warehouses'].add(row[warehouse_at])
+            if order_class is None:
+                unknown['order_classes'].add(row[class_at])
+            continue
+        date_val = row[date_at]
+        rows.append((
+            project[0],
+            warehouse[0],
+            warehouse[1],
+            *order_fields(row),
+            date_val,
+            order_class[0],
+            *extract_date_fields(date_val),
+            warehouse[2],
+            None,
+        ))
+    return rows, unknown
+
+def transform_orders(batch, dimensions, refresh=None, on_dropped=None):
     """
-    Transform a list of order dicts, adding year, month, month_name, quarter, week, day, and source_state fields.
+    Transform a RowBatch of order keys (see extracts/orders.py) into the
+    RESOLVED_COLUMNS followed by the DERIVED_COLUMNS (year, month, month_name,
+    quarter, week, day, source_state and destination_state).
+
+    `dimensions` is the {name: {id: values}} mapping of extract_order_dimensions;
+    project, warehouse and order class names are resolved through it. When some
+    keys are not found, `refresh(unknown)` (e.g. OrderDimensions.refresh) gets
+    the {name: set of ids} missing and returns the refreshed dimensions, or None;
+    the whole batch is then transformed again, so its order is kept. Rows still
+    unknown are dropped, as the former inner joins did, and counted through
+    `on_dropped(count)`. destination_state is not available in the source yet
+    and stays None.
     """
-    transformed_data = []
-    for order_item in data:
-        order_item = extract_date_fields(order_item)  # Existing date transformation
-        order_item = add_source_state(order_item)      # Add source state
-        transformed_data.append(order_item)
-    return transformed_data
+    rows, unknown = _resolve_orders(batch, dimensions)
+    if len(rows) < len(batch) and refresh is not None:
+        refreshed = refresh(unknown)
+        if refreshed is not None:
+            rows, unknown = _resolve_orders(batch, refreshed)
+    dropped = len(batch) - len(rows)
+    if dropped:
+        logging.warning(
+            f"Orders: {dropped} rows dropped with a project, warehouse or order class not in the dimensions "
+            f"(unknown ids: {({name: sorted(keys, key=str)[:10] for name, keys in unknown.items() if keys})})."
+        )
+        if on_dropped:
+            on_dropped(dropped)
+    return RowBatch(RESOLVED_COLUMNS + DERIVED_COLUMNS, rows)
@@ -79,7 +79,8 @@ const calculateCurrentWeekNumber = (date: Date): number => {
 
 const DataCardView: React.FC = () => {
   // Estado para los datos y UI
-  const [data, setData] = useState<DataCardItem[]>([]);
+  // Data of every warehouse for the week, grouped by warehouse_id
+  const [dataByWarehouse, setDataByWarehouse] = useState<Record<string, DataCardItem[]>>({});
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [dataGroups, setDataGroups] = useState<DataGroup[]>([]);
@@ -99,6 +100,12 @@ const DataCardView: React.FC = () => {
     { id: 27, name: 'WH: 23 - Dayton - NJ' },
   ];
 
+  // Switching warehouse needs no new request: it is taken from the data already loaded
+  const data = useMemo(
+    () => dataByWarehouse[warehouseId] ?? [],
+    [dataByWarehouse, warehouseId]
+  );
+
   // Lista específica de items que deben estar en Held Orders
   const heldOrderItems = [
     'TOTAL HELD ORDERS',
@@ -200,7 +207,8 @@ const DataCardView: React.FC = () => {
 
   useEffect(() => {
     fetchDataCard();
-  }, [year, week, warehouseId]); // Recargar cuando cambien los filtros
+  // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [year, week]); // Reload when year or week change (every warehouse in a single request)
 
   // Organizar los datos en grupos después de obtenerlos
   useEffect(() => {
@@ -306,11 +314,12 @@ const DataCardView: React.FC = () => {
     
     try {
       // Construir URL con parámetros de filtro
-      // Siempre incluir warehouse_id ya que ya no hay opción "All"
-      const url = `/data/datacard-reports/?year=${year}&week=${week}&warehouse_id=${warehouseId}`;
+      // Every warehouse is requested at once; the response is grouped by warehouse_id
+      const warehouseIds = warehouseOptions.map(wh => wh.id).join(',');
+      const url = `/data/datacard-reports/?year=${year}&week=${week}&warehouse_id__in=${warehouseIds}`;
       
-      const response = await authService.apiClient.get<DataCardItem[]>(url);
-      setData(response.data);
+      const response = await authService.apiClient.get<Record<string, DataCardItem[]>>(url);
+      setDataByWarehouse(response.data);
       
     } catch (err) {
       let errorText = 'An unknown error occurred';